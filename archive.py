@@ -0,0 +1,89 @@
+import gzip
+import lzma
+import os
+from collections import namedtuple
+import config
+
+# Archived tasks live in "<task file>.archive/", one compressed segment per
+# month they were archived in ("2025-04.txt.gz" or "2025-04.txt.xz"). Each
+# line is "<archived on>\t<reason>\t<task>". Segments are only ever appended
+# to, each append adding a compressed member/stream that readers decode in
+# sequence, so archiving never rewrites what is already there.
+
+COMPRESSORS = {"gzip": (".txt.gz", gzip.open), "lzma": (".txt.xz", lzma.open)}
+
+Archived = namedtuple("Archived", "archived reason task")
+
+
+def archive_dir(path):
+    """Return the directory that holds the archive of a task file."""
+    return f"{path}.archive"
+
+
+def _compressor():
+    if config.ARCHIVE_COMPRESSION not in COMPRESSORS:
+        raise ValueError(f"Unknown archive compression: {config.ARCHIVE_COMPRESSION}")
+    return COMPRESSORS[config.ARCHIVE_COMPRESSION]
+
+
+def append(path, tasks, reason, archived):
+    """Append ``tasks`` to the segment for the month of date ``archived``."""
+    if not tasks:
+        return
+    suffix, opener = _compressor()
+    directory = archive_dir(path)
+    os.makedirs(directory, exist_ok=True)
+    segment = os.path.join(directory, f"{str(archived)[:7]}{suffix}")
+    with opener(segment, "at") as file:
+        file.writelines(f"{archived}\t{reason}\t{task}\n" for task in tasks)
+
+
+def segments(path, since=None, until=None):
+    """
+    Return the segment files of the months from ``since`` to ``until``.
+
+    Bounds are dates or "YYYY-MM" strings; segments outside them are
+    skipped without being opened.
+    """
+    try:
+        names = os.listdir(archive_dir(path))
+    except FileNotFoundError:
+        return []
+    found = []
+    for name in names:
+        for suffix, opener in COMPRESSORS.values():
+            if name.endswith(suffix):
+                month = name[: -len(suffix)]
+                if (since is None or month >= str(since)[:7]) and (
+                    until is None or month <= str(until)[:7]
+                ):
+                    found.append((month, os.path.join(archive_dir(path), name)))
+    return [file for _, file in sorted(found)]
+
+
+def iter_archive(path, since=None, until=None, contains=None, reason=None):
+    """
+    Yield Archived records oldest first, decompressing one segment at a time.
+
+    ``since`` and ``until`` bound the archive date (inclusive),
+    ``contains`` matches the task text case-insensitively and ``reason``
+    selects "completed" or "superseded" tasks.
+    """
+    since = str(since) if since is not None else None
+    until = str(until) if until is not None else None
+    needle = contains.lower() if contains else None
+    for segment in segments(path, since, until):
+        opener = gzip.open if segment.endswith(".gz") else lzma.open
+        with opener(segment, "rt") as file:
+            for line in file:
+                record = Archived(*line.rstrip("\n").split("\t", 2))
+                if since is not None and record.archived < since:
+                    continue
+                # A "YYYY-MM" bound takes in the whole month.
+                if until is not None and record.archived[: len(until)] > until:
+                    continue
+                if reason is not None and record.reason != reason:
+                    continue
+                if needle is not None and needle not in record.task.lower():
+                    continue
+                yield record
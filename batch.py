@@ -0,0 +1,89 @@
+import glob
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from functools import partial
+import config
+import storage
+from recurring import process_recurring_tasks
+
+
+def task_files(pattern):
+    """
+    Return the task files named by ``pattern``, in sorted order.
+
+    A directory means every .txt file directly inside it; anything else
+    is expanded as a glob, so "teams/*/task.txt" works too.
+    """
+    if os.path.isdir(pattern):
+        pattern = os.path.join(pattern, "*.txt")
+    return sorted(path for path in glob.glob(pattern) if os.path.isfile(path))
+
+
+def process_file(path, today, catch_up=False, backend=None):
+    """
+    Run the recurring pass over one task file and return its result.
+
+    The file is loaded and written under its lock, with the same
+    semantics as ``process_recurring_tasks(tasks, today)``. Errors are
+    recorded in the result instead of raised, so one bad file does not
+    stop a batch.
+    """
+    result = {"path": path, "tasks": 0, "generated": 0, "error": None}
+    original_file, original_backend = storage.TASK_FILE, config.STORAGE_BACKEND
+    storage.TASK_FILE = path
+    config.STORAGE_BACKEND = backend or original_backend
+    start = time.perf_counter()
+    try:
+        with storage.locked():
+            tasks = storage.load_tasks()
+            result["tasks"] = len(tasks)
+            process_recurring_tasks(tasks, today, catch_up)
+            result["generated"] = len(tasks) - result["tasks"]
+    except Exception as exc:
+        result["error"] = f"{type(exc).__name__}: {exc}"
+    finally:
+        storage.clear_cache()  # Do not hold this file's tasks past the batch
+        storage.TASK_FILE, config.STORAGE_BACKEND = original_file, original_backend
+    result["seconds"] = time.perf_counter() - start
+    return result
+
+
+def process_files(paths, today=None, catch_up=None, workers=None, chunk_size=None):
+    """
+    Run the recurring pass over many task files on a process pool.
+
+    Files are handed to the ``workers`` processes (one per CPU by default)
+    in chunks of ``chunk_size`` to keep the per-file overhead low. Returns
+    a report with one result per file, in the order given, the files that
+    failed and the overall throughput.
+    """
+    paths = list(paths)
+    today = today or date.today()
+    if catch_up is None:
+        catch_up = config.RECURRING_CATCH_UP
+    workers = workers or os.cpu_count() or 1
+    if chunk_size is None:
+        chunk_size = max(1, len(paths) // (workers * 4))
+    run = partial(
+        process_file, today=today, catch_up=catch_up, backend=config.STORAGE_BACKEND
+    )
+    start = time.perf_counter()
+    if workers == 1 or len(paths) < 2:
+        results = [run(path) for path in paths]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(run, paths, chunksize=chunk_size))
+    seconds = time.perf_counter() - start
+    tasks = sum(result["tasks"] for result in results)
+    return {
+        "files": len(results),
+        "tasks": tasks,
+        "generated": sum(result["generated"] for result in results),
+        "errors": [result for result in results if result["error"]],
+        "seconds": seconds,
+        "files_per_second": len(results) / seconds if seconds else 0.0,
+        "tasks_per_second": tasks / seconds if seconds else 0.0,
+        "results": results,
+    }
@@ -0,0 +1,38 @@
+"""Compare strptime with dates.parse_date on a realistic mix of due dates."""
+
+import os
+import sys
+import timeit
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from dates import parse_date  # noqa: E402
+
+# 100k due dates drawn from one year, so values repeat like real task lists.
+DUE_DATES = [str(date(2025, 1, 1) + timedelta(days=i % 365)) for i in range(100_000)]
+
+
+def with_strptime():
+    for text in DUE_DATES:
+        datetime.strptime(text, "%Y-%m-%d").date()
+
+
+def with_parse_date():
+    for text in DUE_DATES:
+        parse_date(text)
+
+
+def with_parse_date_uncached():
+    for text in DUE_DATES:
+        parse_date.__wrapped__(text)
+
+
+def main():
+    for func in (with_strptime, with_parse_date_uncached, with_parse_date):
+        seconds = min(timeit.repeat(func, number=1, repeat=5))
+        print(f"{func.__name__:28} {seconds * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
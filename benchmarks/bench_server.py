@@ -0,0 +1,71 @@
+"""Compare requests per second through the task server with one process per call."""
+
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+
+from server import Client  # noqa: E402
+
+SERVER_REQUESTS = 2000
+PROCESS_REQUESTS = 50
+CLIENTS = 4
+
+
+def per_process(directory):
+    """Add tasks by starting a fresh interpreter for each one."""
+    start = time.perf_counter()
+    for i in range(PROCESS_REQUESTS):
+        subprocess.run(
+            [
+                sys.executable,
+                "-c",
+                f"import tasks; tasks.add_task('Process {i}', 'LOW')",
+            ],
+            cwd=directory,
+            env={**os.environ, "PYTHONPATH": ROOT},
+            check=True,
+        )
+    return PROCESS_REQUESTS / (time.perf_counter() - start)
+
+
+def through_server(directory):
+    """Add and view tasks over a few concurrent server connections."""
+    address = os.path.join(directory, "todo.sock")
+    process = subprocess.Popen(
+        [sys.executable, os.path.join(ROOT, "todo.py"), "serve", address],
+        cwd=directory,
+        stdout=subprocess.DEVNULL,
+    )
+    try:
+        while not os.path.exists(address):
+            time.sleep(0.01)
+        clients = [Client(address) for _ in range(CLIENTS)]
+        start = time.perf_counter()
+        for i in range(SERVER_REQUESTS):
+            client = clients[i % CLIENTS]
+            if i % 10:
+                client.request("add", task=f"Server {i}", priority="LOW")
+            else:
+                client.request("view", limit=20)
+        elapsed = time.perf_counter() - start
+        for client in clients:
+            client.close()
+    finally:
+        process.terminate()
+        process.wait()
+    return SERVER_REQUESTS / elapsed
+
+
+def main():
+    for func in (per_process, through_server):
+        with tempfile.TemporaryDirectory() as directory:
+            print(f"{func.__name__:16} {func(directory):10.1f} requests/s")
+
+
+if __name__ == "__main__":
+    main()
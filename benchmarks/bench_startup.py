@@ -0,0 +1,51 @@
+"""Time command-line startup, with and without loading the task file."""
+
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+RUNS = 10
+TASKS = 10_000
+
+COMMANDS = {
+    # Importing the task API no longer reads the task file.
+    "import tasks": ["-c", "import tasks"],
+    # What every import used to cost: the import plus a full load.
+    "import tasks + load": ["-c", "import tasks; tasks._store()"],
+    "todo.py --help": [os.path.join(ROOT, "todo.py"), "--help"],
+    "todo.py list --limit 10": [os.path.join(ROOT, "todo.py"), "list", "--limit", "10"],
+    "todo.py add": [os.path.join(ROOT, "todo.py"), "add", "Bench task"],
+}
+
+
+def startup(args, directory):
+    """Return the fastest wall time of RUNS runs of ``python *args``."""
+    best = float("inf")
+    for _ in range(RUNS):
+        start = time.perf_counter()
+        subprocess.run(
+            [sys.executable, *args],
+            cwd=directory,
+            env={**os.environ, "PYTHONPATH": ROOT},
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        with open(os.path.join(directory, "task.txt"), "w") as file:
+            file.writelines(f"[LOW] Task {i} (Due: 2030-01-01)\n" for i in range(TASKS))
+        baseline = startup(["-c", "pass"], directory)
+        print(f"{'python -c pass':26} {baseline * 1000:8.1f} ms")
+        for name, args in COMMANDS.items():
+            print(f"{name:26} {startup(args, directory) * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
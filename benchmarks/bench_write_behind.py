@@ -0,0 +1,74 @@
+"""Compare per-edit latency of saving every edit with write-behind saving."""
+
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+
+import config  # noqa: E402
+import storage  # noqa: E402
+import tasks  # noqa: E402
+from synthetic import generate_tasks  # noqa: E402
+
+EDITS = 500
+SIZES = (100, 10_000)
+
+
+def edit(count):
+    """Add ``count`` tasks and raise each one's priority, timing each call."""
+    latencies = []
+    for i in range(count):
+        for call in (
+            lambda: tasks.add_task(f"Edit {i}", "LOW"),
+            lambda: tasks.update_task(f"Edit {i}", "HIGH"),
+        ):
+            start = time.perf_counter()
+            call()
+            latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def run(size, durability, write_behind):
+    """Return (mean, p99) seconds per edit and the number of saves."""
+    config.DURABILITY = durability
+    storage.write_tasks(generate_tasks(size))
+    tasks.tasks = None
+    saves = []
+    original_write = tasks.write_tasks
+    tasks.write_tasks = lambda task_list: saves.append(original_write(task_list))
+    try:
+        if write_behind:
+            tasks.enable_write_behind(config.WRITE_BEHIND_DIRTY)
+        latencies = edit(EDITS // 2)
+        tasks.disable_write_behind()
+    finally:
+        tasks.write_tasks = original_write
+    latencies.sort()
+    mean = sum(latencies) / len(latencies)
+    return mean, latencies[int(len(latencies) * 0.99)], len(saves)
+
+
+def main():
+    original = storage.TASK_FILE, config.DURABILITY
+    print(f"{'tasks':>7} {'durability':10} {'mode':13} {'mean':>9} {'p99':>9} saves")
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            storage.TASK_FILE = os.path.join(directory, "task.txt")
+            for size in SIZES:
+                for durability in storage.DURABILITY_LEVELS:
+                    for write_behind in (False, True):
+                        mean, p99, saves = run(size, durability, write_behind)
+                        mode = "write-behind" if write_behind else "every edit"
+                        print(
+                            f"{size:>7,} {durability:10} {mode:13}"
+                            f" {mean * 1000:7.3f}ms {p99 * 1000:7.3f}ms {saves:5}"
+                        )
+    finally:
+        storage.TASK_FILE, config.DURABILITY = original
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+"""
+Time the task operations at several list sizes and save the results as JSON.
+
+    python benchmarks/suite.py                      # 1k, 10k and 100k tasks
+    python benchmarks/suite.py --scales 1000 1000000 --output head.json
+    python benchmarks/suite.py --compare base.json head.json
+
+Each operation runs against a synthetic task file in a temporary directory.
+Times are the fastest of several repeats; peak memory is measured with
+tracemalloc in a separate run, since tracing slows the code down.
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date, datetime
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+
+import recurring  # noqa: E402
+import storage  # noqa: E402
+import tasks  # noqa: E402
+from synthetic import generate_tasks  # noqa: E402
+
+SCALES = (1_000, 10_000, 100_000)
+TODAY = date.today()  # view_tasks always schedules against the real date
+
+
+def _reset(task_list):
+    """Write ``task_list`` as the task file and drop every in-memory cache."""
+    for path in (storage.TASK_FILE, recurring.state_path()):
+        if os.path.exists(path):
+            os.remove(path)
+    storage.write_tasks(task_list)
+    storage.clear_cache()
+    tasks.tasks = None
+    recurring._scheduler = recurring.RecurringScheduler()
+
+
+def cases(task_list):
+    """
+    Yield (operation, setup, run) triples for one task list.
+
+    ``setup`` restores the starting state before each repeat and is not
+    timed. Mutations target a task in the middle of the list.
+    """
+    middle = task_list[len(task_list) // 2]
+    name = middle.partition("] ")[2].partition(" (Due:")[0]
+    fragment = name.split()[-1]  # The unique number, matched as a substring
+
+    def loaded():
+        _reset(task_list)
+        # Bring overdue recurring tasks up to date so a view has nothing to do.
+        recurring.process_recurring_tasks(today=TODAY, catch_up=True)
+        tasks.view_tasks()
+
+    yield "write_tasks", lambda: None, lambda: storage.write_tasks(task_list)
+    yield "load_tasks", lambda: _reset(task_list), storage.load_tasks
+    yield "view_tasks (cold)", lambda: _reset(task_list), tasks.view_tasks
+    yield "view_tasks (warm)", loaded, tasks.view_tasks
+    yield "add_task", loaded, lambda: tasks.add_task("Benchmark task", "HIGH")
+    yield "remove_task", loaded, lambda: tasks.remove_task(name)
+    yield "remove_task (substring)", loaded, lambda: tasks.remove_task(fragment)
+    yield "update_task", loaded, lambda: tasks.update_task(name, "URGENT")
+    yield "process_recurring_tasks", lambda: _reset(
+        task_list
+    ), lambda: recurring.process_recurring_tasks(today=TODAY)
+
+
+def measure(setup, run, repeat):
+    """Return (fastest seconds, peak traced bytes) for ``run``."""
+    best = float("inf")
+    for _ in range(repeat):
+        setup()
+        start = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - start)
+    setup()
+    tracemalloc.start()
+    try:
+        run()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return best, peak
+
+
+def run_suite(scales):
+    """Run every case at every scale and return the result records."""
+    results = []
+    original_file = storage.TASK_FILE
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            storage.TASK_FILE = os.path.join(directory, "task.txt")
+            for scale in scales:
+                task_list = generate_tasks(scale, today=TODAY)
+                repeat = max(1, min(5, 1_000_000 // (scale * 10)))
+                for operation, setup, run in cases(task_list):
+                    seconds, peak = measure(setup, run, repeat)
+                    results.append(
+                        {
+                            "operation": operation,
+                            "scale": scale,
+                            "seconds": seconds,
+                            "peak_bytes": peak,
+                        }
+                    )
+                    print(
+                        f"{scale:>9,} {operation:26} {seconds * 1000:10.2f} ms"
+                        f" {peak / 2**20:9.1f} MiB"
+                    )
+    finally:
+        storage.TASK_FILE = original_file
+    return results
+
+
+def _commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(base_path, head_path):
+    """Print the head/base time and memory ratios of two result files."""
+    with open(base_path) as file:
+        base = {(r["operation"], r["scale"]): r for r in json.load(file)["results"]}
+    with open(head_path) as file:
+        head = json.load(file)["results"]
+    print(f"{'scale':>9} {'operation':26} {'time':>8} {'memory':>8}")
+    for record in head:
+        before = base.get((record["operation"], record["scale"]))
+        if before is None:
+            continue
+        time_ratio = record["seconds"] / before["seconds"]
+        memory_ratio = record["peak_bytes"] / max(before["peak_bytes"], 1)
+        print(
+            f"{record['scale']:>9,} {record['operation']:26}"
+            f" {time_ratio:7.2f}x {memory_ratio:7.2f}x"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--scales", type=int, nargs="+", default=SCALES)
+    parser.add_argument("--output", default="benchmark-results.json")
+    parser.add_argument("--compare", nargs=2, metavar=("BASE", "HEAD"))
+    args = parser.parse_args()
+    if args.compare:
+        compare(*args.compare)
+        return
+    results = run_suite(args.scales)
+    report = {
+        "commit": _commit(),
+        "python": platform.python_version(),
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "results": results,
+    }
+    with open(args.output, "w") as file:
+        json.dump(report, file, indent=2)
+    print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+"""Generate synthetic task lists with a realistic mix of fields."""
+
+import random
+from datetime import date, timedelta
+
+from config import VALID_PRIORITIES, VALID_RECURRENCES
+from format import Task
+
+WORDS = (
+    "call email review write fix plan buy pay book ship test deploy clean "
+    "update report invoice meeting groceries rent budget slides release "
+    "dentist car insurance taxes backup server garden laundry project"
+).split()
+
+PRIORITY_WEIGHTS = (1, 3, 4, 2)  # URGENT, HIGH, MEDIUM, LOW
+DUE_FRACTION = 0.6  # Tasks with a due date
+RECURRING_FRACTION = 0.1  # Tasks with a due date that also recur
+RECURRENCE_WEIGHTS = (5, 3, 2)  # daily, weekly, monthly
+
+
+def generate_tasks(count, seed=0, today=date(2025, 1, 1)):
+    """
+    Return ``count`` distinct task strings, the same ones for the same seed.
+
+    Due dates spread from 60 days before ``today`` to a year after it, so
+    some recurring tasks are overdue when the list is first viewed.
+    """
+    rng = random.Random(seed)
+    tasks = []
+    for i in range(count):
+        name = f"{' '.join(rng.choices(WORDS, k=rng.randint(1, 3))).capitalize()} {i}"
+        priority = rng.choices(VALID_PRIORITIES, PRIORITY_WEIGHTS)[0]
+        due = recurring = None
+        if rng.random() < DUE_FRACTION:
+            due = str(today + timedelta(days=rng.randint(-60, 365)))
+            if rng.random() < RECURRING_FRACTION:
+                recurring = rng.choices(VALID_RECURRENCES, RECURRENCE_WEIGHTS)[0]
+                if recurring == "monthly" and int(due[-2:]) > 28:
+                    # recurring.advance() needs the day to exist every month.
+                    due = due[:-2] + "28"
+        tasks.append(str(Task(priority, name, due, recurring)))
+    return tasks
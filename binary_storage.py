@@ -0,0 +1,221 @@
+import mmap
+import os
+import struct
+import sys
+from datetime import date
+import config
+import storage
+from config import VALID_PRIORITIES, VALID_RECURRENCES
+from dates import parse_date
+from format import Task, format_task
+from journal import diff
+
+# File layout:
+#   header   magic, version, record size, record count, record capacity
+#   records  ``capacity`` fixed-size slots, ``count`` of them in use
+#   strings  UTF-8 task names, appended at the end of the file
+MAGIC = b"TODB"
+VERSION = 1
+HEADER = struct.Struct("<4sHHII")
+# priority code, recurrence code (0 = none), flags, due ordinal (0 = none),
+# name offset, name length
+RECORD = struct.Struct("<BBBxIQI")
+DELETED = 1
+MIN_CAPACITY = 64
+
+_state = {}  # path -> (file id, tasks, record slots)
+
+
+def _file_id(path):
+    st = os.stat(path)
+    return (st.st_ino, st.st_size, st.st_mtime_ns)
+
+
+def _record_offset(slot):
+    return HEADER.size + slot * RECORD.size
+
+
+def encode_task(task):
+    """
+    Split a task string into (priority code, due ordinal, recurrence code, name).
+
+    Raises ValueError for strings that the binary format cannot reproduce.
+    """
+    record = Task.parse(task)
+    if format_task(record.name, record.priority, record.due, record.recurring) != task:
+        raise ValueError(f"Task cannot be stored in binary format: {task}")
+    due = parse_date(record.due).toordinal() if record.due else 0
+    recurrence = (
+        VALID_RECURRENCES.index(record.recurring) + 1 if record.recurring else 0
+    )
+    return VALID_PRIORITIES.index(record.priority), due, recurrence, record.name
+
+
+def decode_task(priority, due, recurrence, name):
+    """Build the task string for a binary record."""
+    return str(
+        Task(
+            VALID_PRIORITIES[priority],
+            name,
+            str(date.fromordinal(due)) if due else None,
+            VALID_RECURRENCES[recurrence - 1] if recurrence else None,
+        )
+    )
+
+
+def _read_record(mm, slot):
+    return RECORD.unpack_from(mm, _record_offset(slot))
+
+
+def _iter_records(path):
+    try:
+        file = open(path, "rb")
+    except FileNotFoundError:
+        return
+    with file:
+        if os.fstat(file.fileno()).st_size == 0:
+            return
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            magic, version, _, count, _ = HEADER.unpack_from(mm, 0)
+            if magic != MAGIC or version != VERSION:
+                raise ValueError(f"Not a binary task file: {path}")
+            for slot in range(count):
+                priority, recurrence, flags, due, offset, length = _read_record(
+                    mm, slot
+                )
+                if flags & DELETED:
+                    continue
+                name = mm[offset : offset + length].decode("utf-8")
+                yield slot, decode_task(priority, due, recurrence, name)
+
+
+def load(path):
+    """Load tasks from a binary task file through mmap."""
+    tasks, slots = [], []
+    for slot, task in _iter_records(path):
+        tasks.append(task)
+        slots.append(slot)
+    if os.path.exists(path):
+        _state[path] = (_file_id(path), tasks, slots)
+    return list(tasks)
+
+
+def iter_tasks(path):
+    """Yield task strings one record at a time, without building a list."""
+    for _, task in _iter_records(path):
+        yield task
+
+
+def write_file(path, tasks, capacity=None):
+    """Write ``tasks`` to a fresh binary file, replacing ``path`` atomically."""
+    records = [encode_task(task) for task in tasks]
+    capacity = max(capacity or 0, MIN_CAPACITY, 2 * len(records))
+    offset = HEADER.size + capacity * RECORD.size
+    packed, names = [], []
+    for priority, due, recurrence, name in records:
+        data = name.encode("utf-8")
+        packed.append(RECORD.pack(priority, recurrence, 0, due, offset, len(data)))
+        names.append(data)
+        offset += len(data)
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as file:
+        file.write(HEADER.pack(MAGIC, VERSION, RECORD.size, len(records), capacity))
+        file.writelines(packed)
+        file.write(bytes((capacity - len(records)) * RECORD.size))
+        file.writelines(names)
+        storage.sync(file)
+    os.replace(tmp, path)
+    storage.sync_dir(path)
+    _state[path] = (_file_id(path), list(tasks), list(range(len(records))))
+
+
+def write(path, tasks):
+    """
+    Persist ``tasks``, touching only the records that changed.
+
+    Replacements overwrite their record in place, deletions set a tombstone
+    flag and appends fill spare slots; the file is only rewritten when it
+    runs out of slots or the change is too large to apply piecemeal.
+    """
+    tasks = list(tasks)
+    cached = _state.get(path)
+    if not os.path.exists(path) or os.path.getsize(path) == 0:
+        write_file(path, tasks)
+        return
+    if cached is None or cached[0] != _file_id(path):
+        load(path)
+        cached = _state[path]
+    _, old, slots = cached
+    changes = diff(old, tasks)
+    if changes is None or len(changes) > max(16, len(tasks) // 4):
+        write_file(path, tasks)
+        return
+
+    with open(path, "r+b") as file:
+        _, _, _, count, capacity = HEADER.unpack(file.read(HEADER.size))
+        if count + sum(op == "+" for op, _, _ in changes) > capacity:
+            write_file(path, tasks, capacity * 2)
+            return
+        slots = list(slots)
+        end = file.seek(0, os.SEEK_END)
+        patches, names = [], []
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            for op, index, task in changes:
+                if op == "-":
+                    slot = slots.pop(index)
+                    patches.append((slot, None))
+                    continue
+                priority, due, recurrence, name = encode_task(task)
+                data = name.encode("utf-8")
+                offset = None
+                if op == "+":
+                    slot = count
+                    count += 1
+                    slots.append(slot)
+                else:
+                    slot = slots[index]
+                    _, _, _, _, old_offset, length = _read_record(mm, slot)
+                    if mm[old_offset : old_offset + length] == data:
+                        offset = old_offset  # Same name: reuse its string
+                if offset is None:
+                    offset = end
+                    end += len(data)
+                    names.append(data)
+                patches.append(
+                    (slot, (priority, recurrence, 0, due, offset, len(data)))
+                )
+        # New names go to the end of the string table before any record
+        # points at them; the mapping cannot grow, so they go through the file.
+        file.writelines(names)
+        storage.sync(file)
+        with mmap.mmap(file.fileno(), 0) as mm:
+            for slot, fields in patches:
+                if fields is None:
+                    # Tombstone: flip the flag byte and leave the rest alone.
+                    mm[_record_offset(slot) + 2] |= DELETED
+                else:
+                    RECORD.pack_into(mm, _record_offset(slot), *fields)
+            HEADER.pack_into(mm, 0, MAGIC, VERSION, RECORD.size, count, capacity)
+            if config.DURABILITY != "none":
+                mm.flush()  # msync, so the patched records reach the disk too
+    _state[path] = (_file_id(path), tasks, slots)
+
+
+def to_binary(src, dst):
+    """Convert a text task file to the binary format."""
+    with open(src, "r") as file:
+        write_file(dst, [line.strip() for line in file if line.strip()])
+
+
+def to_text(src, dst):
+    """Convert a binary task file back to the text format."""
+    tasks = load(src)
+    with open(dst, "w") as file:
+        file.writelines(f"{task}\n" for task in tasks)
+
+
+if __name__ == "__main__":
+    # Usage: python binary_storage.py to-binary|to-text SRC DST
+    if len(sys.argv) != 4 or sys.argv[1] not in ("to-binary", "to-text"):
+        sys.exit("Usage: python binary_storage.py to-binary|to-text SRC DST")
+    (to_binary if sys.argv[1] == "to-binary" else to_text)(sys.argv[2], sys.argv[3])
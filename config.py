@@ -2,3 +2,59 @@
 TASK_FILE = "task.txt"
 VALID_PRIORITIES = ["URGENT", "HIGH", "MEDIUM", "LOW"]
 VALID_RECURRENCES = ["daily", "weekly", "monthly"]  # Define valid recurring values
+
+# Storage backend used by storage.py: "text" rewrites TASK_FILE on every save
+# that does more than add tasks, which are appended,
+# "journal" appends changes to TASK_FILE.journal and compacts in the background,
+# "binary" keeps TASK_FILE as fixed-size records patched in place via mmap,
+# "sqlite" keeps TASK_FILE as an indexed SQLite database in WAL mode,
+# "sharded" splits tasks over files in TASK_FILE.shards/ loaded in parallel,
+# keeping insertion order only within each shard.
+STORAGE_BACKEND = "text"
+JOURNAL_COMPACT_BYTES = 1024 * 1024  # Compact once the journal grows past this
+# How hard a save makes sure tasks reached the disk before returning:
+# "none" leaves the data to the OS cache (a crash may lose recent saves),
+# "flush" fsyncs the new file before renaming it into place (a crash leaves
+# the old or the new tasks, never a torn file), and "fsync" also fsyncs the
+# directory so the rename itself survives a power loss. Backends that update
+# files in place follow it too: "flush" and "fsync" fsync journal appends and
+# msync/fsync binary record patches, and set SQLite's synchronous pragma to
+# NORMAL and FULL ("none" sets it to OFF).
+DURABILITY = "flush"
+
+# Write-behind: mutations update the in-memory tasks at once and are saved
+# together, after WRITE_BEHIND_INTERVAL seconds, once WRITE_BEHIND_DIRTY are
+# pending, or at exit. Fast for scripts making many edits, but a crash loses
+# the pending ones, and a concurrent process's writes in that window are lost.
+WRITE_BEHIND = False
+WRITE_BEHIND_INTERVAL = 1.0
+WRITE_BEHIND_DIRTY = 100
+
+# Undo history: how many operations can be undone, and whether the history
+# is kept in TASK_FILE.history so that it outlives the process.
+HISTORY_SIZE = 100
+HISTORY_PERSIST = True
+
+# Compression of the monthly archive segments of completed and superseded
+# tasks in TASK_FILE.archive/: "gzip", or "lzma" for smaller, slower files.
+ARCHIVE_COMPRESSION = "gzip"
+
+SHARD_BY = "priority"  # New shard layouts: "priority" or "hash" of the task name
+SHARD_COUNT = 16  # Shards of the "hash" layout
+SHARD_LOAD_WORKERS = 8  # Threads reading shards in parallel
+
+# When True, a view generates every missed occurrence of an overdue recurring
+# task at once instead of advancing it one step per view.
+RECURRING_CATCH_UP = False
+
+READ_CHUNK_SIZE = 64 * 1024  # Characters per read when streaming TASK_FILE
+
+# "todo.py serve": where the server listens (a Unix socket path, or
+# "host:port" for TCP on localhost), and when it writes pending changes.
+SERVER_ADDRESS = "todo.sock"
+SERVER_FLUSH_INTERVAL = 1.0  # Seconds between write-behind flushes
+SERVER_FLUSH_DIRTY = 100  # Flush early once this many mutations are pending
+
+# When set, every todo.py command records call counts, latencies and I/O
+# volumes and writes them here: Prometheus text for a .prom file, else JSON.
+METRICS_FILE = None
@@ -0,0 +1,27 @@
+from datetime import date, datetime
+from functools import lru_cache
+
+DATE_FORMAT = "%Y-%m-%d"
+
+
+@lru_cache(maxsize=4096)
+def parse_date(text):
+    """
+    Parse a YYYY-MM-DD date string, with the same validation as strptime.
+
+    Canonical zero-padded dates take a fast path that skips strptime; any
+    other spelling (such as "2025-5-1") is handed to strptime so accepted
+    and rejected inputs stay identical. Results are cached, since the same
+    due dates repeat across many tasks. Raises ValueError for invalid dates.
+    """
+    if (
+        len(text) == 10
+        and text[4] == "-"
+        and text[7] == "-"
+        and text.isascii()
+        and text[:4].isdigit()
+        and text[5:7].isdigit()
+        and text[8:].isdigit()
+    ):
+        return date(int(text[:4]), int(text[5:7]), int(text[8:]))
+    return datetime.strptime(text, DATE_FORMAT).date()
@@ -0,0 +1,77 @@
+import csv
+import json
+import os
+import sys
+from storage import iter_tasks
+from tasks import add_tasks
+
+FIELDS = ["task", "priority", "due_date", "recurring"]
+FORMATS = ("csv", "jsonl")
+
+
+def _format_for(path, fmt):
+    fmt = (fmt or os.path.splitext(path)[1].lstrip(".")).lower()
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown import/export format: {fmt}")
+    return fmt
+
+
+def read_rows(path, fmt=None):
+    """
+    Lazily yield task rows from a CSV or JSONL file.
+
+    CSV files need a header naming the FIELDS columns. A JSONL line that
+    cannot be decoded is yielded as a ValueError so it is reported as that
+    row's error instead of aborting the import.
+    """
+    fmt = _format_for(path, fmt)
+    with open(path, "r", newline="") as file:
+        if fmt == "csv":
+            yield from csv.DictReader(file)
+            return
+        for line in file:
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError:
+                yield ValueError("Malformed JSON line!")
+                continue
+            yield row if isinstance(row, dict) else ValueError("Row is not an object!")
+
+
+def import_tasks(path, fmt=None):
+    """Stream a CSV or JSONL file into the task list with a single write."""
+    return add_tasks(read_rows(path, fmt))
+
+
+def export_tasks(path, fmt=None):
+    """Stream every stored task to a CSV or JSONL file; return the row count."""
+    fmt = _format_for(path, fmt)
+    count = 0
+    with open(path, "w", newline="") as file:
+        writer = csv.writer(file) if fmt == "csv" else None
+        if writer:
+            writer.writerow(FIELDS)
+        for task in iter_tasks():
+            row = [task.name, task.priority, task.due, task.recurring]
+            if writer:
+                writer.writerow(["" if value is None else value for value in row])
+            else:
+                file.write(json.dumps(dict(zip(FIELDS, row))) + "\n")
+            count += 1
+    return count
+
+
+if __name__ == "__main__":
+    # Usage: python exchange.py import|export FILE [csv|jsonl]
+    if len(sys.argv) not in (3, 4) or sys.argv[1] not in ("import", "export"):
+        sys.exit("Usage: python exchange.py import|export FILE [csv|jsonl]")
+    fmt = sys.argv[3] if len(sys.argv) == 4 else None
+    if sys.argv[1] == "export":
+        print(f"✅ Exported {export_tasks(sys.argv[2], fmt)} tasks.")
+    else:
+        report = import_tasks(sys.argv[2], fmt)
+        for number, message in report["errors"]:
+            print(f"⚠ Row {number}: {message}")
+        print(f"✅ Imported {report['added']} tasks.")
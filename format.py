@@ -1,7 +1,72 @@
-from datetime import datetime
+from dates import parse_date
 from config import VALID_PRIORITIES, VALID_RECURRENCES
 
 
+class Task:
+    """
+    A task parsed into its fields.
+
+    The task string "[PRIORITY] Name (Due: YYYY-MM-DD) [Recurring: type]" is
+    parsed once by ``Task.parse`` and serialized once by ``str()``; the text
+    is cached, so writing a task that was never changed returns the original
+    string unchanged. Tasks are treated as immutable: use ``replace`` to
+    derive an updated copy.
+    """
+
+    __slots__ = ("priority", "name", "due", "recurring", "_text")
+
+    def __init__(self, priority, name, due=None, recurring=None):
+        self.priority = priority
+        self.name = name
+        self.due = due  # ISO date string, or None
+        self.recurring = recurring
+        self._text = None
+
+    @classmethod
+    def parse(cls, text):
+        """Parse a task string without validating its fields."""
+        head, found, recurring = text.partition("[Recurring:")
+        recurring = recurring.rstrip("] ").strip() if found else None
+        if found:
+            head = head.rstrip()
+        head, found, due = head.partition(" (Due:")
+        due = due.strip().rstrip(")").strip() if found else None
+        priority, found, name = head.partition("] ")
+        if not (found and priority.startswith("[")):
+            priority, name = "", head
+        task = cls(priority[1:] if priority else "", name, due, recurring)
+        task._text = text
+        return task
+
+    def __str__(self):
+        if self._text is None:
+            text = f"[{self.priority}] {self.name}"
+            if self.due:
+                text += f" (Due: {self.due})"
+            if self.recurring:
+                text += f" [Recurring: {self.recurring}]"
+            self._text = text
+        return self._text
+
+    def __repr__(self):
+        return f"Task({str(self)!r})"
+
+    def __eq__(self, other):
+        if not isinstance(other, Task):
+            return NotImplemented
+        return str(self) == str(other)
+
+    def __hash__(self):
+        return hash(str(self))
+
+    def replace(self, **fields):
+        """Return a copy with some fields changed."""
+        task = Task(self.priority, self.name, self.due, self.recurring)
+        for field, value in fields.items():
+            setattr(task, field, value)
+        return task
+
+
 def format_task(task, priority, due_date=None, recurring=None):
     """Format a task string with priority, due date, and recurrence."""
 
@@ -11,20 +76,21 @@ def format_task(task, priority, due_date=None, recurring=None):
     if not task.strip():  # Fix: Ensure no blank or whitespace-only names
         return None
 
-    priority = priority.upper()  # Normalize priority input
+    if "\n" in task or "\r" in task:  # One task per line in the task file
+        return None
 
-    formatted_task = f"[{priority}] {task}"
+    priority = priority.upper()  # Normalize priority input
 
+    due = None
     if due_date:
         try:
-            due_date_parsed = datetime.strptime(due_date, "%Y-%m-%d").date()
-            formatted_task += f" (Due: {due_date_parsed})"
+            due = str(parse_date(due_date))
         except ValueError:
             return None  # Invalid date format handling
 
     if recurring:
         if recurring.lower() not in VALID_RECURRENCES:  # Fix: Validate recurring input
             return None
-        formatted_task += f" [Recurring: {recurring.lower()}]"
+        recurring = recurring.lower()
 
-    return formatted_task
+    return str(Task(priority, task, due, recurring or None))
@@ -0,0 +1,175 @@
+import json
+import os
+from collections import deque
+import config
+import storage
+
+# Each history entry is the list of changes one operation made, as deltas
+# small enough to store instead of copies of the task list:
+#   ["+", task]       the task was added
+#   ["-", task]       the task was removed
+#   ["=", old, new]   the task ``old`` was replaced by ``new``
+#
+# The history file is a log of lines appended as the history changes:
+#   "+ <entry as JSON>"  an operation was recorded
+#   "u"                  the latest operation was undone
+#   "r"                  the latest undone operation was redone
+#   "d"                  the latest operation was dropped: it no longer applies
+#   "D"                  the latest undone operation was dropped
+
+
+def history_path(path):
+    """Return the history file that belongs to a task file."""
+    return f"{path}.history"
+
+
+def invert(changes):
+    """Return the changes that take the tasks back to before ``changes``."""
+    inverse = []
+    for change in reversed(changes):
+        if change[0] == "+":
+            inverse.append(["-", change[1]])
+        elif change[0] == "-":
+            inverse.append(["+", change[1]])
+        else:
+            inverse.append(["=", change[2], change[1]])
+    return inverse
+
+
+def apply(store, changes):
+    """
+    Apply ``changes`` to a task store.
+
+    Returns False, leaving the store untouched, when the tasks no longer
+    match: a task to remove or replace is gone, or one to add is back.
+    """
+    for change in changes:
+        if (change[0] == "+") == (change[1] in store):
+            return False
+        if change[0] == "=" and change[2] in store:
+            return False
+    for change in changes:
+        if change[0] == "+":
+            store.add(change[1])
+        elif change[0] == "-":
+            store.remove(store.find_text(change[1]))
+        else:
+            store.replace(store.find_text(change[1]), change[2])
+    return True
+
+
+class History:
+    """
+    Bounded undo and redo stacks of change lists.
+
+    Both stacks are ring buffers holding the latest ``size`` entries, so
+    recording, undoing and redoing a step are O(1) whatever the number of
+    tasks. Steps take effect in memory at once but are only kept by
+    ``commit``, called once the tasks they describe are saved; ``discard``
+    forgets them when saving failed. With a ``path`` committed steps are
+    appended to that file, which is reread when another process changed it
+    and compacted once it holds more than twice as many lines as entries.
+    """
+
+    def __init__(self, path=None, size=None):
+        self.path = path
+        self.size = size or config.HISTORY_SIZE
+        self.done = deque(maxlen=self.size)
+        self.undone = deque(maxlen=self.size)
+        self._lines = 0
+        self._signature = None
+        self._pending = []  # Log lines of the steps not committed yet
+        self._saved = None  # (done, undone, lines) before the first of them
+
+    def _stat(self):
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return (st.st_ino, st.st_size, st.st_mtime_ns)
+
+    def refresh(self):
+        """Reread the history file if it changed since this process used it."""
+        if self.path is None or self._pending or self._stat() == self._signature:
+            return
+        self.done.clear()
+        self.undone.clear()
+        self._lines = 0
+        try:
+            with open(self.path, "r") as file:
+                for line in file:
+                    self._replay(line.rstrip("\n"))
+        except FileNotFoundError:
+            pass
+        self._signature = self._stat()
+
+    def _replay(self, line):
+        if line.startswith("+ "):
+            self.done.append(json.loads(line[2:]))
+            self.undone.clear()
+        elif line == "u" and self.done:
+            self.undone.append(self.done.pop())
+        elif line == "r" and self.undone:
+            self.done.append(self.undone.pop())
+        elif line == "d" and self.done:
+            self.done.pop()
+        elif line == "D" and self.undone:
+            self.undone.pop()
+        self._lines += 1
+
+    def _log(self, line):
+        if self._saved is None:
+            self._saved = (list(self.done), list(self.undone), self._lines)
+        self._replay(line)
+        self._pending.append(line)
+
+    def commit(self):
+        """Keep the steps taken since the last commit, writing them to the file."""
+        lines, self._pending, self._saved = self._pending, [], None
+        if self.path is None or not lines:
+            return
+        if self._lines > 2 * self.size:
+            self.compact()
+            return
+        with open(self.path, "a") as file:
+            file.writelines(f"{line}\n" for line in lines)
+        self._signature = self._stat()
+
+    def discard(self):
+        """Forget the steps taken since the last commit."""
+        if self._saved is None:
+            return
+        done, undone, self._lines = self._saved
+        self.done.clear()
+        self.done.extend(done)
+        self.undone.clear()
+        self.undone.extend(undone)
+        self._pending, self._saved = [], None
+
+    def compact(self):
+        """Rewrite the history file with only the entries still held."""
+        # Undone entries are replayed as recorded, then undone again, most
+        # recently undone last so that it is the first to be redone.
+        entries = list(self.done) + list(reversed(self.undone))
+        lines = [f"+ {json.dumps(entry)}\n" for entry in entries]
+        lines += ["u\n"] * len(self.undone)
+        storage.atomic_write(self.path, lines)
+        self._lines = len(lines)
+        self._signature = self._stat()
+
+    def record(self, changes):
+        """Add the changes of a new operation; it can no longer be redone past."""
+        if changes:
+            self._log(f"+ {json.dumps(changes)}")
+
+    def mark_undone(self):
+        """Move the latest operation to the redo stack."""
+        self._log("u")
+
+    def mark_redone(self):
+        """Move the latest undone operation back to the undo stack."""
+        self._log("r")
+
+    def drop(self, undone=False):
+        """Forget the latest operation, or the latest undone one."""
+        self._log("D" if undone else "d")
@@ -0,0 +1,193 @@
+import os
+import threading
+import config
+
+# Journal records, one per line:
+#   "# base <snapshot id>"  header naming the snapshot the records apply to
+#   "+ <task>"              append a task
+#   "- <index>"             delete the task at index
+#   "= <index> <task>"      replace the task at index
+
+_lock = threading.RLock()
+_state = {}  # snapshot path -> (_disk_id(), task list) as last loaded or persisted
+_compactor = None
+
+
+def journal_path(path):
+    """Return the journal file that belongs to a snapshot file."""
+    return f"{path}.journal"
+
+
+def _snapshot_id(path):
+    """Identify the snapshot on disk so stale journals can be detected."""
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return "missing"
+    return f"{st.st_size} {st.st_mtime_ns}"
+
+
+def _disk_id(path):
+    """Identify the snapshot and journal on disk, to notice other writers."""
+    try:
+        st = os.stat(journal_path(path))
+    except FileNotFoundError:
+        return _snapshot_id(path), None
+    return _snapshot_id(path), st.st_size, st.st_mtime_ns
+
+
+def _read_snapshot(path):
+    try:
+        with open(path, "r") as file:
+            return [line.strip() for line in file]
+    except FileNotFoundError:
+        return []
+
+
+def _replay(tasks, lines):
+    for line in lines:
+        op, _, arg = line.rstrip("\n").partition(" ")
+        if op == "+":
+            tasks.append(arg)
+        elif op == "-":
+            del tasks[int(arg)]
+        elif op == "=":
+            index, _, task = arg.partition(" ")
+            tasks[int(index)] = task
+    return tasks
+
+
+def _read_header(path):
+    try:
+        with open(journal_path(path), "r") as file:
+            return file.readline()
+    except FileNotFoundError:
+        return None
+
+
+def load(path):
+    """Load tasks by replaying the journal on top of the snapshot."""
+    with _lock:
+        # Taken before reading: a write in between only causes another read.
+        disk_id = _disk_id(path)
+        tasks = _read_snapshot(path)
+        try:
+            with open(journal_path(path), "r") as file:
+                header = file.readline()
+                # A journal written against an older snapshot is already compacted.
+                if header == f"# base {_snapshot_id(path)}\n":
+                    _replay(tasks, file)
+        except FileNotFoundError:
+            pass
+        _state[path] = (disk_id, tasks)
+        return list(tasks)
+
+
+def diff(old, new):
+    """
+    Describe how ``old`` became ``new`` as a list of (op, index, task) tuples.
+
+    Appends ("+"), a single deletion ("-") and in-place replacements ("=")
+    are recognised; anything else returns None so the caller falls back to
+    rewriting everything.
+    """
+    if len(new) >= len(old) and new[: len(old)] == old:
+        return [("+", None, task) for task in new[len(old) :]]
+    if len(new) == len(old):
+        return [
+            ("=", i, task)
+            for i, (before, task) in enumerate(zip(old, new))
+            if before != task
+        ]
+    if len(new) == len(old) - 1:
+        i = next((i for i, task in enumerate(new) if task != old[i]), len(new))
+        if new[i:] == old[i + 1 :]:
+            return [("-", i, None)]
+    return None
+
+
+def _record(op, index, task):
+    if op == "+":
+        return f"+ {task}\n"
+    if op == "-":
+        return f"- {index}\n"
+    return f"= {index} {task}\n"
+
+
+def write(path, tasks):
+    """
+    Persist ``tasks`` by appending only what changed since the last write.
+
+    Appended records are synced to disk as config.DURABILITY asks.
+    """
+    import storage  # storage imports this module
+
+    tasks = list(tasks)
+    with _lock:
+        cached = _state.get(path)
+        if cached is not None and cached[0] == _disk_id(path):
+            old = cached[1]
+        else:
+            # Another process wrote since: records must index what is on disk.
+            old = load(path)
+        changes = diff(old, tasks)
+        if changes is None or len(changes) > max(16, len(tasks) // 4):
+            _write_snapshot(path, tasks)
+            return
+        if not changes:
+            return
+        records = [_record(*change) for change in changes]
+        header = f"# base {_snapshot_id(path)}\n"
+        mode = "a"
+        if _read_header(path) != header:
+            # Missing or stale journal: start a new one against this snapshot.
+            records.insert(0, header)
+            mode = "w"
+        with open(journal_path(path), mode) as file:
+            file.writelines(records)
+            storage.sync(file)
+            size = file.tell()
+        if mode == "w":
+            storage.sync_dir(path)
+        _state[path] = (_disk_id(path), tasks)
+    if size > config.JOURNAL_COMPACT_BYTES:
+        compact_in_background(path)
+
+
+def _write_snapshot(path, tasks):
+    import storage  # storage imports this module
+
+    storage.atomic_write(path, (f"{task}\n" for task in tasks))
+    # Start a fresh journal; an interrupted compaction leaves the old journal
+    # behind, but its header no longer matches the new snapshot.
+    storage.atomic_write(journal_path(path), [f"# base {_snapshot_id(path)}\n"])
+    _state[path] = (_disk_id(path), tasks)
+
+
+def compact(path):
+    """
+    Fold the journal into a fresh snapshot.
+
+    Runs under the file lock and replays the files as they are on disk, so
+    records appended by other processes since this one last wrote are kept.
+    """
+    import storage  # storage imports this module
+
+    with storage.locked(path=path), _lock:
+        _write_snapshot(path, load(path))
+
+
+def compact_in_background(path):
+    """Start compaction on a worker thread unless one is already running."""
+    global _compactor
+    with _lock:
+        if _compactor is not None and _compactor.is_alive():
+            return
+        _compactor = threading.Thread(target=compact, args=(path,))
+        _compactor.start()
+
+
+def wait_for_compaction():
+    """Block until a running background compaction has finished."""
+    if _compactor is not None:
+        _compactor.join()
@@ -0,0 +1,267 @@
+import functools
+import inspect
+import json
+import os
+import sys
+import threading
+import time
+from bisect import bisect_left
+
+# Upper bounds, in seconds, of the latency histogram buckets.
+BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, float("inf"))
+MODULES = ("tasks", "recurring", "storage")
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+_lock = threading.Lock()
+_originals = {}  # qualified name -> original function, while enabled
+_calls = {}  # qualified name -> {"calls", "errors", "seconds", "buckets"}
+_counters = {"bytes_read": 0, "bytes_written": 0, "tasks_scanned": 0}
+
+
+def _task_bytes(tasks):
+    return sum(len(str(task)) + 1 for task in tasks)
+
+
+def _io_load(args, kwargs, result):
+    return {"bytes_read": _task_bytes(result), "tasks_scanned": len(result)}
+
+
+def _io_write(args, kwargs, result):
+    tasks = args[0] if args else kwargs["tasks"]
+    return {"bytes_written": _task_bytes(tasks)}
+
+
+# Counter increments for calls that move task text in or out of storage,
+# counted as the bytes of task text rather than bytes on disk. Streams
+# are counted per task as they are consumed, in _wrap_generator.
+IO = {
+    "storage.load_tasks": _io_load,
+    "storage.write_tasks": _io_write,
+}
+STREAMS = {"storage.iter_tasks"}
+
+
+def enabled():
+    """Return True while the public functions are instrumented."""
+    return bool(_originals)
+
+
+def _record(name, seconds, failed=False):
+    with _lock:
+        stats = _calls.get(name)
+        if stats is None:
+            stats = _calls[name] = {
+                "calls": 0,
+                "errors": 0,
+                "seconds": 0.0,
+                "buckets": [0] * len(BUCKETS),
+            }
+        stats["calls"] += 1
+        stats["errors"] += failed
+        stats["seconds"] += seconds
+        stats["buckets"][bisect_left(BUCKETS, seconds)] += 1
+
+
+def count(counter, amount=1):
+    """Add ``amount`` to one of the I/O counters."""
+    with _lock:
+        _counters[counter] = _counters.get(counter, 0) + amount
+
+
+def _wrap(name, func):
+    io = IO.get(name)
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            result = func(*args, **kwargs)
+        except BaseException:
+            _record(name, time.perf_counter() - start, failed=True)
+            raise
+        _record(name, time.perf_counter() - start)
+        if io is not None:
+            for counter, amount in io(args, kwargs, result).items():
+                count(counter, amount)
+        return result
+
+    return wrapper
+
+
+def _wrap_generator(name, func):
+    stream = name in STREAMS
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        # Time spent producing items only, not the consumer's work between them.
+        items = func(*args, **kwargs)
+        seconds, produced, size, failed = 0.0, 0, 0, False
+        try:
+            while True:
+                start = time.perf_counter()
+                try:
+                    item = next(items)
+                except StopIteration:
+                    seconds += time.perf_counter() - start
+                    break
+                except BaseException:
+                    seconds += time.perf_counter() - start
+                    failed = True
+                    raise
+                seconds += time.perf_counter() - start
+                produced += 1
+                if stream:
+                    size += len(str(item)) + 1
+                yield item
+        finally:
+            items.close()
+            _record(name, seconds, failed)
+            if stream:
+                count("tasks_scanned", produced)
+                count("bytes_read", size)
+
+    return wrapper
+
+
+def _public_functions(module):
+    for attr, value in vars(module).items():
+        if (
+            not attr.startswith("_")
+            and inspect.isfunction(value)
+            and value.__module__ == module.__name__
+        ):
+            yield attr, value
+
+
+def _project_modules():
+    """Yield the loaded top-level modules of this project."""
+    for module in list(sys.modules.values()):
+        path = getattr(module, "__file__", None)
+        if path and os.path.dirname(os.path.abspath(path)) == ROOT:
+            yield module
+
+
+def _rebind(replacements):
+    # Patch every module-level reference, including "from storage import ..."
+    # aliases held by other modules, so all callers go through the wrapper.
+    for module in _project_modules():
+        for attr, value in list(vars(module).items()):
+            if inspect.isfunction(value) and id(value) in replacements:
+                setattr(module, attr, replacements[id(value)])
+
+
+def enable():
+    """
+    Instrument the public functions of tasks, recurring and storage.
+
+    Until this is called nothing is wrapped, so disabled metrics cost
+    nothing at all.
+    """
+    if enabled():
+        return
+    import importlib
+
+    replacements = {}
+    for module_name in MODULES:
+        module = importlib.import_module(module_name)
+        for attr, func in _public_functions(module):
+            name = f"{module_name}.{attr}"
+            wrap = _wrap_generator if inspect.isgeneratorfunction(func) else _wrap
+            _originals[name] = func
+            replacements[id(func)] = wrap(name, func)
+    _rebind(replacements)
+
+
+def disable():
+    """Restore the original functions; recorded metrics are kept."""
+    _rebind({id(wrapper): func for wrapper, func in _wrappers()})
+    _originals.clear()
+
+
+def _wrappers():
+    for name, func in _originals.items():
+        module_name, _, attr = name.partition(".")
+        yield getattr(sys.modules[module_name], attr), func
+
+
+def reset():
+    """Clear every recorded metric."""
+    with _lock:
+        _calls.clear()
+        for counter in _counters:
+            _counters[counter] = 0
+
+
+def snapshot():
+    """Return the recorded metrics as a JSON-serializable dict."""
+    with _lock:
+        functions = {
+            name: {
+                "calls": stats["calls"],
+                "errors": stats["errors"],
+                "seconds": stats["seconds"],
+                "buckets": {
+                    str(bound): hits for bound, hits in zip(BUCKETS, stats["buckets"])
+                },
+            }
+            for name, stats in sorted(_calls.items())
+        }
+        return {"functions": functions, "counters": dict(_counters)}
+
+
+def to_prometheus():
+    """Return the recorded metrics in the Prometheus text exposition format."""
+    data = snapshot()
+    lines = [
+        "# HELP todo_calls_total Calls of instrumented functions.",
+        "# TYPE todo_calls_total counter",
+    ]
+    for name, stats in data["functions"].items():
+        lines.append(f'todo_calls_total{{function="{name}"}} {stats["calls"]}')
+    lines += [
+        "# HELP todo_errors_total Calls that raised an exception.",
+        "# TYPE todo_errors_total counter",
+    ]
+    for name, stats in data["functions"].items():
+        lines.append(f'todo_errors_total{{function="{name}"}} {stats["errors"]}')
+    lines += [
+        "# HELP todo_call_duration_seconds Latency of instrumented functions.",
+        "# TYPE todo_call_duration_seconds histogram",
+    ]
+    for name, stats in data["functions"].items():
+        cumulative = 0
+        for bound, hits in stats["buckets"].items():
+            cumulative += hits
+            le = "+Inf" if bound == "inf" else bound
+            lines.append(
+                f'todo_call_duration_seconds_bucket{{function="{name}",le="{le}"}}'
+                f" {cumulative}"
+            )
+        lines.append(
+            f'todo_call_duration_seconds_sum{{function="{name}"}} {stats["seconds"]}'
+        )
+        lines.append(
+            f'todo_call_duration_seconds_count{{function="{name}"}} {stats["calls"]}'
+        )
+    for counter, value in data["counters"].items():
+        lines += [
+            f"# TYPE todo_{counter}_total counter",
+            f"todo_{counter}_total {value}",
+        ]
+    return "\n".join(lines) + "\n"
+
+
+def export(path):
+    """
+    Write the metrics to ``path``: Prometheus text for a .prom file, JSON
+    otherwise. The file is replaced atomically so a scraper never reads a
+    partial snapshot.
+    """
+    if path.endswith(".prom"):
+        text = to_prometheus()
+    else:
+        text = json.dumps(snapshot(), indent=2) + "\n"
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w") as file:
+        file.write(text)
+    os.replace(tmp, path)
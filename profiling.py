@@ -0,0 +1,102 @@
+import time
+from contextlib import contextmanager
+
+# Wall time per phase of the profiled command, or None when not profiling.
+_phases = None
+_open = []  # [name, start] of the phases entered and not left, innermost last
+
+PHASES = ("load", "recurring", "sort", "render")
+
+
+@contextmanager
+def phase(name):
+    """
+    Add the time spent in the block to phase ``name`` while profiling.
+
+    Phases are exclusive: time spent in a phase nested inside another one
+    only counts for the inner phase, so the phases add up to the total.
+    """
+    if _phases is None:
+        yield
+        return
+    now = time.perf_counter()
+    _switch(now)
+    _open.append([name, now])
+    try:
+        yield
+    finally:
+        now = time.perf_counter()
+        _switch(now)
+        _open.pop()
+        if _open:
+            _open[-1][1] = now  # The outer phase resumes
+
+
+def _switch(now):
+    # Credit the innermost open phase with the time since it last resumed.
+    if _open:
+        name, start = _open[-1]
+        _phases[name] = _phases.get(name, 0.0) + now - start
+        _open[-1][1] = now
+
+
+def profile(run, path, title="", top=25):
+    """
+    Call ``run()`` under cProfile and tracemalloc and write a report to ``path``.
+
+    The report lists the wall time per phase (load, recurring, sort,
+    render), the ``top`` functions by cumulative time and the ``top``
+    allocation sites still holding memory at the end of the run. Returns
+    what ``run`` returned.
+    """
+    import cProfile
+    import io
+    import platform
+    import pstats
+    import tracemalloc
+    from datetime import datetime
+
+    global _phases
+    _phases = {}
+    profiler = cProfile.Profile()
+    tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        profiler.enable()
+        try:
+            result = run()
+        finally:
+            profiler.disable()
+        total = time.perf_counter() - start
+        memory = tracemalloc.take_snapshot()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+        phases, _phases = _phases, None
+        _open.clear()
+
+    stats = io.StringIO()
+    pstats.Stats(profiler, stream=stats).sort_stats("cumulative").print_stats(top)
+    memory = memory.filter_traces(
+        (tracemalloc.Filter(False, tracemalloc.__file__),)
+    ).statistics("lineno")
+
+    lines = [
+        f"todo.py profile report: {title}".rstrip(": "),
+        f"created {datetime.now().isoformat(timespec='seconds')},"
+        f" Python {platform.python_version()}",
+        "",
+        "Wall time per phase, nested phases excluded (includes profiler overhead)",
+    ]
+    for name in PHASES + tuple(sorted(set(phases) - set(PHASES))):
+        lines.append(f"  {name:12} {phases.get(name, 0.0) * 1000:10.2f} ms")
+    lines += [
+        f"  {'total':12} {total * 1000:10.2f} ms",
+        "",
+        f"Allocation hotspots (top {top}, peak {peak / 2**20:.1f} MiB)",
+    ]
+    lines += [f"  {stat}" for stat in memory[:top]]
+    lines += ["", f"cProfile top {top} by cumulative time", stats.getvalue()]
+    with open(path, "w") as file:
+        file.write("\n".join(lines))
+    return result
@@ -1,8 +1,337 @@
+import heapq
+import json
+import os
 from datetime import datetime, timedelta
+import config
+import storage
 from storage import write_tasks, load_tasks
+from config import VALID_RECURRENCES
+from dates import parse_date
+from format import Task
 
+np = None  # NumPy, imported on the first catch-up expansion; see _numpy()
 
-def process_recurring_tasks(tasks=None, today=None):
+STEP_DAYS = {"daily": 1, "weekly": 7}
+
+
+def parse_recurring(task):
+    """
+    Split a recurring task into (due_date, Task, recurrence_type).
+
+    Returns None for tasks that are not recurring or have no due date.
+    Raises ValueError for an unparsable due date or an unknown recurrence.
+    """
+    if "[Recurring:" not in task:
+        return None
+
+    record = Task.parse(task)
+    if record.due is None:
+        return None  # No due date found; skip
+
+    try:
+        due_date = parse_date(record.due)
+    except Exception:
+        raise ValueError("Invalid due date format.")
+
+    if record.recurring not in VALID_RECURRENCES:
+        raise ValueError(f"Unknown recurrence type: {record.recurring}")
+
+    return due_date, record, record.recurring
+
+
+def advance(due_date, recurrence_type):
+    """Return the due date of the next occurrence."""
+    if recurrence_type == "daily":
+        return due_date + timedelta(days=1)
+    if recurrence_type == "weekly":
+        return due_date + timedelta(weeks=1)
+    if due_date.month == 12:
+        return due_date.replace(year=due_date.year + 1, month=1)
+    # This simplistic advance assumes the day exists in the next month.
+    return due_date.replace(month=due_date.month + 1)
+
+
+def _previous(due_date, recurrence_type):
+    """Return the due date that advance() takes to ``due_date``, or None."""
+    if recurrence_type in STEP_DAYS:
+        return due_date - timedelta(days=STEP_DAYS[recurrence_type])
+    year, month = divmod(due_date.year * 12 + due_date.month - 2, 12)
+    try:
+        return due_date.replace(year=year, month=month + 1)
+    except ValueError:
+        return None  # No such day in the month before
+
+
+def _expand_python(entries, today):
+    chains = []
+    for due_date, recurrence_type in entries:
+        dates = []
+        while due_date <= today:
+            due_date = advance(due_date, recurrence_type)
+            dates.append(due_date)
+        chains.append(dates)
+    return chains
+
+
+def _numpy():
+    """Import NumPy on first use, returning None when it is not installed."""
+    global np
+    if np is None:
+        try:
+            import numpy as np
+        except ImportError:  # NumPy is optional; catch-up falls back to pure Python
+            np = False
+    return np or None
+
+
+def _expand_numpy(entries, today):
+    due = np.array([due_date for due_date, _ in entries], dtype="datetime64[D]")
+    monthly = np.array([recurrence == "monthly" for _, recurrence in entries])
+    step = np.array([STEP_DAYS.get(r, 0) for _, r in entries], dtype=np.int64)
+    today64 = np.datetime64(today, "D")
+
+    # Occurrences per task: enough that the last one falls after today.
+    counts = np.empty(len(entries), dtype=np.int64)
+    fixed = ~monthly
+    counts[fixed] = (today64 - due[fixed]).astype(np.int64) // step[fixed] + 1
+    months = due.astype("datetime64[M]")
+    day_offset = due - months.astype("datetime64[D]")
+    today_month = today64.astype("datetime64[M]")
+    today_offset = today64 - today_month.astype("datetime64[D]")
+    counts[monthly] = (today_month - months[monthly]).astype(np.int64) + (
+        day_offset[monthly] <= today_offset
+    )
+    # Tasks due after today have no occurrences yet, not a negative count.
+    counts = np.maximum(counts, 0)
+
+    # Flatten to one row per occurrence: owning task and 1-based step number.
+    owner = np.repeat(np.arange(len(entries)), counts)
+    starts = np.cumsum(counts) - counts
+    steps = np.arange(counts.sum()) - np.repeat(starts, counts) + 1
+
+    dates = np.empty(len(owner), dtype="datetime64[D]")
+    by_days = ~monthly[owner]
+    dates[by_days] = due[owner[by_days]] + (
+        step[owner[by_days]] * steps[by_days]
+    ).astype("timedelta64[D]")
+    by_months = monthly[owner]
+    target = months[owner[by_months]] + steps[by_months].astype("timedelta64[M]")
+    dates[by_months] = target.astype("datetime64[D]") + day_offset[owner[by_months]]
+    if (dates[by_months].astype("datetime64[M]") != target).any():
+        # Same failure as date.replace() in advance() for e.g. the 31st.
+        raise ValueError("day is out of range for month")
+    return [chunk.tolist() for chunk in np.split(dates, np.cumsum(counts)[:-1])]
+
+
+def expand_occurrences(entries, today):
+    """
+    Return, for each (due_date, recurrence_type) in ``entries``, every next
+    due date up to and including the first one after ``today``.
+
+    All entries are expanded together with NumPy date arithmetic when NumPy
+    is installed, and one by one otherwise.
+    """
+    if not entries:
+        return []
+    if _numpy() is not None:
+        return _expand_numpy(entries, today)
+    return _expand_python(entries, today)
+
+
+def next_occurrence(task, new_due):
+    """Build the task string for the occurrence of ``task`` due on ``new_due``."""
+    return str(task.replace(due=str(new_due)))
+
+
+class RecurringScheduler:
+    """
+    Min-heap of recurring tasks keyed by due date.
+
+    Only tasks whose next occurrence has not been generated yet are
+    scheduled, so a run pops exactly the tasks that came due since the last
+    one, and ``next_due`` alone tells whether a run would do anything.
+    """
+
+    def __init__(self):
+        self.heap = []  # (due_date, task)
+        self.signature = None  # storage.file_signature() the heap matches
+
+    def rebuild(self, tasks, until=None):
+        """
+        Schedule every recurring task in ``tasks`` that has no successor yet.
+
+        ``tasks`` is a list of task strings, or a task store, in which case
+        candidates come from its due-date index and membership checks use
+        its text index instead of a copy of every task. ``until`` leaves
+        out tasks due after that date; a store with a ``recurring_due``
+        query, like the SQLite one, then looks them up in a single query.
+        """
+        if hasattr(tasks, "due_between"):
+            existing = tasks
+            if until is not None and hasattr(tasks, "recurring_due"):
+                candidates = tasks.recurring_due(until)
+            else:
+                candidates = tasks.due_between(None, until)
+            tasks = [str(task) for task in candidates if task.recurring]
+        else:
+            existing = set(tasks)
+        self.heap = []
+        for task in tasks:
+            parsed = parse_recurring(task)
+            if parsed is None:
+                continue
+            due_date, record, recurrence_type = parsed
+            if until is not None and due_date > until:
+                continue
+            new_due = advance(due_date, recurrence_type)
+            if next_occurrence(record, new_due) in existing:
+                continue  # Already processed
+            self.heap.append((due_date, task))
+        heapq.heapify(self.heap)
+
+    def next_due(self):
+        """Return the earliest scheduled due date, or None."""
+        return self.heap[0][0] if self.heap else None
+
+    def run(self, tasks, today, catch_up=False):
+        """
+        Return the next occurrences of the tasks in ``tasks`` due by ``today``.
+
+        ``tasks`` is a list of task strings or a task store, which answers
+        membership checks from its text index. With ``catch_up``, every
+        missing occurrence up to ``today`` is generated at once instead of
+        one step per run.
+        """
+        existing = tasks if hasattr(tasks, "due_between") else None
+        came_due = []
+        while self.heap and self.heap[0][0] <= today:
+            due_date, task = heapq.heappop(self.heap)
+            if existing is None:
+                existing = set(tasks)
+            if task not in existing:
+                continue  # Removed or updated since it was scheduled
+            came_due.append(parse_recurring(task))
+
+        if catch_up:
+            chains = expand_occurrences([(d, r) for d, _, r in came_due], today)
+        else:
+            chains = [[advance(d, r)] for d, _, r in came_due]
+
+        new_tasks, scheduled = [], []
+        generated = set()
+        for (_, record, _), dates in zip(came_due, chains):
+            new_task = None
+            for new_due in dates:
+                new_task = next_occurrence(record, new_due)
+                if new_task in generated or new_task in existing:
+                    new_task = None
+                    continue
+                generated.add(new_task)
+                new_tasks.append(new_task)
+            if new_task is not None:
+                scheduled.append((dates[-1], new_task))
+        # New occurrences become due from the next run onwards.
+        for entry in scheduled:
+            heapq.heappush(self.heap, entry)
+        return new_tasks
+
+
+def _to_schedule(changes, tasks):
+    """
+    Return the (due_date, task) entries a rebuild would add for ``changes``.
+
+    ``changes`` are deltas as history entries hold them, already applied
+    to ``tasks``. An added recurring task is scheduled unless its next
+    occurrence exists; a removed or replaced occurrence leaves the one
+    before it without a successor, so that one is scheduled again. Entries
+    of tasks that are gone need no removal: run skips them.
+    """
+    entries = []
+    for change in changes:
+        if change[0] != "+":
+            parsed = parse_recurring(change[1])
+            if parsed is not None and change[1] not in tasks:
+                due_date, record, recurrence_type = parsed
+                previous = _previous(due_date, recurrence_type)
+                if previous is not None:
+                    task = next_occurrence(record, previous)
+                    if task in tasks:
+                        entries.append((previous, task))
+        if change[0] != "-":
+            parsed = parse_recurring(change[-1])
+            if parsed is not None and change[-1] in tasks:
+                due_date, record, recurrence_type = parsed
+                new_due = advance(due_date, recurrence_type)
+                if next_occurrence(record, new_due) not in tasks:
+                    entries.append((due_date, change[-1]))
+    return entries
+
+
+_scheduler = RecurringScheduler()
+
+
+def state_path():
+    """Return the file that records when the scheduler of TASK_FILE is next due."""
+    return f"{storage.TASK_FILE}.recurring"
+
+
+def _read_state():
+    try:
+        with open(state_path(), "r") as file:
+            return json.load(file)
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def _write_state(signature, next_due):
+    state = {"signature": signature, "next_due": str(next_due) if next_due else None}
+    tmp = f"{state_path()}.tmp"
+    with open(tmp, "w") as file:
+        json.dump(state, file)
+    os.replace(tmp, state_path())
+
+
+def note_saved(before, after, changes, tasks):
+    """
+    Carry the schedule over a save this process made to the task file.
+
+    ``before`` and ``after`` are storage.file_signature() around the save,
+    ``changes`` the deltas it wrote, as history entries hold them, and
+    ``tasks`` what was saved. When the schedule in memory, or the one
+    saved for other processes, matched the file before the save, only the
+    changed tasks are scheduled instead of the next pass rebuilding it all.
+    """
+    if _scheduler.signature == before:
+        for entry in _to_schedule(changes, tasks):
+            heapq.heappush(_scheduler.heap, entry)
+        _scheduler.signature = after
+        _write_state(after, _scheduler.next_due())
+        return
+    state = _read_state()
+    if state is not None and state["signature"] == before:
+        dues = [str(due_date) for due_date, _ in _to_schedule(changes, tasks)]
+        if state["next_due"]:
+            dues.append(state["next_due"])
+        _write_state(after, min(dues, default=None))  # ISO dates sort as strings
+
+
+def _nothing_due(today):
+    """Check, without loading any tasks, that no stored task has come due."""
+    signature = storage.file_signature()
+    if _scheduler.signature == signature:
+        next_due = _scheduler.next_due()
+    else:
+        state = _read_state()
+        if state is None or state["signature"] != signature:
+            return False
+        next_due = state["next_due"]
+        next_due = parse_date(next_due) if next_due else None
+    return next_due is None or next_due > today
+
+
+def process_recurring_tasks(
+    tasks=None, today=None, catch_up=None, load=None, save=None
+):
     """
     Process recurring tasks:
       - If a recurring task has a due date that is <= today,
@@ -13,67 +342,55 @@ def process_recurring_tasks(tasks=None, today=None):
       - weekly: advance by 7 days
       - monthly: advance by one month (with December rolling over to January)
 
+    Tasks whose next instance already exists are skipped, and nothing is
+    written when no task came due. Without an explicit task list, the
+    stored tasks are scheduled once and later calls only touch the tasks
+    that came due since the previous run.
+
     Args:
       tasks (list): List of task strings.
       today (date, optional): Override for current date. Defaults to today.
+      catch_up (bool, optional): Generate every missing occurrence up to
+        today in one pass. Defaults to config.RECURRING_CATCH_UP.
+      load (callable, optional): Return the stored tasks, as a list or a
+        task store such as the one tasks.py keeps. Defaults to load_tasks.
+      save (callable, optional): Persist what ``load`` returned once new
+        occurrences were added to it. Defaults to write_tasks.
     """
     if today is None:
         today = datetime.today().date()
 
-    if tasks is None:
-        tasks = load_tasks()  # Load tasks when no argment is provided
-
-    new_tasks = []
+    if catch_up is None:
+        catch_up = config.RECURRING_CATCH_UP
 
-    for task in tasks:
-        if "[Recurring:" not in task:
-            continue
+    if tasks is not None:
+        scheduler = RecurringScheduler()
+        scheduler.rebuild(tasks)
+        new_tasks = scheduler.run(tasks, today, catch_up)
+        if new_tasks:
+            tasks.extend(new_tasks)
+            write_tasks(tasks)
+        return
 
-        # Assume task format is: "[PRIORITY] Task description (Due: YYYY-MM-DD) [Recurring: type]"
-        try:
-            # Split into the part before the recurring sign and the recurrence info
-            task_parts = task.split("[Recurring:")
-            base_task = task_parts[0].strip()  # contains the description and due date
-            recurrence_field = (
-                task_parts[1].rstrip("] ").strip()
-            )  # e.g. "daily", "weekly", or "monthly"
-        except IndexError:
-            # If parsing fails, just skip the task.
-            continue
-
-        recurrence_type = recurrence_field
-
-        # Extract due date from the base task. We assume due date is in the format (Due: YYYY-MM-DD)
-        if " (Due:" not in base_task:
-            continue  # No due date found; skip
+    if _nothing_due(today):
+        return
 
-        try:
-            due_part = base_task.split(" (Due: ")[-1]  # e.g. "2025-04-27)"
-            due_date_str = due_part.rstrip(")")
-            due_date = datetime.strptime(due_date_str, "%Y-%m-%d").date()
-        except Exception:
-            raise ValueError("Invalid due date format.")
-
-        # Validate recurrence type.
-        VALID_RECURRENCES = ["daily", "weekly", "monthly"]
-        if recurrence_type not in VALID_RECURRENCES:
-            raise ValueError(f"Unknown recurrence type: {recurrence_type}")
-
-        # If the task is due (or overdue), update it.
-        if due_date <= today:
-            if recurrence_type == "daily":
-                new_due = due_date + timedelta(days=1)
-            elif recurrence_type == "weekly":
-                new_due = due_date + timedelta(weeks=1)
-            elif recurrence_type == "monthly":
-                if due_date.month == 12:
-                    new_due = due_date.replace(year=due_date.year + 1, month=1)
-                else:
-                    # This simplistic advance assumes the day exists in the next month.
-                    new_due = due_date.replace(month=due_date.month + 1)
-            # Generate the new task string with the updated due date.
-            new_task = f"{base_task.split(' (Due:')[0].strip()} (Due: {new_due}) [Recurring: {recurrence_type}]"
-            new_tasks.append(new_task)
-
-    tasks.extend(new_tasks)
-    write_tasks(tasks)
+    with storage.locked():  # No other process may write between load and write
+        tasks = (load or load_tasks)()  # Load tasks when no argment is provided
+        if hasattr(tasks, "recurring_due"):
+            # Every write changes a database's signature, while its index
+            # finds the recurring tasks due by today in one cheap query, so
+            # those are scheduled afresh on each pass instead of kept.
+            scheduler = RecurringScheduler()
+            scheduler.rebuild(tasks, until=today)
+        else:
+            scheduler = _scheduler
+            if scheduler.signature != storage.file_signature():
+                scheduler.rebuild(tasks)
+        new_tasks = scheduler.run(tasks, today, catch_up)
+        if new_tasks:
+            tasks.extend(new_tasks)
+            (save or write_tasks)(tasks)
+        if scheduler is _scheduler:
+            _scheduler.signature = storage.file_signature()
+            _write_state(_scheduler.signature, _scheduler.next_due())
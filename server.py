@@ -0,0 +1,149 @@
+import asyncio
+import json
+import os
+import signal
+import socket
+import config
+import tasks
+from recurring import process_recurring_tasks
+
+# Requests and responses are single lines of JSON:
+#   {"op": "add", "args": {"task": "Buy milk", "priority": "LOW"}}
+#   {"ok": true, "result": "Task added successfully!"}
+#   {"ok": false, "error": "Unknown operation: frobnicate"}
+
+
+def _recurring():
+    tasks.flush()  # The recurring pass works on the stored tasks
+    process_recurring_tasks()
+    return "Recurring tasks processed successfully!"
+
+
+OPERATIONS = {
+    "add": tasks.add_task,
+    "remove": tasks.remove_task,
+    "update": tasks.update_task,
+    "view": tasks.view_tasks,
+    "search": tasks.search_tasks,
+    "complete": tasks.complete_task,
+    "undo": tasks.undo,
+    "redo": tasks.redo,
+    "recurring": _recurring,
+}
+
+
+def _split(address):
+    """Return (host, port) for a "host:port" address, or None for a socket path."""
+    host, found, port = address.rpartition(":")
+    if found and port.isdigit():
+        return host or "127.0.0.1", int(port)
+    return None
+
+
+def handle(request):
+    """Run one decoded request and return the response dict."""
+    try:
+        operation = OPERATIONS[request["op"]]
+    except (KeyError, TypeError):
+        return {"ok": False, "error": f"Unknown operation: {request.get('op')}"}
+    try:
+        return {"ok": True, "result": operation(**request.get("args", {}))}
+    except Exception as exc:
+        return {"ok": False, "error": f"{type(exc).__name__}: {exc}"}
+
+
+async def _serve_client(reader, writer):
+    try:
+        while line := await reader.readline():
+            try:
+                request = json.loads(line)
+            except ValueError:
+                response = {"ok": False, "error": "Malformed JSON request!"}
+            else:
+                response = (
+                    handle(request)
+                    if isinstance(request, dict)
+                    else {"ok": False, "error": "Request is not an object!"}
+                )
+            writer.write(json.dumps(response).encode() + b"\n")
+            await writer.drain()
+    finally:
+        writer.close()
+
+
+async def _flush_periodically(committer, interval):
+    while True:
+        await asyncio.sleep(interval)
+        committer.flush()
+
+
+async def serve(address=None, interval=None, max_dirty=None, ready=None):
+    """
+    Serve task operations until cancelled, keeping the task list in memory.
+
+    Mutations are written behind: every ``interval`` seconds, once
+    ``max_dirty`` are pending, before a view runs the recurring pass, and
+    on shutdown. ``ready`` is an optional asyncio.Event set once listening.
+    """
+    address = address or config.SERVER_ADDRESS
+    interval = interval or config.SERVER_FLUSH_INTERVAL
+    committer = tasks.enable_write_behind(max_dirty or config.SERVER_FLUSH_DIRTY)
+    tcp = _split(address)
+    if tcp:
+        server = await asyncio.start_server(_serve_client, *tcp)
+    else:
+        server = await asyncio.start_unix_server(_serve_client, address)
+    flusher = asyncio.ensure_future(_flush_periodically(committer, interval))
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        try:
+            # Stop through cancellation so pending changes are flushed.
+            loop.add_signal_handler(signum, asyncio.current_task().cancel)
+        except (NotImplementedError, RuntimeError):
+            pass  # No signal handlers outside the main thread or on Windows
+    try:
+        async with server:
+            if ready is not None:
+                ready.set()
+            await server.serve_forever()
+    finally:
+        flusher.cancel()
+        tasks.disable_write_behind()  # Saves what is still pending
+        if not tcp and os.path.exists(address):
+            os.remove(address)
+
+
+class Client:
+    """Blocking client for a running task server, one connection per client."""
+
+    def __init__(self, address=None):
+        address = address or config.SERVER_ADDRESS
+        tcp = _split(address)
+        if tcp:
+            self.sock = socket.create_connection(tcp)
+        else:
+            self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self.sock.connect(address)
+        self.file = self.sock.makefile("rwb")
+
+    def request(self, op, **args):
+        """Send one request and return its result, raising on server errors."""
+        self.file.write(json.dumps({"op": op, "args": args}).encode() + b"\n")
+        self.file.flush()
+        line = self.file.readline()
+        if not line:
+            raise ConnectionError("Task server closed the connection")
+        response = json.loads(line)
+        if not response["ok"]:
+            raise RuntimeError(response["error"])
+        return response["result"]
+
+    def close(self):
+        self.file.close()
+        self.sock.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,174 @@
+import os
+import threading
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+import config
+import storage
+from format import Task
+
+# Tasks live in "<task file>.shards/", one text file per shard, next to a
+# "layout" file naming how tasks were split: "priority", or "hash <count>"
+# for shards picked by a stable hash of the lowercased task name. A write
+# only replaces the shard files whose contents changed.
+#
+# There is no order across shards: tasks load shard by shard, in shard file
+# name order, and keep their insertion order only within their shard. So
+# where the other backends return the first task added, this one returns
+# the first in shard order.
+
+LAYOUT = "layout"
+
+_lock = threading.RLock()  # Serializes writes from the threads of this process
+
+
+def shard_dir(path):
+    """Return the directory that holds the shards of a task file."""
+    return f"{path}.shards"
+
+
+def _layout(scheme, count=None):
+    if scheme == "priority":
+        return scheme, 0
+    return scheme, count or config.SHARD_COUNT
+
+
+def read_layout(path):
+    """
+    Return the (scheme, count) the shards of ``path`` were written with,
+    or the configured layout when there are no shards yet.
+    """
+    try:
+        with open(os.path.join(shard_dir(path), LAYOUT), "r") as file:
+            scheme, _, count = file.read().strip().partition(" ")
+    except FileNotFoundError:
+        return _layout(config.SHARD_BY)
+    return _layout(scheme, int(count or 0))
+
+
+def _write_layout(path, scheme, count):
+    text = scheme if scheme == "priority" else f"{scheme} {count}"
+    storage.atomic_write(os.path.join(shard_dir(path), LAYOUT), [f"{text}\n"])
+
+
+def shard_name(task, scheme, count):
+    """Return the shard file name a task string belongs in."""
+    task = Task.parse(task)
+    if scheme == "priority":
+        priority = task.priority
+        return f"{priority}.txt" if priority in config.VALID_PRIORITIES else "other.txt"
+    if scheme == "hash":
+        # crc32 rather than hash(), which changes between interpreter runs.
+        bucket = zlib.crc32(task.name.strip().lower().encode()) % count
+        return f"{bucket:03d}.txt"
+    raise ValueError(f"Unknown shard scheme: {scheme}")
+
+
+def _shard_files(path):
+    try:
+        names = os.listdir(shard_dir(path))
+    except FileNotFoundError:
+        return []
+    return sorted(name for name in names if name.endswith(".txt"))
+
+
+def paths(path):
+    """Return every file that holds part of the tasks of ``path``."""
+    directory = shard_dir(path)
+    return [os.path.join(directory, name) for name in [LAYOUT, *_shard_files(path)]]
+
+
+def _read_shard(file_path):
+    try:
+        with open(file_path, "r") as file:
+            return [line.strip() for line in file]
+    except FileNotFoundError:
+        return []
+
+
+def load(path):
+    """
+    Load every shard, reading them in parallel on a thread pool.
+
+    Tasks come shard by shard, each shard in insertion order.
+    """
+    directory = shard_dir(path)
+    files = [os.path.join(directory, name) for name in _shard_files(path)]
+    if len(files) < 2:
+        shards = [_read_shard(file) for file in files]
+    else:
+        workers = min(len(files), config.SHARD_LOAD_WORKERS)
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            shards = list(pool.map(_read_shard, files))
+    return [task for shard in shards for task in shard]
+
+
+def iter_tasks(path):
+    """Yield task strings shard by shard, reading one line at a time."""
+    directory = shard_dir(path)
+    for name in _shard_files(path):
+        try:
+            file = open(os.path.join(directory, name), "r")
+        except FileNotFoundError:
+            continue  # Emptied by a write since the listing
+        with file:
+            for line in file:
+                yield line.strip()
+
+
+def write(path, tasks, scheme=None, count=None):
+    """
+    Persist ``tasks``, replacing only the shard files whose tasks changed.
+
+    Tasks are split by the layout the shards were written with, or by
+    config.SHARD_BY and config.SHARD_COUNT for a new shard directory;
+    ``scheme`` and ``count`` pick a new layout and reshard everything.
+    The current shards are read from disk by each write rather than kept
+    in memory between writes.
+    """
+    directory = shard_dir(path)
+    with _lock:
+        layout = read_layout(path)
+        scheme, count = layout if scheme is None else _layout(scheme, count)
+        current = {}
+        placed = {}  # task -> shard name, so unchanged tasks are not parsed again
+        if layout == (scheme, count):
+            for name in _shard_files(path):
+                current[name] = _read_shard(os.path.join(directory, name))
+                placed.update(dict.fromkeys(current[name], name))
+        shards = {}
+        for task in tasks:
+            name = placed.get(task) or shard_name(task, scheme, count)
+            shards.setdefault(name, []).append(task)
+        os.makedirs(directory, exist_ok=True)
+        if layout != (scheme, count) or not os.path.exists(
+            os.path.join(directory, LAYOUT)
+        ):
+            _write_layout(path, scheme, count)
+        for name in set(_shard_files(path)) | set(shards):
+            file_path = os.path.join(directory, name)
+            new = shards.get(name, [])
+            old = current[name] if name in current else _read_shard(file_path)
+            if old == new:
+                continue
+            if new:
+                storage.atomic_write(file_path, (f"{task}\n" for task in new))
+            else:
+                os.remove(file_path)
+
+
+def to_shards(src, dst=None, scheme=None, count=None):
+    """
+    Split a text task file into shards of ``dst`` (``src`` by default).
+
+    The text file is left in place; set config.STORAGE_BACKEND to
+    "sharded" to use the shards from then on.
+    """
+    with open(src, "r") as file:
+        tasks = [line.strip() for line in file if line.strip()]
+    write(dst or src, tasks, scheme or config.SHARD_BY, count)
+    return len(tasks)
+
+
+def to_text(src, dst):
+    """Join the shards of ``src`` back into a single text task file."""
+    storage.atomic_write(dst, (f"{task}\n" for task in load(src)))
@@ -0,0 +1,314 @@
+import sqlite3
+import threading
+import config
+from config import VALID_PRIORITIES
+from journal import diff
+from format import Task
+from store import as_task
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    id INTEGER PRIMARY KEY,
+    text TEXT NOT NULL,
+    priority TEXT NOT NULL,
+    priority_rank INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    due TEXT,
+    recurring TEXT
+);
+CREATE INDEX IF NOT EXISTS tasks_priority ON tasks (priority_rank, text);
+CREATE INDEX IF NOT EXISTS tasks_due ON tasks (due);
+CREATE INDEX IF NOT EXISTS tasks_recurring_due ON tasks (due)
+    WHERE recurring IS NOT NULL;
+CREATE INDEX IF NOT EXISTS tasks_name ON tasks (name COLLATE NOCASE, priority);
+CREATE INDEX IF NOT EXISTS tasks_text ON tasks (text);
+"""
+INSERT = (
+    "INSERT INTO tasks (text, priority, priority_rank, name, due, recurring)"
+    " VALUES (?, ?, ?, ?, ?, ?)"
+)
+UPDATE = (
+    "UPDATE tasks SET text = ?, priority = ?, priority_rank = ?, name = ?, due = ?,"
+    " recurring = ? WHERE id = ?"
+)
+
+# PRAGMA synchronous for each config.DURABILITY; in WAL mode "NORMAL" keeps
+# the database consistent but may lose the latest commits on power loss.
+SYNCHRONOUS = {"none": "OFF", "flush": "NORMAL", "fsync": "FULL"}
+
+_lock = threading.RLock()
+_connections = {}  # path -> (sqlite3.Connection, config.DURABILITY it follows)
+_state = {}  # path -> (data_version, tasks, row ids) as last loaded or written
+
+
+def connect(path):
+    """
+    Return the shared connection for ``path``, creating the schema on first use.
+
+    Commits are synced to disk as config.DURABILITY asks.
+    """
+    if config.DURABILITY not in SYNCHRONOUS:
+        raise ValueError(f"Unknown durability policy: {config.DURABILITY}")
+    with _lock:
+        conn, durability = _connections.get(path, (None, None))
+        if conn is None:
+            # Autocommit mode: each statement is its own transaction unless
+            # a batch opens one explicitly.
+            conn = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+        if durability != config.DURABILITY:
+            conn.execute(f"PRAGMA synchronous={SYNCHRONOUS[config.DURABILITY]}")
+            _connections[path] = (conn, config.DURABILITY)
+        return conn
+
+
+def close(path):
+    """Close the connection for ``path`` if one is open."""
+    with _lock:
+        conn, _ = _connections.pop(path, (None, None))
+        _state.pop(path, None)
+        if conn is not None:
+            conn.close()
+
+
+def _row(task):
+    task = as_task(task)
+    priority = task.priority
+    rank = VALID_PRIORITIES.index(priority) if priority in VALID_PRIORITIES else 99
+    return str(task), priority, rank, task.name.strip(), task.due, task.recurring
+
+
+def _like_escape(text):
+    return text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def _data_version(conn):
+    return conn.execute("PRAGMA data_version").fetchone()[0]
+
+
+def load(path):
+    """Load every task, in insertion order."""
+    conn = connect(path)
+    with _lock:
+        rows = conn.execute("SELECT id, text FROM tasks ORDER BY id").fetchall()
+        tasks = [text for _, text in rows]
+        _state[path] = (_data_version(conn), tasks, [row_id for row_id, _ in rows])
+        return list(tasks)
+
+
+def iter_tasks(path):
+    """Yield task strings in insertion order straight from a cursor."""
+    for (text,) in connect(path).execute("SELECT text FROM tasks ORDER BY id"):
+        yield text
+
+
+def write(path, tasks):
+    """Persist ``tasks``, applying only the rows that changed in one transaction."""
+    tasks = list(tasks)
+    conn = connect(path)
+    with _lock:
+        cached = _state.get(path)
+        if cached is None or cached[0] != _data_version(conn):
+            load(path)
+            cached = _state[path]
+        _, old, ids = cached
+        ids = list(ids)
+        changes = diff(old, tasks)
+        conn.execute("BEGIN")
+        try:
+            if changes is None or len(changes) > max(16, len(tasks) // 4):
+                conn.execute("DELETE FROM tasks")
+                conn.executemany(INSERT, map(_row, tasks))
+                ids = [
+                    row_id
+                    for (row_id,) in conn.execute("SELECT id FROM tasks ORDER BY id")
+                ]
+            else:
+                for op, index, task in changes:
+                    if op == "+":
+                        ids.append(conn.execute(INSERT, _row(task)).lastrowid)
+                    elif op == "-":
+                        conn.execute(
+                            "DELETE FROM tasks WHERE id = ?", (ids.pop(index),)
+                        )
+                    else:
+                        conn.execute(UPDATE, _row(task) + (ids[index],))
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        _state[path] = (_data_version(conn), tasks, ids)
+
+
+class SqliteTaskStore:
+    """
+    TaskStore interface answered by SQL against the indexed ``tasks`` table.
+
+    Every mutation is committed immediately, so callers do not need to
+    write the task list back afterwards.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.conn = connect(path)
+
+    def _one(self, sql, params=()):
+        row = self.conn.execute(sql, params).fetchone()
+        return row[0] if row else None
+
+    def _changed(self):
+        _state.pop(self.path, None)
+
+    def __len__(self):
+        return self._one("SELECT COUNT(*) FROM tasks")
+
+    def __iter__(self):
+        return (
+            Task.parse(text)
+            for (text,) in self.conn.execute("SELECT text FROM tasks ORDER BY id")
+        )
+
+    def __contains__(self, task):
+        return (
+            self._one("SELECT 1 FROM tasks WHERE text = ? LIMIT 1", (str(task),))
+            is not None
+        )
+
+    def to_list(self):
+        """Return the task strings as a plain list, in insertion order."""
+        return [
+            text for (text,) in self.conn.execute("SELECT text FROM tasks ORDER BY id")
+        ]
+
+    def get(self, task_id):
+        """Return the Task stored under ``task_id``."""
+        text = self._one("SELECT text FROM tasks WHERE id = ?", (task_id,))
+        if text is None:
+            raise KeyError(task_id)
+        return Task.parse(text)
+
+    def add(self, task):
+        """Insert a task (a Task or a task string) and return its id."""
+        self._changed()
+        return self.conn.execute(INSERT, _row(task)).lastrowid
+
+    def extend(self, tasks):
+        """Insert many tasks in one transaction."""
+        self._changed()
+        self.conn.execute("BEGIN")
+        try:
+            self.conn.executemany(INSERT, map(_row, tasks))
+            self.conn.execute("COMMIT")
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            raise
+
+    def remove(self, task_id):
+        """Delete the task stored under ``task_id`` and return it."""
+        task = self.get(task_id)
+        self._changed()
+        self.conn.execute("DELETE FROM tasks WHERE id = ?", (task_id,))
+        return task
+
+    def replace(self, task_id, task):
+        """Replace the task stored under ``task_id``, keeping its position."""
+        self._changed()
+        self.conn.execute(UPDATE, _row(task) + (task_id,))
+
+    def find(self, name, priority=None):
+        """Return the id of the first task named ``name``, or None."""
+        if priority:
+            return self._one(
+                "SELECT id FROM tasks WHERE name = ? COLLATE NOCASE AND priority = ?"
+                " ORDER BY id LIMIT 1",
+                (name.strip(), priority),
+            )
+        return self._one(
+            "SELECT id FROM tasks WHERE name = ? COLLATE NOCASE ORDER BY id LIMIT 1",
+            (name.strip(),),
+        )
+
+    def find_text(self, task):
+        """Return the id of the task whose text is exactly ``task``, or None."""
+        return self._one(
+            "SELECT id FROM tasks WHERE text = ? ORDER BY id LIMIT 1", (str(task),)
+        )
+
+    def search(self, query, priority=None, prefix=False, ignore_case=True, limit=None):
+        """Return the ids of tasks whose name contains ``query``, in id order."""
+        if ignore_case:
+            escaped = _like_escape(query)
+            where = "name LIKE ? ESCAPE '\\'"
+            params = (f"{escaped}%" if prefix else f"%{escaped}%",)
+        elif prefix:
+            where, params = "substr(name, 1, length(?1)) = ?1", (query,)
+        else:
+            where, params = "instr(name, ?) > 0", (query,)
+        if priority:
+            where += " AND priority = ?"
+            params += (priority,)
+        return [
+            task_id
+            for (task_id,) in self.conn.execute(
+                f"SELECT id FROM tasks WHERE {where} ORDER BY id LIMIT ?",
+                params + (-1 if limit is None else limit,),
+            )
+        ]
+
+    def with_priority(self, priority):
+        """Return the Tasks with one priority, in insertion order."""
+        return [
+            Task.parse(text)
+            for (text,) in self.conn.execute(
+                "SELECT text FROM tasks WHERE priority = ? ORDER BY id", (priority,)
+            )
+        ]
+
+    def due_between(self, start=None, end=None):
+        """Return the Tasks due from ``start`` to ``end`` inclusive, by due date."""
+        where, params = "due IS NOT NULL", ()
+        if start is not None:
+            where, params = where + " AND due >= ?", params + (str(start),)
+        if end is not None:
+            where, params = where + " AND due <= ?", params + (str(end),)
+        return [
+            Task.parse(text)
+            for (text,) in self.conn.execute(
+                f"SELECT text FROM tasks WHERE {where} ORDER BY due, id", params
+            )
+        ]
+
+    def recurring_due(self, today):
+        """Return the recurring Tasks due by ``today``, by due date."""
+        return [
+            Task.parse(text)
+            for (text,) in self.conn.execute(
+                "SELECT text FROM tasks WHERE recurring IS NOT NULL AND due <= ?"
+                " ORDER BY due, id",
+                (str(today),),
+            )
+        ]
+
+    def overdue(self, today):
+        """Return the Tasks due before ``today``, by due date."""
+        return [
+            Task.parse(text)
+            for (text,) in self.conn.execute(
+                "SELECT text FROM tasks WHERE due < ? ORDER BY due, id", (str(today),)
+            )
+        ]
+
+    def sorted(self, limit=None, offset=0, priority=None):
+        """Return tasks ordered by priority and then alphabetically."""
+        where, params = "", ()
+        if priority:
+            where, params = "WHERE priority = ? ", (priority,)
+        return [
+            text
+            for (text,) in self.conn.execute(
+                f"SELECT text FROM tasks {where}ORDER BY priority_rank, text"
+                " LIMIT ? OFFSET ?",
+                params + (-1 if limit is None else limit, offset),
+            )
+        ]
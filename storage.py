@@ -1,16 +1,431 @@
+import atexit
+import importlib
+import os
+import threading
+from contextlib import contextmanager
+import config
+import journal
+from format import Task
+
+try:
+    import fcntl
+except ImportError:  # Not available on Windows; locking is then per process only.
+    fcntl = None
+
 TASK_FILE = "task.txt"
+DURABILITY_LEVELS = ("none", "flush", "fsync")  # See config.DURABILITY
+
+# Backend modules selected by config.STORAGE_BACKEND, other than plain "text",
+# imported on first use so a run only pays for the backend it needs. Each
+# provides load(path) and write(path, tasks), and may provide
+# iter_tasks(path) to stream task strings without loading them all, and
+# paths(path) to list the files it keeps, for file_signature().
+BACKENDS = {
+    "journal": "journal",
+    "binary": "binary_storage",
+    "sqlite": "sqlite_storage",
+    "sharded": "sharded_storage",
+}
+
+
+class _FileLock:
+    """
+    Reentrant advisory lock on a lock file shared by every process.
+
+    A thread lock serializes the threads of this process, and ``flock`` is
+    taken on the outermost acquisition only, so nested ``locked()`` blocks
+    (a mutation that saves, a save that loads) do not deadlock. A shared
+    hold is upgraded in place when a nested block needs exclusive access.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.thread_lock = threading.RLock()
+        self.file = None
+        self.exclusive = False
+        self.depth = 0
+
+    @contextmanager
+    def hold(self, shared=False):
+        with self.thread_lock:
+            if fcntl is not None and (
+                self.file is None or not (shared or self.exclusive)
+            ):
+                if self.file is None:
+                    self.file = open(self.path, "a")
+                fcntl.flock(self.file, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+                self.exclusive = not shared
+            self.depth += 1
+            try:
+                yield
+            finally:
+                self.depth -= 1
+                if not self.depth and self.file is not None:
+                    fcntl.flock(self.file, fcntl.LOCK_UN)
+                    self.file.close()
+                    self.file = None
+                    self.exclusive = False
+
+
+# (task file, backend, file_signature(), tasks) as last loaded or written. Only
+# the current file is kept, so a batch over many files holds one list at most.
+_loaded = None
+_file_locks = {}  # lock file path -> _FileLock
+_file_locks_guard = threading.Lock()
+
+
+def lock_path(path):
+    """Return the lock file that guards a task file and its sidecars."""
+    return f"{path}.lock"
+
+
+@contextmanager
+def locked(shared=False, path=None):
+    """
+    Hold the advisory lock on TASK_FILE for the duration of the block.
+
+    Wrap a whole load-modify-write in one exclusive block so that no other
+    process can write in between. Tasks are written by renaming a complete
+    temporary file into place, so plain text reads need no lock at all.
+    ``path`` locks another task file instead, for work that outlives a
+    change of TASK_FILE, like a background compaction.
+    """
+    path = lock_path(path or TASK_FILE)
+    with _file_locks_guard:
+        file_lock = _file_locks.setdefault(path, _FileLock(path))
+    with file_lock.hold(shared):
+        yield
+
+
+def _backend():
+    if config.STORAGE_BACKEND == "text":
+        return None
+    if config.STORAGE_BACKEND not in BACKENDS:
+        raise ValueError(f"Unknown storage backend: {config.STORAGE_BACKEND}")
+    return importlib.import_module(BACKENDS[config.STORAGE_BACKEND])
 
 
 def load_tasks():
-    """Load tasks from file."""
+    """
+    Load tasks from file.
+
+    The list is kept in memory, keyed on the file, the backend and
+    file_signature(), and returned again (as a fresh copy) until the files
+    change on disk, so repeated loads of an unchanged file cost a few stat
+    calls instead of a read.
+    """
+    global _loaded
+    if _loaded is not None and _loaded[:3] == _cache_key(file_signature()):
+        return list(_loaded[3])
+    backend = _backend()
+    if backend is not None:
+        # Snapshot and sidecar files must be read as one consistent state.
+        with locked(shared=True):
+            signature = file_signature()
+            tasks = backend.load(TASK_FILE)
+    else:
+        # Taken before reading: a write in between only causes another read.
+        signature = file_signature()
+        try:
+            with open(TASK_FILE, "r") as file:
+                tasks = [line.strip() for line in file.readlines()]
+        except FileNotFoundError:
+            tasks = []
+    _loaded = (*_cache_key(signature), tasks)
+    return list(tasks)
+
+
+def _cache_key(signature):
+    return (TASK_FILE, config.STORAGE_BACKEND, signature)
+
+
+def clear_cache():
+    """Forget the cached task list, so the next load reads the files."""
+    global _loaded
+    _loaded = None
+
+
+def iter_tasks(chunk_size=None):
+    """
+    Yield parsed Tasks one at a time, keeping memory use bounded.
+
+    Text files are read in fixed-size chunks of ``chunk_size`` characters
+    (config.READ_CHUNK_SIZE by default) rather than line lists.
+    """
+    backend = _backend()
+    if backend is not None:
+        stream = getattr(backend, "iter_tasks", None)
+        texts = stream(TASK_FILE) if stream else backend.load(TASK_FILE)
+        for text in texts:
+            yield Task.parse(text)
+        return
+    chunk_size = chunk_size or config.READ_CHUNK_SIZE
     try:
-        with open(TASK_FILE, "r") as file:
-            return [line.strip() for line in file.readlines()]
+        file = open(TASK_FILE, "r")
     except FileNotFoundError:
-        return []
+        return
+    with file:
+        tail = ""
+        while True:
+            chunk = file.read(chunk_size)
+            if not chunk:
+                break
+            lines = (tail + chunk).split("\n")
+            tail = lines.pop()  # Incomplete last line, continued by the next chunk
+            for line in lines:
+                yield Task.parse(line.strip())
+        if tail:
+            yield Task.parse(tail.strip())
 
 
 def write_tasks(tasks):
-    """Save tasks to file."""
-    with open(TASK_FILE, "w") as file:
-        file.writelines(f"{task}\n" for task in tasks)
+    """
+    Save tasks to file, under the file lock.
+
+    Text files are rewritten atomically, unless the tasks only extend the
+    list last loaded or written and the file is unchanged since: then the
+    new lines are appended in place, like the journal backend's records.
+    """
+    global _loaded
+    tasks = list(tasks)
+    backend = _backend()
+    with locked():
+        if backend is not None:
+            backend.write(TASK_FILE, tasks)
+        elif not _append_text(tasks):
+            atomic_write(TASK_FILE, (f"{task}\n" for task in tasks))
+        _loaded = (*_cache_key(file_signature()), tasks)
+
+
+def _append_text(tasks):
+    """Append the tasks past the cached list to TASK_FILE, if that is all."""
+    if _loaded is None or _loaded[:3] != _cache_key(file_signature()):
+        return False
+    known = _loaded[3]
+    if not known or len(tasks) <= len(known) or tasks[: len(known)] != known:
+        return False
+    with open(TASK_FILE, "rb") as file:
+        file.seek(-1, os.SEEK_END)
+        if file.read(1) != b"\n":
+            return False  # Edited by hand: the last line is not terminated
+    _durability()
+    with open(TASK_FILE, "a") as file:
+        file.writelines(f"{task}\n" for task in tasks[len(known) :])
+        sync(file)
+    return True
+
+
+def atomic_write(path, lines):
+    """
+    Write ``lines`` to a temporary file and rename it over ``path``.
+
+    How much is synced to disk first follows config.DURABILITY.
+    """
+    _durability()
+    tmp = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp, "w") as file:
+            file.writelines(lines)
+            sync(file)
+        try:
+            os.chmod(tmp, os.stat(path).st_mode)
+        except FileNotFoundError:
+            pass
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+    sync_dir(path)
+
+
+def _durability():
+    durability = config.DURABILITY
+    if durability not in DURABILITY_LEVELS:
+        raise ValueError(f"Unknown durability policy: {durability}")
+    return durability
+
+
+def sync(file):
+    """
+    Flush an open file and fsync it unless config.DURABILITY is "none".
+
+    For backends that append to or patch files in place rather than going
+    through atomic_write.
+    """
+    file.flush()
+    if _durability() != "none":
+        os.fsync(file.fileno())
+
+
+def sync_dir(path):
+    """fsync the directory of ``path`` when config.DURABILITY is "fsync"."""
+    if _durability() == "fsync":
+        _fsync_dir(os.path.dirname(path) or ".")
+
+
+def _fsync_dir(path):
+    # Makes the rename itself durable; directories cannot be opened on Windows.
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+class GroupCommit:
+    """
+    Coalesce concurrent load-modify-write mutations into one locked write.
+
+    Each caller submits a function that mutates the state returned by
+    ``load`` and returns a (result, changed) pair. The first caller to
+    arrive becomes the leader: under the file lock it loads once, applies
+    every mutation queued so far in order, and saves once if any of them
+    changed something. Callers arriving while a leader is busy queue up and
+    are committed together by the next leader.
+    """
+
+    def __init__(self, load, save):
+        self._load = load
+        self._save = save
+        self._cond = threading.Condition()
+        self._pending = []
+        self._leading = False
+
+    def submit(self, mutation):
+        """Apply ``mutation`` in the next group commit and return its result."""
+        entry = _Pending(mutation)
+        with self._cond:
+            self._pending.append(entry)
+            while self._leading and not entry.done:
+                self._cond.wait()
+            if not entry.done:
+                self._leading = True
+                batch, self._pending = self._pending, []
+        if not entry.done:
+            try:
+                self._commit(batch)
+            finally:
+                with self._cond:
+                    for pending in batch:
+                        pending.done = True
+                    self._leading = False
+                    self._cond.notify_all()
+        if entry.error is not None:
+            raise entry.error
+        return entry.result
+
+    def flush(self):
+        """Nothing to do: every batch is saved as it commits."""
+
+    def _commit(self, batch):
+        try:
+            with locked():
+                state = self._load()
+                changed = False
+                for entry in batch:
+                    try:
+                        entry.result, entry_changed = entry.mutation(state)
+                    except Exception as exc:
+                        entry.error = exc
+                        continue
+                    changed = changed or entry_changed
+                if changed:
+                    self._save(state)
+        except Exception as exc:
+            for entry in batch:
+                entry.error = entry.error or exc
+
+
+class WriteBehind:
+    """
+    Apply mutations to the loaded state at once and save them later.
+
+    A drop-in for GroupCommit: mutations only mark the state dirty, and
+    ``flush`` writes every pending change in one save under the file lock,
+    so repeated edits coalesce into one write. It runs once ``max_dirty``
+    mutations are pending, ``interval`` seconds after the first pending
+    mutation, and at interpreter exit, besides whenever the owner calls
+    it. The state is not reloaded while changes are pending, so a write
+    from another process in that window is overwritten, and a failed save
+    loses the changes it was writing.
+    """
+
+    def __init__(self, load, save, max_dirty=None, interval=None):
+        self._load = load
+        self._save = save
+        self._lock = threading.RLock()
+        self._state = None
+        self._timer = None
+        self.max_dirty = max_dirty
+        self.interval = interval
+        self.dirty = 0  # Mutations applied since the last save
+        atexit.register(self.flush)
+
+    def submit(self, mutation):
+        """Apply ``mutation`` to the in-memory state and return its result."""
+        with self._lock:
+            if not self.dirty:
+                self._state = self._load()
+            result, changed = mutation(self._state)
+            if changed:
+                self.dirty += 1
+                if self.max_dirty and self.dirty >= self.max_dirty:
+                    self.flush()
+                elif self.interval and self._timer is None:
+                    self._timer = threading.Timer(self.interval, self.flush)
+                    self._timer.daemon = True
+                    self._timer.start()
+            return result
+
+    def flush(self):
+        """Save the pending changes, if any."""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if self.dirty:
+                try:
+                    with locked():
+                        self._save(self._state)
+                finally:
+                    # On failure the pending changes are dropped with the
+                    # state, and the next mutation starts from the file.
+                    self.dirty = 0
+
+    def close(self):
+        """Flush, and stop flushing at exit."""
+        self.flush()
+        atexit.unregister(self.flush)
+
+
+class _Pending:
+    __slots__ = ("mutation", "result", "error", "done")
+
+    def __init__(self, mutation):
+        self.mutation = mutation
+        self.result = None
+        self.error = None
+        self.done = False
+
+
+def file_signature():
+    """Return a cheap fingerprint of TASK_FILE and its sidecars to notice changes."""
+    backend = _backend()
+    paths = getattr(backend, "paths", None)
+    if paths is not None:
+        paths = paths(TASK_FILE)
+    else:
+        paths = (TASK_FILE, journal.journal_path(TASK_FILE), f"{TASK_FILE}-wal")
+    parts = []
+    for path in paths:
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            parts.append("-")
+            continue
+        parts.append(f"{st.st_ino}:{st.st_size}:{st.st_mtime_ns}")
+    return " ".join(parts)
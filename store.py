@@ -0,0 +1,294 @@
+from bisect import bisect_left, insort
+from config import VALID_PRIORITIES
+from format import Task
+
+PRIORITY_RANK = {p: i for i, p in enumerate(VALID_PRIORITIES)}
+
+
+def as_task(task):
+    """Return ``task`` as a Task, parsing it if it is a string."""
+    return task if isinstance(task, Task) else Task.parse(task)
+
+
+def normalize_name(name):
+    """Normalize a task name for index lookups."""
+    return name.strip().lower()
+
+
+def trigrams(text):
+    """Return the set of three-character substrings of ``text``."""
+    return {text[i : i + 3] for i in range(len(text) - 2)}
+
+
+class TaskStore:
+    """
+    In-memory task list with hash indexes by name, priority and text.
+
+    Tasks keep their insertion order (and their position when replaced),
+    so the store can be written back exactly like the flat list it replaces.
+    Each task gets an integer id; the indexes map keys to insertion-ordered
+    dicts of ids, which act as ordered sets with O(1) insert and delete.
+    Tasks are held as parsed Task records; strings are parsed once on the
+    way in and ``to_list`` serializes them on the way out.
+
+    A sorted view of (priority rank, text, id) keys is kept up to date with
+    bisect inserts, so pages of the priority-ordered list are slices rather
+    than full sorts.
+
+    Lowercased names are also indexed by trigram, so substring searches
+    intersect a few posting lists instead of scanning every task, and
+    tasks with a due date are kept in a (due date, id) list sorted the same
+    way as the view, so date ranges are found by bisection.
+
+    Only the text index is built up front: adding, removing and replacing
+    tasks by their text, as a single add or an undo does, needs no parsing.
+    The other indexes are built by the first query that needs them, the
+    trigram postings by the first search, and are kept up to date from
+    then on.
+    """
+
+    def __init__(self, tasks=()):
+        self._tasks = {}  # id -> Task, or the task string until it is parsed
+        self._next_id = 0
+        self._by_text = {}  # task string -> {id: None}; doubles as dedup set
+        self._by_name = None  # normalized name -> {id: None}, when built
+        self._by_priority = None  # priority -> {id: None}, when built
+        self._sorted = None  # (priority rank, task string, id), when built
+        self._by_due = None  # (ISO due date, id) of tasks with a due date, sorted
+        self._by_trigram = None  # trigram of lowercased name -> {id}, when built
+        self.extend(tasks)
+
+    def __len__(self):
+        return len(self._tasks)
+
+    def __iter__(self):
+        self._build_indexes()
+        return iter(self._tasks.values())
+
+    def __contains__(self, task):
+        return str(task) in self._by_text
+
+    def to_list(self):
+        """Return the task strings as a plain list, in insertion order."""
+        return [str(task) for task in self._tasks.values()]
+
+    def get(self, task_id):
+        """Return the Task stored under ``task_id``."""
+        task = self._tasks[task_id]
+        if isinstance(task, str):
+            task = self._tasks[task_id] = Task.parse(task)
+        return task
+
+    def add(self, task):
+        """Append a task (a Task or a task string) and return its id."""
+        task_id = self._append(task)
+        self._insort(task_id)
+        return task_id
+
+    def extend(self, tasks):
+        """Append many tasks, re-sorting the views once instead of per task."""
+        ids = [self._append(task) for task in tasks]
+        if self._sorted is None:
+            return
+        for task_id in ids:
+            self._sorted.append(self._sort_key(task_id))
+            if self._tasks[task_id].due:
+                self._by_due.append(self._due_key(task_id))
+        self._sorted.sort()
+        self._by_due.sort()
+
+    def remove(self, task_id):
+        """Remove the task stored under ``task_id`` and return it."""
+        task = self.get(task_id)
+        self._unsort(task_id)
+        del self._tasks[task_id]
+        self._unindex(task_id, task)
+        return task
+
+    def replace(self, task_id, task):
+        """Replace the task stored under ``task_id``, keeping its position."""
+        if self._sorted is not None:
+            task = as_task(task)
+        self._unsort(task_id)
+        self._unindex(task_id, self._tasks[task_id])
+        self._tasks[task_id] = task
+        self._index(task_id, task)
+        self._insort(task_id)
+
+    def find(self, name, priority=None):
+        """Return the id of the first task named ``name``, or None."""
+        self._build_indexes()
+        ids = self._by_name.get(normalize_name(name), ())
+        if priority:
+            bucket = self._by_priority.get(priority, ())
+            ids = (task_id for task_id in ids if task_id in bucket)
+        return next(iter(ids), None)
+
+    def find_text(self, task):
+        """Return the id of the task whose text is exactly ``task``, or None."""
+        return next(iter(self._by_text.get(str(task), ())), None)
+
+    def search(self, query, priority=None, prefix=False, ignore_case=True, limit=None):
+        """
+        Return the ids of tasks whose name contains ``query``, in insertion order.
+
+        With ``prefix`` the name must start with ``query``; ``priority``
+        restricts matches to one priority and ``limit`` stops after that
+        many matches. Queries of three characters or
+        more only check the tasks sharing all of the query's trigrams.
+        """
+        self._build_indexes()
+        needle = query.lower() if ignore_case else query
+        grams = trigrams(query.lower())
+        if grams:
+            index = self._trigram_index()
+            postings = sorted((index.get(gram, ()) for gram in grams), key=len)
+            candidates = set(postings[0])
+            for posting in postings[1:]:
+                if not candidates:
+                    break
+                candidates.intersection_update(posting)
+            candidates = sorted(candidates)
+        else:
+            candidates = self._tasks
+        if priority:
+            bucket = self._by_priority.get(priority, ())
+            candidates = [task_id for task_id in candidates if task_id in bucket]
+        matches = []
+        for task_id in candidates:
+            name = self._tasks[task_id].name
+            if ignore_case:
+                name = name.lower()
+            if name.startswith(needle) if prefix else needle in name:
+                matches.append(task_id)
+                if len(matches) == limit:
+                    break
+        return matches
+
+    def with_priority(self, priority):
+        """Return the Tasks in a priority bucket, in insertion order."""
+        self._build_indexes()
+        return [self._tasks[task_id] for task_id in self._by_priority.get(priority, ())]
+
+    def sorted(self, limit=None, offset=0, priority=None):
+        """
+        Return task strings ordered by priority and then alphabetically.
+
+        Only the requested page is copied; ``priority`` restricts the page
+        to one priority, whose tasks form a contiguous run of the view.
+        """
+        self._build_indexes()
+        start, end = 0, len(self._sorted)
+        if priority:
+            rank = PRIORITY_RANK.get(priority, 99)
+            start = bisect_left(self._sorted, (rank,))
+            end = bisect_left(self._sorted, (rank + 1,))
+        start = min(start + offset, end)
+        if limit is not None:
+            end = min(start + limit, end)
+        return [text for _, text, _ in self._sorted[start:end]]
+
+    def due_between(self, start=None, end=None):
+        """
+        Return the Tasks due from ``start`` to ``end`` inclusive, by due date.
+
+        Either bound may be None for an open range; tasks without a due
+        date are never included.
+        """
+        self._build_indexes()
+        lo = 0 if start is None else bisect_left(self._by_due, (str(start),))
+        hi = len(self._by_due)
+        if end is not None:
+            hi = bisect_left(self._by_due, (str(end), self._next_id))
+        return [self._tasks[task_id] for _, task_id in self._by_due[lo:hi]]
+
+    def overdue(self, today):
+        """Return the Tasks due before ``today``, by due date."""
+        self._build_indexes()
+        hi = bisect_left(self._by_due, (str(today),))
+        return [self._tasks[task_id] for _, task_id in self._by_due[:hi]]
+
+    def _trigram_index(self):
+        if self._by_trigram is None:
+            self._by_trigram = {}
+            for task_id, task in self._tasks.items():
+                for gram in trigrams(task.name.lower()):
+                    self._by_trigram.setdefault(gram, set()).add(task_id)
+        return self._by_trigram
+
+    def _build_indexes(self):
+        if self._sorted is not None:
+            return
+        self._by_name, self._by_priority = {}, {}
+        self._sorted, self._by_due = [], []
+        for task_id in self._tasks:
+            task = self.get(task_id)
+            self._index_fields(task_id, task)
+            self._sorted.append(self._sort_key(task_id))
+            if task.due:
+                self._by_due.append(self._due_key(task_id))
+        self._sorted.sort()
+        self._by_due.sort()
+
+    def _append(self, task):
+        task_id = self._next_id
+        self._next_id += 1
+        if self._sorted is not None:
+            task = as_task(task)
+        self._tasks[task_id] = task
+        self._index(task_id, task)
+        return task_id
+
+    def _sort_key(self, task_id):
+        task = self._tasks[task_id]
+        return (PRIORITY_RANK.get(task.priority, 99), str(task), task_id)
+
+    def _due_key(self, task_id):
+        return (self._tasks[task_id].due, task_id)
+
+    def _insort(self, task_id):
+        if self._sorted is None:
+            return
+        insort(self._sorted, self._sort_key(task_id))
+        if self._tasks[task_id].due:
+            insort(self._by_due, self._due_key(task_id))
+
+    def _unsort(self, task_id):
+        if self._sorted is None:
+            return
+        del self._sorted[bisect_left(self._sorted, self._sort_key(task_id))]
+        if self._tasks[task_id].due:
+            del self._by_due[bisect_left(self._by_due, self._due_key(task_id))]
+
+    def _index(self, task_id, task):
+        self._by_text.setdefault(str(task), {})[task_id] = None
+        if self._sorted is not None:
+            self._index_fields(task_id, task)
+
+    def _index_fields(self, task_id, task):
+        self._by_name.setdefault(normalize_name(task.name), {})[task_id] = None
+        self._by_priority.setdefault(task.priority, {})[task_id] = None
+        if self._by_trigram is None:
+            return
+        for gram in trigrams(task.name.lower()):
+            self._by_trigram.setdefault(gram, set()).add(task_id)
+
+    def _unindex(self, task_id, task):
+        keys = [(self._by_text, str(task))]
+        if self._sorted is not None:
+            keys += [
+                (self._by_name, normalize_name(task.name)),
+                (self._by_priority, task.priority),
+            ]
+        for index, key in keys:
+            bucket = index[key]
+            del bucket[task_id]
+            if not bucket:
+                del index[key]
+        if self._by_trigram is None:
+            return
+        for gram in trigrams(task.name.lower()):
+            posting = self._by_trigram[gram]
+            posting.discard(task_id)
+            if not posting:
+                del self._by_trigram[gram]
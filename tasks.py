@@ -1,19 +1,251 @@
+from datetime import date
+import config
+import storage
+from dates import parse_date
 from format import format_task
-from storage import write_tasks, load_tasks
-from recurring import process_recurring_tasks
-from storage import load_tasks
+from storage import write_tasks, load_tasks, iter_tasks
+from recurring import advance, next_occurrence, note_saved, process_recurring_tasks
+from store import PRIORITY_RANK, TaskStore
+from profiling import phase
 from config import VALID_PRIORITIES  # Import constants
 
-tasks = load_tasks()  # Load tasks at startup
+tasks = None  # In-memory TaskStore, loaded by the first call that needs it
+_synced = None  # Fingerprint of the files ``tasks`` matches
+_history = None  # Undo history of the current task file, loaded on first use
+_unsaved = []  # Changes made to the store since it was last saved
 
 
-def view_tasks():
-    """Process recurring tasks and return sorted task list."""
-    process_recurring_tasks()  # Auto-generate upcoming recurring tasks
-    tasks = load_tasks()  # Load updated task list
-    priority_order = {p: i for i, p in enumerate(VALID_PRIORITIES)}
-    # Sort by priority (using the predefined order) and then alphabetically.
-    return sorted(tasks, key=lambda t: (priority_order.get(t.split("]")[0][1:], 99), t))
+def _store():
+    """
+    Return the task store for the configured backend.
+
+    The in-memory store is loaded on first use, and reloaded when the task
+    files changed on disk since it was last loaded or saved, or when
+    ``tasks`` was reassigned. When the change only appended tasks, as the
+    recurring pass does, they are added to the store instead.
+    """
+    global tasks, _synced
+    if config.STORAGE_BACKEND == "sqlite":
+        from sqlite_storage import SqliteTaskStore
+
+        # Queries and mutations go straight to the indexed database.
+        return SqliteTaskStore(storage.TASK_FILE)
+    signature = storage.file_signature()
+    if not isinstance(tasks, TaskStore) or signature != _synced:
+        with phase("load"):
+            loaded = load_tasks()  # Served from memory if we wrote it last
+            known = tasks.to_list() if isinstance(tasks, TaskStore) else None
+            if known is not None and loaded[: len(known)] == known:
+                # Only appended to, as by the recurring pass: no full rebuild.
+                tasks.extend(loaded[len(known) :])
+            else:
+                # Parsed and sorted by the first query that needs it.
+                tasks = TaskStore(loaded)
+        _synced = signature
+    return tasks
+
+
+def _save(store):
+    """
+    Persist an in-memory store; database-backed stores commit as they go.
+
+    The undo steps of the saved changes are kept only once they are saved,
+    and the recurring schedule is updated with the changed tasks. If
+    saving fails, the cached store and those steps are dropped, so the
+    next call starts again from what is on disk.
+    """
+    global tasks, _synced, _unsaved
+    changes, _unsaved = _unsaved, []
+    try:
+        if isinstance(store, TaskStore):
+            before = storage.file_signature()
+            write_tasks(store.to_list())
+            _synced = storage.file_signature()
+    except BaseException:
+        tasks = _synced = None
+        if _history is not None:
+            _history.discard()
+        raise
+    if _history is not None:
+        _history.commit()
+    if changes and isinstance(store, TaskStore):
+        note_saved(before, _synced, changes, store)
+
+
+# Mutations from concurrent threads are applied and written in batches, each
+# under the storage lock, so no process can write between load and save.
+_commits = storage.GroupCommit(_store, _save)
+
+
+def enable_write_behind(max_dirty=None, interval=None):
+    """
+    Defer saves until the returned committer is flushed.
+
+    Mutations then only update the in-memory store; the committer writes
+    them in one go when flushed, once ``max_dirty`` are pending,
+    ``interval`` seconds after the first pending one, and at exit. Meant
+    for a process that owns the task file, like the server or a script
+    making many edits; see config.WRITE_BEHIND.
+    """
+    global _commits
+    disable_write_behind()
+    _commits = storage.WriteBehind(_store, _save, max_dirty, interval)
+    return _commits
+
+
+def disable_write_behind():
+    """Save pending mutations and go back to saving each one as it is made."""
+    global _commits
+    if isinstance(_commits, storage.WriteBehind):
+        _commits.close()
+        _commits = storage.GroupCommit(_store, _save)
+
+
+if config.WRITE_BEHIND:
+    enable_write_behind(config.WRITE_BEHIND_DIRTY, config.WRITE_BEHIND_INTERVAL)
+
+
+def flush():
+    """Write any mutations still pending in write-behind mode."""
+    _commits.flush()
+
+
+def _record(changes, undoable=True):
+    """Note a mutation's changes for the schedule and, if ``undoable``, for undo."""
+    _unsaved.extend(changes)
+    if undoable:
+        _changes().record(changes)
+
+
+def _changes():
+    """Return the undo history for the current task file, up to date."""
+    from history import History, history_path
+
+    global _history
+    path = history_path(storage.TASK_FILE) if config.HISTORY_PERSIST else None
+    if _history is None or _history.path != path:
+        _history = History(path)
+    _history.refresh()
+    return _history
+
+
+def undo():
+    """Undo the latest add, remove or update that has not been undone."""
+    return _step(undo=True)
+
+
+def redo():
+    """Redo the latest undone operation."""
+    return _step(undo=False)
+
+
+def _step(undo):
+    from history import apply, invert
+
+    word = "undo" if undo else "redo"
+
+    def mutate(store):
+        # Runs under the file lock, like the operations it reverses.
+        history = _changes()
+        stack = history.done if undo else history.undone
+        if not stack:
+            return f"Nothing to {word}!", False
+        changes = invert(stack[-1]) if undo else stack[-1]
+        if not apply(store, changes):
+            # Dropped so that older steps can still be reached. Reported as
+            # a change, so that the save commits the dropped step.
+            history.drop(undone=not undo)
+            return f"Cannot {word}: the tasks have changed since!", True
+        _record(changes, undoable=False)
+        if undo:
+            history.mark_undone()
+            return "Change undone successfully!", True
+        history.mark_redone()
+        return "Change redone successfully!", True
+
+    return _commits.submit(mutate)
+
+
+def view_tasks(limit=None, offset=0, priority=None):
+    """
+    Process recurring tasks and return sorted task list.
+
+    ``limit`` and ``offset`` select one page of the sorted list, and
+    ``priority`` restricts it to one priority.
+    """
+    flush()  # The recurring pass works on the stored tasks
+    with phase("recurring"):
+        # Auto-generate upcoming recurring tasks, using the store's indexes
+        process_recurring_tasks(load=_store, save=_save)
+    store = _store()
+    # Sorted by priority (using the predefined order) and then alphabetically.
+    with phase("sort"):
+        return store.sorted(limit, offset, priority and priority.upper())
+
+
+def top_tasks(k=10, priority="URGENT"):
+    """Return the first ``k`` tasks of one priority, in view order."""
+    return _store().sorted(k, 0, priority.upper())
+
+
+def tasks_due_between(start=None, end=None):
+    """
+    Return the tasks due from ``start`` to ``end`` inclusive, by due date.
+
+    Bounds are dates or YYYY-MM-DD strings; None leaves that side open.
+    Answered from the store's due-date index without scanning other tasks.
+    """
+    start = parse_date(str(start)) if start else None
+    end = parse_date(str(end)) if end else None
+    return [str(task) for task in _store().due_between(start, end)]
+
+
+def overdue_tasks(today=None):
+    """Return the tasks due before ``today`` (default: the current date)."""
+    today = parse_date(str(today)) if today else date.today()
+    return [str(task) for task in _store().overdue(today)]
+
+
+def stream_tasks(priority=None, due_from=None, due_to=None, contains=None):
+    """
+    Lazily yield stored task strings matching every given filter.
+
+    Tasks are read from storage one at a time, so memory use does not grow
+    with the size of the task file. ``due_from`` and ``due_to`` bound the
+    due date inclusively (tasks without a due date are skipped when either
+    is given); ``contains`` is a case-insensitive substring of the task.
+    """
+    if priority:
+        priority = priority.upper()
+    due_from = str(due_from) if due_from else None
+    due_to = str(due_to) if due_to else None
+    if contains:
+        contains = contains.lower()
+    for task in iter_tasks():
+        if priority and task.priority != priority:
+            continue
+        if due_from or due_to:
+            # ISO dates compare correctly as strings.
+            if not task.due:
+                continue
+            if (due_from and task.due < due_from) or (due_to and task.due > due_to):
+                continue
+        if contains and contains not in str(task).lower():
+            continue
+        yield str(task)
+
+
+def search_tasks(query, limit=None):
+    """
+    Return the tasks whose name contains ``query``, ignoring case.
+
+    Matches are looked up through the store's search index and returned in
+    view order; ``limit`` caps the number of results.
+    """
+    store = _store()
+    found = [store.get(task_id) for task_id in store.search(query)]
+    found.sort(key=lambda task: (PRIORITY_RANK.get(task.priority, 99), str(task)))
+    return [str(task) for task in found[:limit]]
 
 
 def add_task(task, priority="MEDIUM", due_date=None, recurring=None):
@@ -21,59 +253,221 @@ def add_task(task, priority="MEDIUM", due_date=None, recurring=None):
     formatted_task = format_task(task, priority, due_date, recurring)
     if formatted_task is None:
         return "Invalid priority level or date format!"
-    if formatted_task in tasks:
-        return "Task already exists!"
-    tasks.append(formatted_task)
-    write_tasks(tasks)
-    return "Task added successfully!"
+
+    def mutate(store):
+        if formatted_task in store:
+            return "Task already exists!", False
+        store.add(formatted_task)
+        _record([["+", formatted_task]])
+        return "Task added successfully!", True
+
+    return _commits.submit(mutate)
+
+
+def add_tasks(rows):
+    """
+    Add many tasks with a single write.
+
+    Each row is a dict with "task", "priority", "due_date" and "recurring"
+    keys, or a tuple in add_task's argument order. Rows are validated with
+    the same rules as add_task and checked against existing tasks and
+    earlier rows through hash lookups. Fields must be strings (or None)
+    without line breaks. A row may also be an exception raised while
+    reading it, which is reported as that row's error.
+
+    Returns a dict with the number of tasks added and a list of
+    (row number, message) pairs for the rows that were skipped.
+    """
+    batch = {}  # formatted task -> row number, in input order
+    errors = []
+    for number, row in enumerate(rows, 1):
+        if isinstance(row, Exception):
+            errors.append((number, str(row)))
+            continue
+        if isinstance(row, dict):
+            row = (
+                row.get("task"),
+                row.get("priority"),
+                row.get("due_date"),
+                row.get("recurring"),
+            )
+        fields = (tuple(row) + (None,) * 4)[:4]
+        if any(not isinstance(field, (str, type(None))) for field in fields):
+            errors.append((number, "Fields must be text!"))
+            continue
+        if any(field and ("\n" in field or "\r" in field) for field in fields):
+            errors.append((number, "Fields must not contain line breaks!"))
+            continue
+        task, priority, due_date, recurring = fields
+        formatted_task = format_task(
+            task or "", priority or "MEDIUM", due_date or None, recurring or None
+        )
+        if formatted_task is None:
+            errors.append((number, "Invalid priority level or date format!"))
+        elif formatted_task in batch:
+            errors.append((number, "Task already exists!"))
+        else:
+            batch[formatted_task] = number
+
+    def mutate(store):
+        # Rows were read and validated above, outside the file lock.
+        new = [task for task in batch if task not in store]
+        duplicates = [
+            (batch[task], "Task already exists!") for task in batch if task in store
+        ]
+        store.extend(new)
+        _record([["+", task] for task in new])
+        return (len(new), duplicates), bool(new)
+
+    added, duplicates = _commits.submit(mutate) if batch else (0, [])
+    return {"added": added, "errors": sorted(errors + duplicates)}
+
+
+def _find_to_remove(store, task_name, priority):
+    """Return the id of the task remove_task would remove, or None."""
+    priority = priority.upper() if priority else None
+    task_id = store.find(task_name, priority)
+    if task_id is None:
+        # Fall back to a name match through the search index: a prefix of
+        # the name within the priority, or a case-insensitive substring.
+        matches = store.search(
+            task_name,
+            priority,
+            prefix=bool(priority),
+            ignore_case=not priority,
+            limit=1,
+        )
+        task_id = matches[0] if matches else None
+    return task_id
 
 
 def remove_task(task_name, priority=None):
-    """Remove a task by exact match."""
-    global tasks
-    matching_tasks = (
-        [t for t in tasks if f"[{priority}] {task_name}" in t]
-        if priority
-        else [t for t in tasks if task_name.lower() in t.lower()]
-    )
-    if not matching_tasks:
-        return "Task not found!"
-    tasks.remove(matching_tasks[0])
-    write_tasks(tasks)
-    return "Task removed successfully!"
+    """Remove a task, preferring an exact name match over a substring match."""
+
+    def mutate(store):
+        task_id = _find_to_remove(store, task_name, priority)
+        if task_id is None:
+            return "Task not found!", False
+        removed = store.remove(task_id)
+        _record([["-", str(removed)]])
+        return "Task removed successfully!", True
+
+    return _commits.submit(mutate)
 
 
 def update_task(task_name, priority=None, due_date=None):
     """Update a task’s priority or due date while preserving recurrence."""
-    global tasks
-    for i, task in enumerate(tasks):
-        if f"] {task_name}" in task:  # Ensure name matches
-            old_priority = task[1 : task.index("]")]  # Extract priority
-            new_priority = priority.upper() if priority else old_priority
-
-            if priority and new_priority not in ["URGENT", "HIGH", "MEDIUM", "LOW"]:
-                return "Invalid priority level!"
-
-            new_due_date = None
-            if due_date:
-                try:
-                    new_due_date = (
-                        f" (Due: {datetime.strptime(due_date, '%Y-%m-%d').date()})"
-                    )
-                except ValueError:
-                    return "Invalid date format!"
-
-            if " (Due:" in task:
-                task_name = task.split(" (Due:")[0].strip()
-
-            recurring_tag = ""
-            if "[Recurring:" in task:
-                recurring_tag = f" {task.split('[Recurring:')[-1]}"
-
-            tasks[i] = (
-                f"[{new_priority}] {task_name}{new_due_date or ''}{recurring_tag}"
-            )
-            write_tasks(tasks)
-            return "Task updated successfully!"
 
-    return "Task not found!"
+    def mutate(store):
+        task_id = store.find(task_name)
+        if task_id is None:
+            # Ensure the name matches from its start.
+            matches = store.search(task_name, prefix=True, ignore_case=False, limit=1)
+            task_id = matches[0] if matches else None
+        if task_id is None:
+            return "Task not found!", False
+
+        task = store.get(task_id)
+        new_priority = priority.upper() if priority else task.priority
+
+        if priority and new_priority not in VALID_PRIORITIES:
+            return "Invalid priority level!", False
+
+        new_due_date = task.due
+        if due_date:
+            try:
+                new_due_date = str(parse_date(due_date))
+            except ValueError:
+                return "Invalid date format!", False
+
+        # Recurrence is carried over by replace().
+        new_task = task.replace(priority=new_priority, due=new_due_date)
+        store.replace(task_id, new_task)
+        if str(new_task) != str(task):
+            _record([["=", str(task), str(new_task)]])
+        return "Task updated successfully!", True
+
+    return _commits.submit(mutate)
+
+
+def complete_task(task_name, priority=None, today=None):
+    """
+    Mark a task done, moving it from the task file to the archive.
+
+    The task is found like remove_task finds it. Completing a recurring
+    task also adds its next occurrence unless that already exists, so the
+    series goes on.
+    """
+    import archive
+
+    today = today or date.today()
+
+    def mutate(store):
+        task_id = _find_to_remove(store, task_name, priority)
+        if task_id is None:
+            return "Task not found!", False
+        task = store.get(task_id)
+        successor = None
+        if task.recurring and task.due:
+            due = advance(parse_date(task.due), task.recurring)
+            successor = next_occurrence(task, due)
+        # Archived before the task file is saved: a crash in between leaves
+        # the task in both places rather than in neither.
+        archive.append(storage.TASK_FILE, [str(task)], "completed", today)
+        store.remove(task_id)
+        changes = [["-", str(task)]]
+        if successor is not None and successor not in store:
+            store.add(successor)
+            changes.append(["+", successor])
+        _record(changes, undoable=False)
+        return "Task completed successfully!", True
+
+    return _commits.submit(mutate)
+
+
+def archive_tasks(today=None):
+    """
+    Move superseded occurrences of recurring tasks to the archive.
+
+    An occurrence is superseded once it is overdue and a later occurrence
+    of the same task exists. Returns the number of tasks archived.
+    """
+    import archive
+
+    today = str(today or date.today())
+
+    def mutate(store):
+        latest = {}  # (priority, name, recurrence) -> latest due date
+        for task in store:
+            if task.recurring and task.due:
+                key = (task.priority, task.name, task.recurring)
+                latest[key] = max(latest.get(key, task.due), task.due)
+        superseded = [
+            str(task)
+            for task in store
+            if task.recurring
+            and task.due
+            and task.due < today
+            and task.due < latest[(task.priority, task.name, task.recurring)]
+        ]
+        archive.append(storage.TASK_FILE, superseded, "superseded", today)
+        for task in superseded:
+            store.remove(store.find_text(task))
+        _record([["-", task] for task in superseded], undoable=False)
+        return len(superseded), bool(superseded)
+
+    return _commits.submit(mutate)
+
+
+def archived_tasks(contains=None, since=None, until=None, reason=None):
+    """
+    Yield archived tasks as Archived(archived, reason, task) records.
+
+    The archive is read lazily, one monthly segment at a time, and only
+    the segments between ``since`` and ``until`` (dates or "YYYY-MM") are
+    opened. ``contains`` filters on the task text and ``reason`` picks
+    "completed" or "superseded" tasks.
+    """
+    import archive
+
+    return archive.iter_archive(storage.TASK_FILE, since, until, contains, reason)
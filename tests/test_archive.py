@@ -0,0 +1,63 @@
+import os
+import tempfile
+import unittest
+from datetime import date
+from unittest.mock import patch
+import archive
+import config
+
+
+class TestArchive(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.dir.name, "task.txt")
+        self.original_compression = config.ARCHIVE_COMPRESSION
+
+    def tearDown(self):
+        config.ARCHIVE_COMPRESSION = self.original_compression
+        self.dir.cleanup()
+
+    def test_appends_to_monthly_segments(self):
+        """Each month gets a segment that later appends add to, in either format."""
+        archive.append(self.path, ["[LOW] Buy milk"], "completed", date(2025, 3, 31))
+        config.ARCHIVE_COMPRESSION = "lzma"
+        archive.append(self.path, ["[LOW] Pay rent"], "superseded", "2025-04-01")
+        archive.append(self.path, ["[HIGH] Ship"], "completed", "2025-04-02")
+        self.assertEqual(
+            sorted(os.listdir(archive.archive_dir(self.path))),
+            ["2025-03.txt.gz", "2025-04.txt.xz"],
+        )
+        self.assertEqual(
+            list(archive.iter_archive(self.path)),
+            [
+                ("2025-03-31", "completed", "[LOW] Buy milk"),
+                ("2025-04-01", "superseded", "[LOW] Pay rent"),
+                ("2025-04-02", "completed", "[HIGH] Ship"),
+            ],
+        )
+
+    def test_queries_open_only_matching_segments(self):
+        """Date bounds skip whole segments; other filters apply per record."""
+        for month in range(1, 7):
+            archive.append(
+                self.path, [f"[LOW] Task {month}"], "completed", date(2025, month, 15)
+            )
+        with patch("gzip.open", wraps=archive.gzip.open) as mock_open:
+            found = list(archive.iter_archive(self.path, "2025-03", "2025-04"))
+        self.assertEqual([r.task for r in found], ["[LOW] Task 3", "[LOW] Task 4"])
+        self.assertEqual(mock_open.call_count, 2)
+        self.assertEqual(
+            [r.task for r in archive.iter_archive(self.path, contains="task 6")],
+            ["[LOW] Task 6"],
+        )
+        self.assertEqual(
+            list(
+                archive.iter_archive(self.path, since="2025-05-16", until="2025-06-14")
+            ),
+            [],
+        )
+        self.assertEqual(list(archive.iter_archive(self.path, reason="superseded")), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,71 @@
+import os
+import tempfile
+import unittest
+from datetime import date
+import batch
+import storage
+
+
+class TestBatch(unittest.TestCase):
+    def setUp(self):
+        """Create a directory of team task files, one of them malformed."""
+        self.dir = tempfile.TemporaryDirectory()
+        self.original_file = storage.TASK_FILE
+        self.today = date(2025, 4, 27)
+        self.files = {
+            "alpha.txt": ["[HIGH] Standup (Due: 2025-04-27) [Recurring: daily]"],
+            "beta.txt": ["[LOW] Buy milk", "[LOW] Report (Due: 2025-05-01)"],
+            "gamma.txt": ["[LOW] Rent (Due: 2025-04-01) [Recurring: yearly]"],
+        }
+        for name, lines in self.files.items():
+            with open(self.path(name), "w") as file:
+                file.writelines(f"{line}\n" for line in lines)
+
+    def tearDown(self):
+        self.assertEqual(storage.TASK_FILE, self.original_file)
+        self.dir.cleanup()
+
+    def path(self, name):
+        return os.path.join(self.dir.name, name)
+
+    def read(self, name):
+        with open(self.path(name)) as file:
+            return file.read().splitlines()
+
+    def test_task_files_from_directory_or_glob(self):
+        """A directory lists its .txt files; other patterns are globbed."""
+        expected = [self.path(name) for name in sorted(self.files)]
+        self.assertEqual(batch.task_files(self.dir.name), expected)
+        self.assertEqual(batch.task_files(self.path("a*.txt")), expected[:1])
+
+    def check_report(self, report):
+        self.assertEqual((report["files"], report["tasks"]), (3, 4))
+        self.assertEqual(report["generated"], 1)
+        self.assertEqual(
+            [result["path"] for result in report["results"]],
+            batch.task_files(self.dir.name),
+        )
+        self.assertEqual(len(report["errors"]), 1)
+        self.assertEqual(report["errors"][0]["path"], self.path("gamma.txt"))
+        self.assertIn("ValueError", report["errors"][0]["error"])
+        self.assertGreater(report["files_per_second"], 0)
+        self.assertIn(
+            "[HIGH] Standup (Due: 2025-04-28) [Recurring: daily]",
+            self.read("alpha.txt"),
+        )
+        self.assertEqual(self.read("beta.txt"), self.files["beta.txt"])
+
+    def test_process_files_inline(self):
+        """One worker processes every file in this process."""
+        paths = batch.task_files(self.dir.name)
+        self.check_report(batch.process_files(paths, self.today, workers=1))
+
+    def test_process_files_on_a_pool(self):
+        """Several workers return the same per-file results in order."""
+        paths = batch.task_files(self.dir.name)
+        report = batch.process_files(paths, self.today, workers=2, chunk_size=2)
+        self.check_report(report)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,92 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+import binary_storage
+import config
+
+
+class TestBinaryStorage(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.dir.name, "task.bin")
+        self.tasks = [
+            "[HIGH] Finish report (Due: 2025-05-01)",
+            "[LOW] Buy milk",
+            "[MEDIUM] Pay rent (Due: 2025-04-01) [Recurring: monthly]",
+        ]
+
+    def tearDown(self):
+        binary_storage._state.pop(self.path, None)
+        self.dir.cleanup()
+
+    def reload(self):
+        binary_storage._state.pop(self.path, None)
+        return binary_storage.load(self.path)
+
+    def test_round_trip(self):
+        """Tasks written in binary form load back unchanged."""
+        binary_storage.write(self.path, self.tasks)
+        self.assertEqual(self.reload(), self.tasks)
+
+    def test_load_missing_file(self):
+        """A missing binary file loads as an empty list."""
+        self.assertEqual(binary_storage.load(self.path), [])
+
+    def test_unrepresentable_task_raises_error(self):
+        """Strings that are not formatted tasks cannot be encoded."""
+        self.assertRaises(ValueError, binary_storage.encode_task, "free text")
+
+    def test_update_patches_record_in_place(self):
+        """A priority change rewrites one record without growing the file."""
+        binary_storage.write(self.path, self.tasks)
+        size = os.path.getsize(self.path)
+        updated = list(self.tasks)
+        updated[1] = "[URGENT] Buy milk (Due: 2025-06-01)"
+        binary_storage.write(self.path, updated)
+        self.assertEqual(os.path.getsize(self.path), size)
+        self.assertEqual(self.reload(), updated)
+
+    def test_patches_follow_durability_policy(self):
+        """Patching records fsyncs the file unless durability is "none"."""
+        binary_storage.write(self.path, self.tasks)
+        self.addCleanup(setattr, config, "DURABILITY", config.DURABILITY)
+        for durability, syncs in (("none", 0), ("flush", 1)):
+            config.DURABILITY = durability
+            updated = [f"[URGENT] Task {durability}", *self.tasks[1:]]
+            with patch("os.fsync") as mock_fsync:
+                binary_storage.write(self.path, updated)
+            self.assertEqual(mock_fsync.call_count, syncs, durability)
+            self.assertEqual(self.reload(), updated)
+
+    def test_append_and_remove(self):
+        """Appends fill spare slots and removals leave tombstones."""
+        binary_storage.write(self.path, self.tasks)
+        binary_storage.write(self.path, self.tasks + ["[LOW] Call John"])
+        binary_storage.write(
+            self.path, [self.tasks[0], self.tasks[2], "[LOW] Call John"]
+        )
+        self.assertEqual(
+            self.reload(), [self.tasks[0], self.tasks[2], "[LOW] Call John"]
+        )
+
+    def test_grows_when_slots_run_out(self):
+        """Running out of record slots rewrites the file with more capacity."""
+        binary_storage.write(self.path, [])
+        tasks = [f"[LOW] Task {i}" for i in range(binary_storage.MIN_CAPACITY + 1)]
+        binary_storage.write(self.path, tasks)
+        self.assertEqual(self.reload(), tasks)
+
+    def test_text_conversion_both_ways(self):
+        """Text files convert to binary and back without loss."""
+        text = os.path.join(self.dir.name, "task.txt")
+        with open(text, "w") as file:
+            file.writelines(f"{task}\n" for task in self.tasks)
+        binary_storage.to_binary(text, self.path)
+        binary_storage.to_text(self.path, text)
+        with open(text) as file:
+            self.assertEqual([line.strip() for line in file], self.tasks)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,45 @@
+import unittest
+from datetime import datetime
+from dates import parse_date
+
+
+class TestParseDate(unittest.TestCase):
+    def assertMatchesStrptime(self, text):
+        try:
+            expected = datetime.strptime(text, "%Y-%m-%d").date()
+        except ValueError:
+            self.assertRaises(ValueError, parse_date, text)
+        else:
+            self.assertEqual(parse_date(text), expected)
+
+    def test_canonical_dates(self):
+        """Zero-padded dates parse to the same date as strptime."""
+        for text in ["2025-05-01", "1900-12-31", "2100-01-01", "2024-02-29"]:
+            self.assertMatchesStrptime(text)
+
+    def test_non_canonical_dates_follow_strptime(self):
+        """Other spellings are accepted or rejected exactly like strptime."""
+        for text in ["2025-5-1", "2025-05- 1", "20250501", "2025/05/01", "May 5, 2025"]:
+            self.assertMatchesStrptime(text)
+
+    def test_invalid_dates_raise_value_error(self):
+        """Out-of-range fields raise ValueError on the fast path too."""
+        for text in [
+            "2025-02-30",
+            "2025-13-01",
+            "2025-00-10",
+            "2025-01-00",
+            "abcd-ef-gh",
+        ]:
+            self.assertMatchesStrptime(text)
+
+    def test_results_are_cached(self):
+        """Repeated dates are served from the cache."""
+        parse_date.cache_clear()
+        parse_date("2025-05-01")
+        parse_date("2025-05-01")
+        self.assertEqual(parse_date.cache_info().hits, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
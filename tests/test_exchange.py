@@ -0,0 +1,160 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+import storage
+import tasks
+from exchange import export_tasks, import_tasks
+from storage import load_tasks, write_tasks
+from tasks import add_task, add_tasks
+
+
+class TestExchange(unittest.TestCase):
+    def setUp(self):
+        """Point storage at a fresh task file in a temporary directory."""
+        self.dir = tempfile.TemporaryDirectory()
+        self.original_file = storage.TASK_FILE
+        storage.TASK_FILE = os.path.join(self.dir.name, "task.txt")
+        write_tasks([])
+        tasks.tasks = []
+
+    def tearDown(self):
+        storage.TASK_FILE = self.original_file
+        self.dir.cleanup()
+
+    def path(self, name, content=None):
+        path = os.path.join(self.dir.name, name)
+        if content is not None:
+            with open(path, "w") as file:
+                file.write(content)
+        return path
+
+    def test_add_tasks_reports_row_errors(self):
+        """Invalid and duplicate rows are reported; the rest are added."""
+        add_task("Existing", "LOW")
+        report = add_tasks(
+            [
+                {"task": "Finish report", "priority": "high", "due_date": "2025-05-01"},
+                ("Buy milk", "LOW"),
+                {"task": "Bad date", "priority": "LOW", "due_date": "May 5"},
+                ("Buy milk", "LOW"),
+                ("Existing", "LOW"),
+            ]
+        )
+        self.assertEqual(report["added"], 2)
+        self.assertEqual(
+            report["errors"],
+            [
+                (3, "Invalid priority level or date format!"),
+                (4, "Task already exists!"),
+                (5, "Task already exists!"),
+            ],
+        )
+        self.assertEqual(
+            load_tasks(),
+            [
+                "[LOW] Existing",
+                "[HIGH] Finish report (Due: 2025-05-01)",
+                "[LOW] Buy milk",
+            ],
+        )
+
+    def test_add_tasks_rejects_non_text_and_multi_line_fields(self):
+        """Fields that are not text or span lines are reported per row."""
+        report = add_tasks(
+            [
+                {"task": 5},
+                {"task": "Call John", "priority": 3},
+                {"task": "Pay\nrent"},
+                ("Buy milk", "LOW", None, "daily\r"),
+                {"task": "Water plants"},
+            ]
+        )
+        self.assertEqual(report["added"], 1)
+        self.assertEqual(
+            report["errors"],
+            [
+                (1, "Fields must be text!"),
+                (2, "Fields must be text!"),
+                (3, "Fields must not contain line breaks!"),
+                (4, "Fields must not contain line breaks!"),
+            ],
+        )
+        self.assertEqual(load_tasks(), ["[MEDIUM] Water plants"])
+
+    def test_import_multi_line_names_are_row_errors(self):
+        """Names with line breaks, from JSONL or quoted CSV, do not abort."""
+        jsonl = self.path(
+            "in.jsonl",
+            '{"task": "Pay\\nrent"}\n{"task": 7}\n{"task": "Call John"}\n',
+        )
+        self.assertEqual(
+            import_tasks(jsonl),
+            {
+                "added": 1,
+                "errors": [
+                    (1, "Fields must not contain line breaks!"),
+                    (2, "Fields must be text!"),
+                ],
+            },
+        )
+        csv_path = self.path(
+            "in.csv", 'task,priority,due_date,recurring\n"Buy\nmilk",LOW,,\n'
+        )
+        report = import_tasks(csv_path)
+        self.assertEqual(report["added"], 0)
+        self.assertEqual(len(report["errors"]), 1)
+        self.assertEqual(load_tasks(), ["[MEDIUM] Call John"])
+
+    def test_add_tasks_writes_once(self):
+        """A bulk add persists with a single write."""
+        with patch("tasks.write_tasks") as mock_write:
+            add_tasks((f"Task {i}", "LOW") for i in range(100))
+        mock_write.assert_called_once()
+
+    def test_import_csv(self):
+        """CSV rows are imported with defaults for empty columns."""
+        path = self.path(
+            "in.csv",
+            "task,priority,due_date,recurring\n"
+            "Pay rent,LOW,2025-05-01,monthly\n"
+            "Call John,,,\n",
+        )
+        report = import_tasks(path)
+        self.assertEqual(report, {"added": 2, "errors": []})
+        self.assertEqual(
+            load_tasks(),
+            [
+                "[LOW] Pay rent (Due: 2025-05-01) [Recurring: monthly]",
+                "[MEDIUM] Call John",
+            ],
+        )
+
+    def test_import_jsonl_with_malformed_line(self):
+        """A malformed JSONL line is reported without stopping the import."""
+        path = self.path(
+            "in.jsonl",
+            '{"task": "Pay rent", "priority": "LOW"}\n{not json\n{"task": "Call John"}\n',
+        )
+        report = import_tasks(path)
+        self.assertEqual(report, {"added": 2, "errors": [(2, "Malformed JSON line!")]})
+
+    def test_export_round_trip(self):
+        """Exported files import back to the same tasks."""
+        add_task("Pay rent", "LOW", "2025-05-01", "monthly")
+        add_task("Call John", "HIGH")
+        for name in ("out.csv", "out.jsonl"):
+            path = self.path(name)
+            self.assertEqual(export_tasks(path), 2)
+            exported = load_tasks()
+            write_tasks([])
+            import_tasks(path)
+            self.assertEqual(load_tasks(), exported)
+
+    def test_unknown_format_raises_error(self):
+        """Only CSV and JSONL are supported."""
+        self.assertRaises(ValueError, import_tasks, self.path("in.xml", ""))
+
+
+if __name__ == "__main__":
+    unittest.main()
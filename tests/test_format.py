@@ -4,7 +4,7 @@ import os
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
 import unittest
-from format import format_task
+from format import Task, format_task
 from config import VALID_PRIORITIES, VALID_RECURRENCES
 
 
@@ -88,6 +88,41 @@ class TestFormat(unittest.TestCase):
         expected = "[MEDIUM] Task without recurrence (Due: 2025-06-15)"
         self.assertEqual(result, expected)
 
+    def test_task_parse_fields(self):
+        """Task.parse splits a task string into its fields."""
+        task = Task.parse("[HIGH] Finish report (Due: 2025-05-01) [Recurring: daily]")
+        self.assertEqual(task.priority, "HIGH")
+        self.assertEqual(task.name, "Finish report")
+        self.assertEqual(task.due, "2025-05-01")
+        self.assertEqual(task.recurring, "daily")
+
+    def test_task_parse_name_only(self):
+        """Missing due date and recurrence parse as None."""
+        task = Task.parse("[LOW] Buy milk")
+        self.assertEqual(
+            (task.name, task.due, task.recurring), ("Buy milk", None, None)
+        )
+
+    def test_task_round_trip(self):
+        """A parsed task serializes back to the same string."""
+        text = "[MEDIUM] Meeting @ 3PM! (Due: 2025-09-01) [Recurring: weekly]"
+        self.assertEqual(str(Task.parse(text)), text)
+
+    def test_task_replace_reserializes(self):
+        """replace() returns a copy whose string reflects the new fields."""
+        task = Task.parse("[LOW] Pay rent (Due: 2025-04-01) [Recurring: monthly]")
+        self.assertEqual(
+            str(task.replace(due="2025-05-01")),
+            "[LOW] Pay rent (Due: 2025-05-01) [Recurring: monthly]",
+        )
+        self.assertEqual(
+            str(task), "[LOW] Pay rent (Due: 2025-04-01) [Recurring: monthly]"
+        )
+
+    def test_task_has_slots(self):
+        """Task records carry no per-instance __dict__."""
+        self.assertFalse(hasattr(Task.parse("[LOW] Buy milk"), "__dict__"))
+
 
 if __name__ == "__main__":
     unittest.main()
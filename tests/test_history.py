@@ -0,0 +1,71 @@
+import os
+import tempfile
+import unittest
+import history
+from history import History
+from store import TaskStore
+
+
+class TestHistory(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.dir.name, "task.txt.history")
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def test_invert_and_apply(self):
+        """Inverted changes take a store back; stale changes are refused."""
+        store = TaskStore(["[LOW] Buy milk", "[HIGH] Pay rent"])
+        changes = [["-", "[LOW] Buy milk"], ["=", "[HIGH] Pay rent", "[LOW] Pay rent"]]
+        self.assertTrue(history.apply(store, changes))
+        self.assertEqual(store.to_list(), ["[LOW] Pay rent"])
+        self.assertFalse(history.apply(store, changes))
+        self.assertTrue(history.apply(store, history.invert(changes)))
+        self.assertCountEqual(store.to_list(), ["[LOW] Buy milk", "[HIGH] Pay rent"])
+
+    def test_ring_buffer_keeps_the_latest_entries(self):
+        """Only the latest ``size`` operations are kept."""
+        changes = History(size=3)
+        for i in range(5):
+            changes.record([["+", f"[LOW] Task {i}"]])
+        self.assertEqual(
+            [entry[0][1] for entry in changes.done],
+            ["[LOW] Task 2", "[LOW] Task 3", "[LOW] Task 4"],
+        )
+
+    def test_log_is_replayed_and_compacted(self):
+        """A new History rereads the log, which stays bounded by compaction."""
+        changes = History(self.path, size=2)
+        for i in range(6):
+            changes.record([["+", f"[LOW] Task {i}"]])
+            changes.mark_undone()
+            changes.mark_redone()
+            changes.commit()
+        changes.mark_undone()
+        changes.commit()
+        with open(self.path) as file:
+            self.assertLessEqual(len(file.readlines()), 5)
+        reread = History(self.path, size=2)
+        reread.refresh()
+        self.assertEqual(list(reread.done), list(changes.done))
+        self.assertEqual(list(reread.undone), [[["+", "[LOW] Task 5"]]])
+
+    def test_discarded_steps_are_rolled_back(self):
+        """Steps whose tasks were never saved are neither kept nor logged."""
+        changes = History(self.path)
+        changes.record([["+", "[LOW] Saved"]])
+        changes.commit()
+        changes.record([["+", "[LOW] Lost"]])
+        changes.mark_undone()
+        changes.mark_undone()
+        changes.discard()
+        self.assertEqual(list(changes.done), [[["+", "[LOW] Saved"]]])
+        self.assertEqual(list(changes.undone), [])
+        reread = History(self.path)
+        reread.refresh()
+        self.assertEqual(list(reread.done), list(changes.done))
+
+
+if __name__ == "__main__":
+    unittest.main()
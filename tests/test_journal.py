@@ -0,0 +1,103 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+import config
+import journal
+import storage
+
+
+class TestJournal(unittest.TestCase):
+    def setUp(self):
+        """Point storage at a fresh file and switch to the journal backend."""
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.dir.name, "task.txt")
+        self.original_file = storage.TASK_FILE
+        self.original_backend = config.STORAGE_BACKEND
+        storage.TASK_FILE = self.path
+        config.STORAGE_BACKEND = "journal"
+
+    def tearDown(self):
+        journal.wait_for_compaction()
+        storage.TASK_FILE = self.original_file
+        config.STORAGE_BACKEND = self.original_backend
+        journal._state.pop(self.path, None)
+        self.dir.cleanup()
+
+    def reload(self):
+        """Forget cached state so the next load replays from disk."""
+        journal._state.pop(self.path, None)
+        return storage.load_tasks()
+
+    def test_diff_records(self):
+        """Appends, a deletion and replacements become small changes."""
+        self.assertEqual(journal.diff(["a"], ["a", "b"]), [("+", None, "b")])
+        self.assertEqual(journal.diff(["a", "b", "c"], ["a", "c"]), [("-", 1, None)])
+        self.assertEqual(journal.diff(["a", "b"], ["a", "x"]), [("=", 1, "x")])
+        self.assertIsNone(journal.diff(["a", "b", "c"], ["c"]))
+
+    def test_mutations_append_to_journal_only(self):
+        """The snapshot is untouched while mutations are journaled."""
+        with open(self.path, "w") as file:
+            file.write("[HIGH] One\n[LOW] Two\n")
+        snapshot = os.stat(self.path)
+        storage.write_tasks(["[HIGH] One", "[LOW] Two", "[MEDIUM] Three"])
+        storage.write_tasks(["[HIGH] One", "[MEDIUM] Three"])
+        storage.write_tasks(["[URGENT] One", "[MEDIUM] Three"])
+        self.assertEqual(os.stat(self.path).st_mtime_ns, snapshot.st_mtime_ns)
+        self.assertEqual(self.reload(), ["[URGENT] One", "[MEDIUM] Three"])
+
+    def test_appends_follow_durability_policy(self):
+        """Journal appends are fsynced unless durability is "none"."""
+        storage.write_tasks(["[HIGH] One"])
+        self.addCleanup(setattr, config, "DURABILITY", config.DURABILITY)
+        for durability, syncs in (("none", 0), ("flush", 1)):
+            config.DURABILITY = durability
+            with patch("os.fsync") as mock_fsync:
+                storage.write_tasks(["[HIGH] One", f"[LOW] {durability}"])
+            self.assertEqual(mock_fsync.call_count, syncs, durability)
+
+    def test_stale_journal_is_ignored(self):
+        """A text-mode rewrite of the snapshot invalidates the old journal."""
+        storage.write_tasks(["[HIGH] One"])
+        storage.write_tasks(["[HIGH] One", "[LOW] Two"])
+        with open(self.path, "w") as file:
+            file.write("[LOW] Replaced\n")
+        self.assertEqual(self.reload(), ["[LOW] Replaced"])
+
+    def test_compaction_past_threshold(self):
+        """Crossing the size threshold folds the journal into the snapshot."""
+        storage.write_tasks([])
+        with patch.object(config, "JOURNAL_COMPACT_BYTES", 64):
+            storage.write_tasks([f"[LOW] Task {i}" for i in range(10)])
+            journal.wait_for_compaction()
+        with open(self.path) as file:
+            self.assertEqual(len(file.readlines()), 10)
+        with open(journal.journal_path(self.path)) as file:
+            self.assertEqual(len(file.readlines()), 1)
+        self.assertEqual(self.reload(), [f"[LOW] Task {i}" for i in range(10)])
+
+    def test_compaction_keeps_records_from_other_processes(self):
+        """Compaction replays the journal on disk, not this process's copy."""
+        storage.write_tasks([])
+        storage.write_tasks(["[LOW] a"])
+        with open(journal.journal_path(self.path), "a") as file:
+            file.write("+ [LOW] b\n")  # Appended by another process
+        journal.compact(self.path)
+        self.assertEqual(self.reload(), ["[LOW] a", "[LOW] b"])
+
+    def test_stale_writer_rebases_on_disk_state(self):
+        """Records index the list on disk, not one cached before another write."""
+        storage.write_tasks(["[LOW] a", "[LOW] b", "[LOW] c", "[LOW] d"])
+        stale = journal._state[self.path]
+        storage.write_tasks(["[LOW] b", "[LOW] c", "[LOW] d"])  # Another process
+        journal._state[self.path] = stale
+        storage.write_tasks(["[LOW] a", "[LOW] b", "[LOW] c", "[LOW] X"])
+        journal._state.pop(self.path)
+        self.assertEqual(
+            journal.load(self.path), ["[LOW] a", "[LOW] b", "[LOW] c", "[LOW] X"]
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,85 @@
+import json
+import os
+import tempfile
+import unittest
+import metrics
+import recurring
+import storage
+import tasks
+
+
+class TestMetrics(unittest.TestCase):
+    def setUp(self):
+        """Point storage at a fresh task file and start recording."""
+        self.dir = tempfile.TemporaryDirectory()
+        self.original_file = storage.TASK_FILE
+        storage.TASK_FILE = os.path.join(self.dir.name, "task.txt")
+        storage.write_tasks([])
+        tasks.tasks = []
+        self.original_add_task = tasks.add_task
+        metrics.reset()
+        metrics.enable()
+
+    def tearDown(self):
+        metrics.disable()
+        metrics.reset()
+        storage.TASK_FILE = self.original_file
+        self.dir.cleanup()
+
+    def test_disabled_functions_are_untouched(self):
+        """Disabling restores the original function objects everywhere."""
+        self.assertIsNot(tasks.add_task, self.original_add_task)
+        self.assertIs(recurring.write_tasks, storage.write_tasks)
+        metrics.disable()
+        self.assertFalse(metrics.enabled())
+        self.assertIs(tasks.add_task, self.original_add_task)
+        self.assertIs(tasks.write_tasks, storage.write_tasks)
+        self.assertFalse(hasattr(storage.write_tasks, "__wrapped__"))
+
+    def test_calls_latency_and_io_are_recorded(self):
+        """Nested calls, byte counts and scanned tasks show up in the snapshot."""
+        tasks.add_task("Buy milk", "LOW")
+        tasks.view_tasks()
+        list(storage.iter_tasks())
+        data = metrics.snapshot()
+        functions = data["functions"]
+        self.assertEqual(functions["tasks.add_task"]["calls"], 1)
+        self.assertEqual(functions["tasks.view_tasks"]["calls"], 1)
+        self.assertEqual(functions["recurring.process_recurring_tasks"]["calls"], 1)
+        self.assertEqual(functions["storage.iter_tasks"]["calls"], 1)
+        self.assertEqual(sum(functions["tasks.add_task"]["buckets"].values()), 1)
+        self.assertEqual(data["counters"]["bytes_written"], len("[LOW] Buy milk\n"))
+        self.assertGreaterEqual(data["counters"]["tasks_scanned"], 1)
+        self.assertGreater(data["counters"]["bytes_read"], 0)
+
+    def test_errors_are_counted(self):
+        """Calls that raise are counted as errors."""
+        self.assertRaises(
+            ValueError,
+            recurring.parse_recurring,
+            "[LOW] X (Due: 2025-01-01) [Recurring: hourly]",
+        )
+        stats = metrics.snapshot()["functions"]["recurring.parse_recurring"]
+        self.assertEqual((stats["calls"], stats["errors"]), (1, 1))
+
+    def test_export_formats(self):
+        """Snapshots export as JSON or Prometheus text by file extension."""
+        tasks.add_task("Buy milk", "LOW")
+        prom = os.path.join(self.dir.name, "todo.prom")
+        metrics.export(prom)
+        with open(prom) as file:
+            text = file.read()
+        self.assertIn('todo_calls_total{function="tasks.add_task"} 1', text)
+        self.assertIn(
+            'todo_call_duration_seconds_bucket{function="tasks.add_task",le="+Inf"} 1',
+            text,
+        )
+        self.assertIn("todo_bytes_written_total 15", text)
+        path = os.path.join(self.dir.name, "metrics.json")
+        metrics.export(path)
+        with open(path) as file:
+            self.assertEqual(json.load(file), metrics.snapshot())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,60 @@
+import os
+import tempfile
+import time
+import unittest
+import profiling
+from profiling import phase
+
+
+class TestProfiling(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.dir.name, "report.txt")
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def test_phase_is_inert_outside_a_profile(self):
+        """Phases record nothing unless a profile is running."""
+        with phase("load"):
+            pass
+        self.assertIsNone(profiling._phases)
+
+    def test_report_sections(self):
+        """The report has phase times, allocation hotspots and cProfile stats."""
+
+        def run():
+            with phase("load"):
+                time.sleep(0.01)
+            with phase("custom"):
+                data = [str(i) for i in range(1000)]
+            return len(data)
+
+        self.assertEqual(profiling.profile(run, self.path, "list", top=5), 1000)
+        with open(self.path) as file:
+            report = file.read()
+        self.assertIn("todo.py profile report: list", report)
+        load_ms = float(report.split("  load")[1].split("ms")[0])
+        self.assertGreaterEqual(load_ms, 10)
+        self.assertIn("  custom", report)
+        self.assertIn("nested phases excluded", report)
+        self.assertIn("Allocation hotspots (top 5", report)
+        self.assertIn("cProfile top 5 by cumulative time", report)
+        self.assertIsNone(profiling._phases)
+
+    def test_nested_phases_are_exclusive(self):
+        """Time in a nested phase is not counted again for the outer one."""
+
+        def run():
+            with phase("recurring"):
+                with phase("load"):
+                    time.sleep(0.05)
+            return profiling._phases
+
+        phases = profiling.profile(run, self.path)
+        self.assertGreaterEqual(phases["load"], 0.05)
+        self.assertLess(phases["recurring"], 0.025)
+
+
+if __name__ == "__main__":
+    unittest.main()
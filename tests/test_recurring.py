@@ -1,6 +1,15 @@
+import json
+import os
+import tempfile
 import unittest
 from datetime import datetime, timedelta
+from unittest.mock import patch
+import recurring
+import storage
+import tasks
+from history import apply
 from recurring import process_recurring_tasks
+from store import TaskStore
 
 
 class TestRecurringTasks(unittest.TestCase):
@@ -147,6 +156,237 @@ class TestRecurringTasks(unittest.TestCase):
         # (e.g., by redirecting stdout), but even just calling this function forces the branch to run.
         self.assertEqual(tasks, [])
 
+    def test_no_write_when_nothing_due(self):
+        """Nothing is written when no recurring task has come due."""
+        with patch("recurring.write_tasks") as mock_write:
+            process_recurring_tasks(
+                ["[LOW] Future (Due: 2050-01-01) [Recurring: daily]"], self.fixed_today
+            )
+        mock_write.assert_not_called()
+
+    def test_repeated_processing_does_not_duplicate(self):
+        """A task whose next instance already exists is not processed again."""
+        tasks = ["[HIGH] Task (Due: 2025-04-27) [Recurring: weekly]"]
+        process_recurring_tasks(tasks, today=self.fixed_today)
+        process_recurring_tasks(tasks, today=self.fixed_today)
+        self.assertEqual(
+            tasks,
+            [
+                "[HIGH] Task (Due: 2025-04-27) [Recurring: weekly]",
+                "[HIGH] Task (Due: 2025-05-04) [Recurring: weekly]",
+            ],
+        )
+
+    def test_catch_up_generates_every_missing_occurrence(self):
+        """Catch-up mode fills in every occurrence up to today in one pass."""
+        tasks = [
+            "[HIGH] Standup (Due: 2025-04-24) [Recurring: daily]",
+            "[LOW] Pay rent (Due: 2025-01-15) [Recurring: monthly]",
+        ]
+        process_recurring_tasks(tasks, today=self.fixed_today, catch_up=True)
+        self.assertCountEqual(
+            tasks[2:],
+            [
+                "[HIGH] Standup (Due: 2025-04-25) [Recurring: daily]",
+                "[HIGH] Standup (Due: 2025-04-26) [Recurring: daily]",
+                "[HIGH] Standup (Due: 2025-04-27) [Recurring: daily]",
+                "[HIGH] Standup (Due: 2025-04-28) [Recurring: daily]",
+                "[HIGH] Standup (Due: 2025-04-29) [Recurring: daily]",
+                "[LOW] Pay rent (Due: 2025-02-15) [Recurring: monthly]",
+                "[LOW] Pay rent (Due: 2025-03-15) [Recurring: monthly]",
+                "[LOW] Pay rent (Due: 2025-04-15) [Recurring: monthly]",
+                "[LOW] Pay rent (Due: 2025-05-15) [Recurring: monthly]",
+            ],
+        )
+
+    def test_catch_up_writes_once(self):
+        """Catch-up persists all new occurrences with a single write."""
+        tasks = ["[HIGH] Review (Due: 2025-01-01) [Recurring: weekly]"]
+        with patch("recurring.write_tasks") as mock_write:
+            process_recurring_tasks(tasks, today=self.fixed_today, catch_up=True)
+        mock_write.assert_called_once()
+
+    @unittest.skipIf(recurring._numpy() is None, "NumPy is not installed")
+    def test_numpy_expansion_matches_python(self):
+        """The vectorized expansion agrees with the pure-Python fallback."""
+        entries = [
+            (datetime(2024, 12, 5).date(), "monthly"),
+            (datetime(2025, 4, 28).date(), "daily"),
+            (datetime(2025, 2, 3).date(), "weekly"),
+            (datetime(2025, 3, 29).date(), "monthly"),
+            (datetime(2025, 6, 1).date(), "weekly"),
+            (datetime(2025, 7, 10).date(), "monthly"),
+        ]
+        self.assertEqual(
+            recurring._expand_numpy(entries, self.fixed_today),
+            recurring._expand_python(entries, self.fixed_today),
+        )
+
+
+class TestRecurringScheduler(unittest.TestCase):
+    def setUp(self):
+        """Point storage at a temporary task file with one daily task."""
+        self.dir = tempfile.TemporaryDirectory()
+        self.original_file = storage.TASK_FILE
+        storage.TASK_FILE = os.path.join(self.dir.name, "task.txt")
+        recurring._scheduler = recurring.RecurringScheduler()
+        storage.write_tasks(["[HIGH] Standup (Due: 2025-04-27) [Recurring: daily]"])
+
+    def tearDown(self):
+        storage.TASK_FILE = self.original_file
+        recurring._scheduler = recurring.RecurringScheduler()
+        self.dir.cleanup()
+
+    def test_heap_orders_by_due_date(self):
+        """The scheduler pops the earliest due date first."""
+        scheduler = recurring.RecurringScheduler()
+        scheduler.rebuild(
+            [
+                "[LOW] Later (Due: 2025-05-01) [Recurring: daily]",
+                "[LOW] Sooner (Due: 2025-04-01) [Recurring: daily]",
+                "[LOW] Plain (Due: 2025-03-01)",
+            ]
+        )
+        self.assertEqual(scheduler.next_due(), datetime(2025, 4, 1).date())
+
+    def test_rebuild_from_a_store(self):
+        """A store supplies candidates from its due index and its own membership."""
+        scheduler = recurring.RecurringScheduler()
+        scheduler.rebuild(
+            TaskStore(
+                [
+                    "[LOW] Later (Due: 2025-05-01) [Recurring: daily]",
+                    "[LOW] Sooner (Due: 2025-04-01) [Recurring: daily]",
+                    "[LOW] Sooner (Due: 2025-04-02) [Recurring: daily]",
+                    "[LOW] Plain (Due: 2025-03-01)",
+                ]
+            )
+        )
+        self.assertEqual(scheduler.next_due(), datetime(2025, 4, 2).date())
+
+    def test_run_on_a_store(self):
+        """A store rebuilt from and run against generates each occurrence once."""
+        store = TaskStore(
+            [
+                "[LOW] Standup (Due: 2025-04-26) [Recurring: daily]",
+                "[LOW] Review (Due: 2025-04-20) [Recurring: weekly]",
+                "[LOW] Review (Due: 2025-04-27) [Recurring: weekly]",
+            ]
+        )
+        scheduler = recurring.RecurringScheduler()
+        scheduler.rebuild(store)
+        today = datetime(2025, 4, 27).date()
+        self.assertEqual(
+            scheduler.run(store, today, catch_up=True),
+            [
+                "[LOW] Standup (Due: 2025-04-27) [Recurring: daily]",
+                "[LOW] Standup (Due: 2025-04-28) [Recurring: daily]",
+                "[LOW] Review (Due: 2025-05-04) [Recurring: weekly]",
+            ],
+        )
+
+    def test_stored_tasks_processed_through_a_store(self):
+        """The pass can run on a store the caller loads and saves."""
+        store = TaskStore(storage.load_tasks())
+        saved = []
+        today = datetime(2025, 4, 27).date()
+        process_recurring_tasks(
+            today=today, load=lambda: store, save=lambda s: saved.append(s.to_list())
+        )
+        self.assertEqual(
+            saved,
+            [
+                [
+                    "[HIGH] Standup (Due: 2025-04-27) [Recurring: daily]",
+                    "[HIGH] Standup (Due: 2025-04-28) [Recurring: daily]",
+                ]
+            ],
+        )
+
+    def test_own_changes_update_the_schedule(self):
+        """Changes saved through tasks.py are scheduled without a rebuild."""
+        today = datetime(2025, 4, 27).date()
+        self.addCleanup(setattr, tasks, "tasks", None)
+        tasks.tasks = None
+
+        def run():
+            process_recurring_tasks(today=today, load=tasks._store, save=tasks._save)
+
+        run()
+        tasks.add_task("Review", "LOW", "2025-04-20", "weekly")
+        self.assertEqual(recurring._scheduler.next_due(), datetime(2025, 4, 20).date())
+        with patch.object(recurring.RecurringScheduler, "rebuild") as mock_rebuild:
+            run()
+        mock_rebuild.assert_not_called()
+        self.assertIn(
+            "[LOW] Review (Due: 2025-04-27) [Recurring: weekly]", storage.load_tasks()
+        )
+        # A new process picks up the saved schedule after this one's change.
+        recurring._scheduler = recurring.RecurringScheduler()
+        tasks.add_task("Water plants", "LOW", "2025-04-10", "daily")
+        with open(recurring.state_path()) as file:
+            self.assertEqual(json.load(file)["next_due"], "2025-04-10")
+        # A write from another process still rebuilds the schedule.
+        storage.write_tasks(storage.load_tasks()[:1])
+        with patch.object(recurring.RecurringScheduler, "rebuild") as mock_rebuild:
+            run()
+        mock_rebuild.assert_called_once()
+
+    def test_changes_schedule_like_a_rebuild(self):
+        """Incremental entries match what a rebuild schedules for the changes."""
+        before = [
+            "[LOW] Rent (Due: 2025-03-30) [Recurring: monthly]",
+            "[LOW] Rent (Due: 2025-04-30) [Recurring: monthly]",
+            "[LOW] Gym (Due: 2025-04-20) [Recurring: weekly]",
+            "[LOW] Gym (Due: 2025-04-27) [Recurring: weekly]",
+        ]
+        changes = [
+            ["-", "[LOW] Rent (Due: 2025-04-30) [Recurring: monthly]"],
+            [
+                "=",
+                "[LOW] Gym (Due: 2025-04-27) [Recurring: weekly]",
+                "[HIGH] Gym (Due: 2025-04-27) [Recurring: weekly]",
+            ],
+            ["+", "[LOW] Standup (Due: 2025-04-26) [Recurring: daily]"],
+        ]
+        store = TaskStore(before)
+        self.assertTrue(apply(store, changes))
+        scheduler, rebuilt = (
+            recurring.RecurringScheduler(),
+            recurring.RecurringScheduler(),
+        )
+        scheduler.rebuild(TaskStore(before))
+        for entry in recurring._to_schedule(changes, store):
+            scheduler.heap.append(entry)
+        rebuilt.rebuild(store)
+        live = sorted(entry for entry in scheduler.heap if entry[1] in store)
+        self.assertEqual(live, sorted(rebuilt.heap))
+
+    def test_stored_tasks_processed_once(self):
+        """A second run on the same day neither loads nor writes the task file."""
+        today = datetime(2025, 4, 27).date()
+        process_recurring_tasks(today=today)
+        self.assertIn(
+            "[HIGH] Standup (Due: 2025-04-28) [Recurring: daily]", storage.load_tasks()
+        )
+        with patch("recurring.load_tasks") as mock_load, patch(
+            "recurring.write_tasks"
+        ) as mock_write:
+            process_recurring_tasks(today=today)
+        mock_load.assert_not_called()
+        mock_write.assert_not_called()
+
+    def test_watermark_survives_a_new_process(self):
+        """A fresh scheduler trusts the saved state while the file is unchanged."""
+        today = datetime(2025, 4, 27).date()
+        process_recurring_tasks(today=today)
+        with open(recurring.state_path()) as file:
+            self.assertEqual(json.load(file)["next_due"], "2025-04-28")
+        recurring._scheduler = recurring.RecurringScheduler()
+        with patch("recurring.load_tasks") as mock_load:
+            process_recurring_tasks(today=today)
+        mock_load.assert_not_called()
+
 
 if __name__ == "__main__":
     unittest.main()
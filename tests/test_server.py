@@ -0,0 +1,114 @@
+import asyncio
+import os
+import tempfile
+import threading
+import unittest
+from unittest.mock import patch
+import server
+import storage
+import tasks
+import todo
+from server import Client
+from storage import load_tasks, write_tasks
+
+
+class TestServer(unittest.TestCase):
+    def setUp(self):
+        """Start a server on a temporary socket and task file."""
+        self.dir = tempfile.TemporaryDirectory()
+        self.original_file = storage.TASK_FILE
+        self.original_commits = tasks._commits
+        storage.TASK_FILE = os.path.join(self.dir.name, "task.txt")
+        write_tasks([])
+        tasks.tasks = []
+        self.address = os.path.join(self.dir.name, "todo.sock")
+        self.loop = asyncio.new_event_loop()
+        self.started = threading.Event()
+        self.thread = threading.Thread(
+            target=self.loop.run_until_complete, args=(self.run_server(),)
+        )
+        self.thread.start()
+        self.started.wait()
+
+    async def run_server(self):
+        ready = asyncio.Event()
+        self.serving = asyncio.ensure_future(
+            server.serve(self.address, interval=3600, max_dirty=3, ready=ready)
+        )
+        await ready.wait()
+        self.started.set()
+        try:
+            await self.serving
+        except asyncio.CancelledError:
+            pass
+
+    def stop(self):
+        if self.thread.is_alive():
+            self.loop.call_soon_threadsafe(self.serving.cancel)
+            self.thread.join()
+
+    def tearDown(self):
+        self.stop()
+        self.loop.close()
+        tasks._commits = self.original_commits
+        storage.TASK_FILE = self.original_file
+        self.dir.cleanup()
+
+    def test_operations_round_trip(self):
+        """Requests reach the task functions and return their results."""
+        with Client(self.address) as client:
+            self.assertEqual(
+                client.request("add", task="Buy milk", priority="LOW"),
+                "Task added successfully!",
+            )
+            client.request("add", task="Ship release", priority="URGENT")
+            client.request("update", task_name="Buy milk", priority="HIGH")
+            self.assertEqual(
+                client.request("search", query="ship"), ["[URGENT] Ship release"]
+            )
+            self.assertEqual(
+                client.request("remove", task_name="ship"), "Task removed successfully!"
+            )
+            self.assertEqual(client.request("view"), ["[HIGH] Buy milk"])
+
+    def test_cli_client_exit_status(self):
+        """The client command connects to --address and fails on failed requests."""
+        with patch("builtins.print"), patch("sys.stderr"):
+            self.assertEqual(
+                todo.cli(["client", "--address", self.address, "add", "task=Buy milk"]),
+                0,
+            )
+            self.assertEqual(
+                todo.cli(
+                    ["client", "--address", self.address, "remove", "task_name=x"]
+                ),
+                1,
+            )
+
+    def test_errors_are_reported(self):
+        """Unknown operations and bad arguments come back as errors."""
+        with Client(self.address) as client:
+            self.assertRaisesRegex(
+                RuntimeError, "Unknown operation", client.request, "nope"
+            )
+            self.assertRaises(RuntimeError, client.request, "add", colour="red")
+            self.assertEqual(client.request("view"), [])
+
+    def test_writes_behind(self):
+        """Mutations are written once enough are pending, and on shutdown."""
+        with Client(self.address) as client:
+            client.request("add", task="One", priority="LOW")
+            client.request("add", task="Two", priority="LOW")
+            self.assertEqual(load_tasks(), [])
+            client.request("add", task="Three", priority="LOW")
+            self.assertEqual(len(load_tasks()), 3)
+            client.request("add", task="Four", priority="LOW")
+        self.stop()
+        self.assertEqual(
+            load_tasks(), ["[LOW] One", "[LOW] Two", "[LOW] Three", "[LOW] Four"]
+        )
+        self.assertFalse(os.path.exists(self.address))
+
+
+if __name__ == "__main__":
+    unittest.main()
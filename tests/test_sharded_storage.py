@@ -0,0 +1,99 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+import config
+import sharded_storage
+import storage
+import tasks
+
+
+class TestShardedStorage(unittest.TestCase):
+    def setUp(self):
+        """Point storage at a fresh file and switch to the sharded backend."""
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.dir.name, "task.txt")
+        self.shards = sharded_storage.shard_dir(self.path)
+        self.original_file = storage.TASK_FILE
+        self.original_backend = config.STORAGE_BACKEND
+        storage.TASK_FILE = self.path
+        config.STORAGE_BACKEND = "sharded"
+        self.tasks = [
+            "[HIGH] Finish report (Due: 2025-05-01)",
+            "[LOW] Buy milk",
+            "[HIGH] Pay rent (Due: 2025-04-01) [Recurring: monthly]",
+        ]
+
+    def tearDown(self):
+        storage.TASK_FILE = self.original_file
+        config.STORAGE_BACKEND = self.original_backend
+        tasks.tasks = None
+        self.dir.cleanup()
+
+    def reload(self):
+        """Forget the cached task list so the next load reads from disk."""
+        storage.clear_cache()
+        return storage.load_tasks()
+
+    def test_round_trip_by_priority(self):
+        """Tasks are split into one file per priority and load back."""
+        storage.write_tasks(self.tasks)
+        self.assertEqual(
+            sorted(os.listdir(self.shards)), ["HIGH.txt", "LOW.txt", "layout"]
+        )
+        self.assertEqual(sorted(self.reload()), sorted(self.tasks))
+        self.assertEqual(sorted(map(str, storage.iter_tasks())), sorted(self.tasks))
+
+    def test_round_trip_by_hash(self):
+        """The hash layout is recorded and used by later writes."""
+        sharded_storage.write(self.path, self.tasks, "hash", 4)
+        self.assertEqual(sharded_storage.read_layout(self.path), ("hash", 4))
+        storage.write_tasks(self.tasks + ["[URGENT] Call vendor"])
+        names = set(os.listdir(self.shards)) - {"layout"}
+        self.assertTrue(names <= {"000.txt", "001.txt", "002.txt", "003.txt"})
+        self.assertEqual(
+            sorted(self.reload()), sorted(self.tasks + ["[URGENT] Call vendor"])
+        )
+
+    def test_order_is_kept_within_each_shard(self):
+        """Tasks load shard by shard, each shard in insertion order."""
+        storage.write_tasks(self.tasks)
+        self.assertEqual(self.reload(), [self.tasks[0], self.tasks[2], self.tasks[1]])
+        self.assertEqual(list(sharded_storage.iter_tasks(self.path)), self.reload())
+
+    def test_only_touched_shards_are_rewritten(self):
+        """A mutation replaces its own shard and leaves the others alone."""
+        storage.write_tasks(self.tasks)
+        with patch("storage.atomic_write", wraps=storage.atomic_write) as mock_write:
+            tasks.add_task("Buy bread", "LOW")
+        self.assertEqual(
+            [call.args[0] for call in mock_write.call_args_list],
+            [os.path.join(self.shards, "LOW.txt")],
+        )
+        tasks.remove_task("Buy milk")
+        tasks.remove_task("Buy bread")
+        self.assertNotIn("LOW.txt", os.listdir(self.shards))
+
+    @patch("tasks.process_recurring_tasks")
+    def test_changes_from_another_process_are_noticed(self, mock_process_recurring):
+        """Editing a shard on disk changes the signature and reloads it."""
+        storage.write_tasks(self.tasks)
+        self.assertEqual(len(tasks.view_tasks()), 3)
+        with open(os.path.join(self.shards, "LOW.txt"), "a") as file:
+            file.write("[LOW] Water plants\n")
+        self.assertIn("[LOW] Water plants", tasks.view_tasks())
+
+    def test_migration_from_a_text_file(self):
+        """to_shards splits the text file, to_text joins the shards back."""
+        with open(self.path, "w") as file:
+            file.writelines(f"{task}\n" for task in self.tasks)
+        self.assertEqual(sharded_storage.to_shards(self.path, scheme="priority"), 3)
+        self.assertEqual(sorted(self.reload()), sorted(self.tasks))
+        joined = os.path.join(self.dir.name, "joined.txt")
+        sharded_storage.to_text(self.path, joined)
+        with open(joined) as file:
+            self.assertEqual(sorted(file.read().splitlines()), sorted(self.tasks))
+
+
+if __name__ == "__main__":
+    unittest.main()
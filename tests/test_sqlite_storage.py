@@ -0,0 +1,118 @@
+import os
+import tempfile
+import unittest
+from datetime import date, timedelta
+from unittest.mock import patch
+import config
+import sqlite_storage
+import storage
+import tasks
+from format import Task
+from recurring import process_recurring_tasks
+from sqlite_storage import SqliteTaskStore
+from tasks import add_task, remove_task, search_tasks, update_task, view_tasks
+
+
+class TestSqliteStorage(unittest.TestCase):
+    def setUp(self):
+        """Point storage at a fresh database and switch to the sqlite backend."""
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.dir.name, "task.db")
+        self.original_file = storage.TASK_FILE
+        self.original_backend = config.STORAGE_BACKEND
+        storage.TASK_FILE = self.path
+        config.STORAGE_BACKEND = "sqlite"
+
+    def tearDown(self):
+        sqlite_storage.close(self.path)
+        storage.TASK_FILE = self.original_file
+        config.STORAGE_BACKEND = self.original_backend
+        self.dir.cleanup()
+
+    def test_wal_mode(self):
+        """The database runs in write-ahead logging mode."""
+        conn = sqlite_storage.connect(self.path)
+        self.assertEqual(conn.execute("PRAGMA journal_mode").fetchone()[0], "wal")
+
+    def test_synchronous_follows_durability_policy(self):
+        """The synchronous pragma tracks config.DURABILITY."""
+        self.addCleanup(setattr, config, "DURABILITY", config.DURABILITY)
+        for durability, level in (("none", 0), ("flush", 1), ("fsync", 2)):
+            config.DURABILITY = durability
+            conn = sqlite_storage.connect(self.path)
+            self.assertEqual(conn.execute("PRAGMA synchronous").fetchone()[0], level)
+
+    def test_write_and_load(self):
+        """Lists written through storage load back in order."""
+        tasks = ["[HIGH] Finish report (Due: 2025-05-01)", "[LOW] Buy groceries"]
+        storage.write_tasks(tasks)
+        storage.write_tasks(tasks + ["[MEDIUM] Call John"])
+        storage.write_tasks(
+            ["[URGENT] Finish report", "[LOW] Buy groceries", "[MEDIUM] Call John"]
+        )
+        sqlite_storage.close(self.path)
+        self.assertEqual(
+            storage.load_tasks(),
+            ["[URGENT] Finish report", "[LOW] Buy groceries", "[MEDIUM] Call John"],
+        )
+
+    def test_point_queries_use_indexes(self):
+        """Name and priority lookups are answered from indexes."""
+        conn = sqlite_storage.connect(self.path)
+        for sql in (
+            "SELECT id FROM tasks WHERE name = 'x' COLLATE NOCASE ORDER BY id LIMIT 1",
+            "SELECT text FROM tasks WHERE priority = 'URGENT' ORDER BY priority_rank, text",
+            "SELECT text FROM tasks WHERE due <= '2025-01-01'",
+            "SELECT text FROM tasks WHERE recurring IS NOT NULL AND due <= '2025-01-01'",
+        ):
+            plan = " ".join(
+                row[-1] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}")
+            )
+            self.assertIn("USING", plan, sql)
+
+    @patch("tasks.process_recurring_tasks")
+    def test_task_operations(self, mock_process_recurring):
+        """add, update, remove and view work against the database."""
+        self.assertEqual(add_task("Workout", "MEDIUM"), "Task added successfully!")
+        self.assertEqual(add_task("Workout", "MEDIUM"), "Task already exists!")
+        add_task("Buy milk", "LOW")
+        add_task("Ship release", "URGENT", "2025-05-01")
+        self.assertEqual(update_task("workout", "HIGH"), "Task updated successfully!")
+        self.assertEqual(remove_task("milk"), "Task removed successfully!")
+        self.assertEqual(remove_task("Fake task", "LOW"), "Task not found!")
+        self.assertEqual(
+            view_tasks(), ["[URGENT] Ship release (Due: 2025-05-01)", "[HIGH] Workout"]
+        )
+        self.assertEqual(
+            SqliteTaskStore(self.path).sorted(priority="URGENT"),
+            ["[URGENT] Ship release (Due: 2025-05-01)"],
+        )
+        self.assertEqual(search_tasks("SHIP"), view_tasks()[:1])
+        self.assertEqual(search_tasks("100%"), [])
+
+    def test_recurring_pass_queries_due_tasks(self):
+        """The pass asks the database for due recurring tasks, loading nothing."""
+        add_task("Standup", "HIGH", "2025-04-27", "daily")
+        add_task("Review", "LOW", "2025-05-04", "weekly")
+        add_task("Report", "LOW", "2025-04-01")
+        today = date(2025, 4, 27)
+        with patch("recurring.load_tasks") as mock_load, patch(
+            "storage.load_tasks"
+        ) as mock_storage_load:
+            for _ in range(2):
+                process_recurring_tasks(
+                    today=today, load=tasks._store, save=tasks._save
+                )
+        mock_load.assert_not_called()
+        mock_storage_load.assert_not_called()
+        self.assertEqual(
+            SqliteTaskStore(self.path).recurring_due(today + timedelta(days=1)),
+            [
+                Task.parse("[HIGH] Standup (Due: 2025-04-27) [Recurring: daily]"),
+                Task.parse("[HIGH] Standup (Due: 2025-04-28) [Recurring: daily]"),
+            ],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
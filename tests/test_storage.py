@@ -1,6 +1,12 @@
 import unittest
 import os
-from storage import load_tasks, write_tasks
+import threading
+import time
+from unittest.mock import patch
+import config
+import storage
+from storage import load_tasks, write_tasks, iter_tasks, lock_path, GroupCommit
+from storage import WriteBehind, clear_cache
 from config import TASK_FILE
 
 
@@ -9,11 +15,13 @@ class TestStorage(unittest.TestCase):
         """Ensure TASK_FILE starts empty before each test."""
         with open(TASK_FILE, "w") as file:
             file.truncate(0)
+        clear_cache()
 
     def tearDown(self):
         """Clean up TASK_FILE after each test."""
-        if os.path.exists(TASK_FILE):
-            os.remove(TASK_FILE)
+        for path in (TASK_FILE, lock_path(TASK_FILE)):
+            if os.path.exists(path):
+                os.remove(path)
 
     def test_load_tasks_empty_file(self):
         """Ensure an empty file returns an empty list."""
@@ -31,6 +39,184 @@ class TestStorage(unittest.TestCase):
         write_tasks(tasks)
         self.assertEqual(load_tasks(), tasks)
 
+    def test_iter_tasks_streams_in_chunks(self):
+        """Ensure streamed tasks match load_tasks even when lines span chunks."""
+        tasks = [
+            f"[LOW] Task number {i} (Due: 2025-05-0{i % 9 + 1})" for i in range(50)
+        ]
+        write_tasks(tasks)
+        streamed = [str(task) for task in iter_tasks(chunk_size=7)]
+        self.assertEqual(streamed, load_tasks())
+
+    def test_iter_tasks_missing_file(self):
+        """Ensure streaming a missing file yields nothing."""
+        os.remove(TASK_FILE)
+        self.assertEqual(list(iter_tasks()), [])
+
+    def test_iter_tasks_is_lazy(self):
+        """Ensure iter_tasks is a generator that parses on demand."""
+        write_tasks(["[HIGH] Finish report", "[LOW] Buy groceries"])
+        stream = iter_tasks()
+        self.assertEqual(next(stream).name, "Finish report")
+        stream.close()
+
+    def test_unchanged_file_is_not_read_again(self):
+        """Ensure loads reuse the last list until the file changes on disk."""
+        write_tasks(["[LOW] Buy groceries"])
+        with patch("builtins.open") as mock_open:
+            self.assertEqual(load_tasks(), ["[LOW] Buy groceries"])
+        mock_open.assert_not_called()
+        loaded = load_tasks()
+        loaded.append("[HIGH] Not saved")  # Callers get their own copy
+        self.assertEqual(load_tasks(), ["[LOW] Buy groceries"])
+        with open(TASK_FILE, "a") as file:  # Another process appends
+            file.write("[HIGH] Call mom\n")
+        self.assertEqual(load_tasks(), ["[LOW] Buy groceries", "[HIGH] Call mom"])
+
+    def test_cache_holds_only_the_current_file_and_backend(self):
+        """Ensure the cache keeps one list and is not shared across backends."""
+        write_tasks(["[LOW] Buy groceries"])
+        other = f"{TASK_FILE}.other"
+        self.addCleanup(os.remove, other)
+        self.addCleanup(os.remove, lock_path(other))
+        with patch("storage.TASK_FILE", other):
+            write_tasks(["[HIGH] Call mom"])
+        self.assertEqual(storage._loaded[0], other)
+        self.assertEqual(load_tasks(), ["[LOW] Buy groceries"])
+        with patch.object(config, "STORAGE_BACKEND", "journal"):
+            with patch("journal.load", return_value=[]) as mock_load:
+                self.assertEqual(load_tasks(), [])
+            mock_load.assert_called_once()
+
+    def test_write_tasks_replaces_file_atomically(self):
+        """Ensure writes rename a temp file into place, keeping the file mode."""
+        os.chmod(TASK_FILE, 0o640)
+        inode = os.stat(TASK_FILE).st_ino
+        write_tasks(["[LOW] Buy groceries"])
+        self.assertNotEqual(os.stat(TASK_FILE).st_ino, inode)
+        self.assertEqual(os.stat(TASK_FILE).st_mode & 0o777, 0o640)
+        directory = os.path.dirname(os.path.abspath(TASK_FILE))
+        self.assertFalse(
+            [name for name in os.listdir(directory) if name.endswith(".tmp")]
+        )
+
+    def test_appended_tasks_are_written_in_place(self):
+        """Only extending the loaded list appends to the file instead."""
+        write_tasks(["[LOW] Buy groceries"])
+        inode = os.stat(TASK_FILE).st_ino
+        write_tasks(["[LOW] Buy groceries", "[HIGH] Pay rent"])
+        self.assertEqual(os.stat(TASK_FILE).st_ino, inode)
+        with open(TASK_FILE, "a") as file:
+            file.write("[LOW] Unterminated")  # Edited by another program
+        tasks = load_tasks()
+        write_tasks(tasks + ["[LOW] Call John"])
+        self.assertNotEqual(os.stat(TASK_FILE).st_ino, inode)
+        clear_cache()
+        self.assertEqual(
+            load_tasks(),
+            [
+                "[LOW] Buy groceries",
+                "[HIGH] Pay rent",
+                "[LOW] Unterminated",
+                "[LOW] Call John",
+            ],
+        )
+
+    def test_group_commit_coalesces_writers(self):
+        """Ensure mutations queued during a write share the next write."""
+        state, saves = [], []
+
+        def save(tasks):
+            saves.append(list(tasks))
+            time.sleep(0.05)  # Keep the leader busy so the others queue up
+
+        commits = GroupCommit(lambda: state, save)
+
+        def add(i):
+            def mutate(tasks):
+                tasks.append(i)
+                return i, True
+
+            self.assertEqual(commits.submit(mutate), i)
+
+        threads = [threading.Thread(target=add, args=(i,)) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertCountEqual(state, range(8))
+        self.assertLess(len(saves), 8)
+
+    def test_group_commit_reports_errors_per_mutation(self):
+        """Ensure a failing mutation raises for its caller only."""
+        saves = []
+        commits = GroupCommit(list, saves.append)
+
+        def fail(tasks):
+            raise ValueError("bad")
+
+        self.assertRaises(ValueError, commits.submit, fail)
+        self.assertEqual(commits.submit(lambda tasks: ("ok", False)), "ok")
+        self.assertEqual(saves, [])
+
+    def test_durability_policies(self):
+        """Ensure "none" skips fsync and "fsync" also syncs the directory."""
+        original = config.DURABILITY
+        try:
+            for durability, syncs in (("none", 0), ("flush", 1), ("fsync", 2)):
+                config.DURABILITY = durability
+                with patch("os.fsync") as mock_fsync:
+                    write_tasks(["[LOW] Buy groceries"])
+                self.assertEqual(mock_fsync.call_count, syncs, durability)
+                self.assertEqual(load_tasks(), ["[LOW] Buy groceries"])
+            config.DURABILITY = "sometimes"
+            self.assertRaises(ValueError, write_tasks, [])
+        finally:
+            config.DURABILITY = original
+
+    def test_write_behind_coalesces_until_threshold(self):
+        """Ensure repeated edits are saved once, when max_dirty is reached."""
+        state, saves = [], []
+        committer = WriteBehind(
+            lambda: state, lambda tasks: saves.append(list(tasks)), 3
+        )
+        self.addCleanup(committer.close)
+
+        def add(i):
+            return lambda tasks: (tasks.append(i), True)
+
+        committer.submit(add(1))
+        committer.submit(add(2))
+        self.assertEqual((saves, committer.dirty), ([], 2))
+        committer.submit(add(3))
+        self.assertEqual((saves, committer.dirty), ([[1, 2, 3]], 0))
+        committer.submit(lambda tasks: (None, False))
+        committer.flush()
+        self.assertEqual(len(saves), 1)
+
+    def test_write_behind_flushes_on_a_timer(self):
+        """Ensure pending edits are saved once the interval has passed."""
+        saves = []
+        committer = WriteBehind(list, saves.append, interval=0.05)
+        self.addCleanup(committer.close)
+        committer.submit(lambda tasks: (tasks.append(1), True))
+        committer.submit(lambda tasks: (tasks.append(2), True))
+        self.assertEqual(saves, [])
+        deadline = time.monotonic() + 5
+        while not saves and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(saves, [[1, 2]])
+
+    def test_write_behind_flushes_at_exit(self):
+        """Ensure a committer is flushed at exit until it is closed."""
+        with patch("atexit.register") as mock_register, patch(
+            "atexit.unregister"
+        ) as mock_unregister:
+            committer = WriteBehind(list, lambda tasks: None)
+            mock_register.assert_called_once_with(committer.flush)
+            committer.close()
+            mock_unregister.assert_called_once_with(committer.flush)
+
 
 if __name__ == "__main__":
     unittest.main()
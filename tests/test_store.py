@@ -0,0 +1,151 @@
+import unittest
+from store import TaskStore
+
+
+class TestTaskStore(unittest.TestCase):
+    def setUp(self):
+        self.store = TaskStore(
+            [
+                "[HIGH] Finish report (Due: 2025-05-01)",
+                "[LOW] Buy milk",
+                "[MEDIUM] Pay rent (Due: 2025-04-01) [Recurring: monthly]",
+            ]
+        )
+
+    def test_tasks_are_parsed_once(self):
+        """The store keeps parsed records and writes back the original strings."""
+        task = self.store.get(self.store.find("Pay rent"))
+        self.assertEqual(
+            (task.priority, task.due, task.recurring),
+            ("MEDIUM", "2025-04-01", "monthly"),
+        )
+        self.assertEqual(
+            self.store.to_list()[2],
+            "[MEDIUM] Pay rent (Due: 2025-04-01) [Recurring: monthly]",
+        )
+
+    def test_contains_uses_exact_text(self):
+        """Membership checks the full formatted string."""
+        self.assertIn("[LOW] Buy milk", self.store)
+        self.assertNotIn("[HIGH] Buy milk", self.store)
+
+    def test_find_by_name_is_case_insensitive(self):
+        """Names are looked up through the normalized name index."""
+        task_id = self.store.find("finish REPORT")
+        self.assertEqual(
+            str(self.store.get(task_id)), "[HIGH] Finish report (Due: 2025-05-01)"
+        )
+
+    def test_find_with_priority(self):
+        """A priority narrows the lookup to that priority bucket."""
+        self.assertIsNotNone(self.store.find("Buy milk", "LOW"))
+        self.assertIsNone(self.store.find("Buy milk", "HIGH"))
+
+    def test_replace_keeps_position_and_reindexes(self):
+        """Replacing a task keeps its position and updates every index."""
+        task_id = self.store.find("Buy milk")
+        self.store.replace(task_id, "[URGENT] Buy milk")
+        self.assertEqual(self.store.to_list()[1], "[URGENT] Buy milk")
+        self.assertEqual(
+            [str(task) for task in self.store.with_priority("URGENT")],
+            ["[URGENT] Buy milk"],
+        )
+        self.assertEqual(self.store.with_priority("LOW"), [])
+        self.assertNotIn("[LOW] Buy milk", self.store)
+
+    def test_remove_clears_indexes(self):
+        """Removed tasks can no longer be found."""
+        self.store.remove(self.store.find("Pay rent"))
+        self.assertIsNone(self.store.find("Pay rent"))
+        self.assertEqual(len(self.store), 2)
+
+    def test_search_matches_name_substrings(self):
+        """Substring search ignores case and follows add, replace and remove."""
+        self.assertEqual(self.store.search("REPO"), [0])
+        self.assertEqual(self.store.search("e"), [0, 2])
+        self.assertEqual(self.store.search("due"), [])
+        task_id = self.store.add("[LOW] Read report")
+        self.assertEqual(self.store.search("report", limit=1), [0])
+        self.store.replace(0, "[HIGH] Finish slides")
+        self.assertEqual(self.store.search("report"), [task_id])
+        self.store.remove(task_id)
+        self.assertEqual(self.store.search("report"), [])
+
+    def test_text_mutations_do_not_build_indexes(self):
+        """Adding and removing by text leaves the tasks unparsed until a query."""
+        store = TaskStore(["[LOW] Buy milk", "[HIGH] Pay rent"])
+        store.add("[MEDIUM] Call John")
+        store.remove(store.find_text("[LOW] Buy milk"))
+        self.assertIn("[MEDIUM] Call John", store)
+        self.assertIsNone(store._sorted)
+        self.assertEqual(store.sorted(), ["[HIGH] Pay rent", "[MEDIUM] Call John"])
+        self.assertEqual(store.find("call john"), 2)
+
+    def test_trigram_postings_are_built_on_first_search(self):
+        """Mutations before the first search are indexed when it builds postings."""
+        self.assertIsNone(self.store._by_trigram)
+        self.store.replace(0, "[HIGH] Finish slides")
+        self.store.add("[LOW] Read report")
+        self.assertIsNone(self.store._by_trigram)
+        self.assertEqual(self.store.search("report"), [3])
+        self.assertIsNotNone(self.store._by_trigram)
+
+    def test_search_prefix_priority_and_case(self):
+        """Prefix, priority and case-sensitive options narrow the matches."""
+        self.assertEqual(self.store.search("Pay", prefix=True), [2])
+        self.assertEqual(self.store.search("rent", prefix=True), [])
+        self.assertEqual(self.store.search("milk", priority="HIGH"), [])
+        self.assertEqual(self.store.search("milk", priority="LOW"), [1])
+        self.assertEqual(self.store.search("MILK", ignore_case=False), [])
+
+    def test_sorted_view_follows_mutations(self):
+        """The sorted view is kept in priority order across add, replace and remove."""
+        self.store.add("[URGENT] Ship release")
+        self.store.replace(self.store.find("Buy milk"), "[HIGH] Buy milk")
+        self.store.remove(self.store.find("Pay rent"))
+        self.assertEqual(
+            self.store.sorted(),
+            [
+                "[URGENT] Ship release",
+                "[HIGH] Buy milk",
+                "[HIGH] Finish report (Due: 2025-05-01)",
+            ],
+        )
+
+    def test_sorted_pages_and_priority(self):
+        """Pages and single-priority slices come from the sorted view."""
+        self.assertEqual(
+            self.store.sorted(limit=1, offset=1),
+            ["[MEDIUM] Pay rent (Due: 2025-04-01) [Recurring: monthly]"],
+        )
+        self.assertEqual(self.store.sorted(priority="LOW"), ["[LOW] Buy milk"])
+        self.assertEqual(self.store.sorted(priority="URGENT"), [])
+        self.assertEqual(self.store.sorted(offset=5), [])
+
+    def test_due_index_follows_mutations(self):
+        """Date ranges and overdue tasks come from the due-date index."""
+        self.store.add("[LOW] File taxes (Due: 2025-04-15)")
+        self.store.replace(
+            self.store.find("Finish report"), "[HIGH] Finish report (Due: 2025-03-01)"
+        )
+        self.store.remove(self.store.find("Pay rent"))
+        self.assertEqual(
+            [str(task) for task in self.store.due_between()],
+            [
+                "[HIGH] Finish report (Due: 2025-03-01)",
+                "[LOW] File taxes (Due: 2025-04-15)",
+            ],
+        )
+        self.assertEqual(
+            [str(task) for task in self.store.due_between("2025-04-15", "2025-04-15")],
+            ["[LOW] File taxes (Due: 2025-04-15)"],
+        )
+        self.assertEqual(
+            [str(task) for task in self.store.overdue("2025-04-15")],
+            ["[HIGH] Finish report (Due: 2025-03-01)"],
+        )
+        self.assertEqual(self.store.due_between("2025-05-01"), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -6,12 +6,38 @@ from unittest.mock import patch
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 import unittest
 import tempfile
+import shutil
+import multiprocessing
+from datetime import date
 import storage  # Import the module so we can override TASK_FILE
-from tasks import add_task, remove_task, update_task, view_tasks
+from tasks import (
+    add_task,
+    remove_task,
+    update_task,
+    view_tasks,
+    top_tasks,
+    stream_tasks,
+    search_tasks,
+    tasks_due_between,
+    overdue_tasks,
+    complete_task,
+    archive_tasks,
+    archived_tasks,
+)
 from storage import load_tasks, write_tasks
+from history import history_path
+from archive import archive_dir
+from journal import journal_path
+import recurring
 import tasks  # Access the global tasks list defined in tasks.py
 
 
+def _add_tasks_in_process(path, worker):
+    storage.TASK_FILE = path
+    for i in range(25):
+        add_task(f"Task {worker}-{i}", "LOW")
+
+
 class TestTasks(unittest.TestCase):
     def setUp(self):
         """Set up a temporary task file for testing and clear global tasks."""
@@ -32,8 +58,16 @@ class TestTasks(unittest.TestCase):
 
     def tearDown(self):
         """Remove the temporary task file and restore the original TASK_FILE."""
-        if os.path.exists(self.test_file):
-            os.remove(self.test_file)
+        for path in (
+            self.test_file,
+            storage.lock_path(self.test_file),
+            history_path(self.test_file),
+            journal_path(self.test_file),
+            recurring.state_path(),
+        ):
+            if os.path.exists(path):
+                os.remove(path)
+        shutil.rmtree(archive_dir(self.test_file), ignore_errors=True)
         storage.TASK_FILE = self.original_file
 
     def test_add_task(self):
@@ -66,6 +100,14 @@ class TestTasks(unittest.TestCase):
         self.assertIn("[HIGH] Workout", current_tasks)
         self.assertNotIn("[MEDIUM] Workout", current_tasks)
 
+    def test_update_task_keeps_due_date_and_recurrence(self):
+        """Ensure a priority update keeps the task's due date and recurrence."""
+        add_task("Pay rent", "LOW", "2025-05-01", "monthly")
+        update_task("Pay rent", "HIGH")
+        self.assertIn(
+            "[HIGH] Pay rent (Due: 2025-05-01) [Recurring: monthly]", load_tasks()
+        )
+
     def test_update_task_invalid_priority(self):
         """Ensure updating with an invalid priority fails."""
         result = add_task("Invalid priority task", "INVALID")
@@ -101,6 +143,218 @@ class TestTasks(unittest.TestCase):
 
         self.assertEqual(sorted_tasks, expected_order)
 
+    @patch("tasks.process_recurring_tasks")
+    def test_view_tasks_pagination(self, mock_process_recurring):
+        """Ensure view_tasks returns the requested page of the sorted list."""
+        for name, priority in [
+            ("A", "LOW"),
+            ("B", "URGENT"),
+            ("C", "HIGH"),
+            ("D", "URGENT"),
+        ]:
+            add_task(name, priority)
+        self.assertEqual(view_tasks(limit=2), ["[URGENT] B", "[URGENT] D"])
+        self.assertEqual(view_tasks(limit=2, offset=2), ["[HIGH] C", "[LOW] A"])
+
+    def test_top_tasks(self):
+        """Ensure top_tasks returns the first k tasks of one priority."""
+        add_task("Fix outage", "URGENT")
+        add_task("Call vendor", "URGENT")
+        add_task("Tidy desk", "LOW")
+        self.assertEqual(top_tasks(1), ["[URGENT] Call vendor"])
+        self.assertEqual(top_tasks(5, "low"), ["[LOW] Tidy desk"])
+
+    def test_stream_tasks_filters(self):
+        """Ensure stream_tasks applies priority, due window and substring filters."""
+        add_task("Finish report", "HIGH", "2025-05-01")
+        add_task("File taxes", "HIGH", "2025-04-15")
+        add_task("Buy milk", "LOW")
+        self.assertEqual(
+            list(stream_tasks(priority="high", due_to="2025-04-30")),
+            ["[HIGH] File taxes (Due: 2025-04-15)"],
+        )
+        self.assertEqual(list(stream_tasks(contains="MILK")), ["[LOW] Buy milk"])
+        self.assertEqual(
+            list(stream_tasks(due_from="2025-04-20")),
+            ["[HIGH] Finish report (Due: 2025-05-01)"],
+        )
+
+    def test_tasks_due_between_and_overdue(self):
+        """Ensure due-date queries accept dates or strings and skip undated tasks."""
+        add_task("Finish report", "HIGH", "2025-05-01")
+        add_task("File taxes", "LOW", "2025-04-15")
+        add_task("Buy milk", "LOW")
+        self.assertEqual(
+            tasks_due_between("2025-04-01", date(2025, 4, 30)),
+            ["[LOW] File taxes (Due: 2025-04-15)"],
+        )
+        self.assertEqual(
+            tasks_due_between(start="2025-04-15"),
+            [
+                "[LOW] File taxes (Due: 2025-04-15)",
+                "[HIGH] Finish report (Due: 2025-05-01)",
+            ],
+        )
+        self.assertEqual(
+            overdue_tasks(date(2025, 5, 1)), ["[LOW] File taxes (Due: 2025-04-15)"]
+        )
+
+    def test_write_behind_saves_edits_together(self):
+        """Ensure write-behind edits are visible at once and written in one save."""
+        tasks.enable_write_behind(max_dirty=10)
+        self.addCleanup(tasks.disable_write_behind)
+        with patch("tasks.write_tasks", wraps=write_tasks) as mock_write:
+            add_task("Buy milk", "LOW")
+            update_task("Buy milk", "HIGH")
+            add_task("Pay rent", "MEDIUM")
+            self.assertEqual(load_tasks(), [])
+            self.assertEqual(mock_write.call_count, 0)
+            tasks.disable_write_behind()
+        self.assertEqual(mock_write.call_count, 1)
+        self.assertEqual(load_tasks(), ["[HIGH] Buy milk", "[MEDIUM] Pay rent"])
+        self.assertIsInstance(tasks._commits, storage.GroupCommit)
+
+    def test_undo_and_redo(self):
+        """Ensure adds, updates and removals are undone and redone in turn."""
+        add_task("Buy milk", "LOW")
+        update_task("Buy milk", "HIGH")
+        remove_task("Buy milk")
+        self.assertEqual(tasks.undo(), "Change undone successfully!")
+        self.assertEqual(load_tasks(), ["[HIGH] Buy milk"])
+        tasks.undo()
+        self.assertEqual(load_tasks(), ["[LOW] Buy milk"])
+        self.assertEqual(tasks.redo(), "Change redone successfully!")
+        self.assertEqual(load_tasks(), ["[HIGH] Buy milk"])
+        tasks.undo()
+        tasks.undo()
+        self.assertEqual(load_tasks(), [])
+        self.assertEqual(tasks.undo(), "Nothing to undo!")
+        tasks.redo()
+        add_task("Pay rent")  # A new change drops what could be redone
+        self.assertEqual(tasks.redo(), "Nothing to redo!")
+        self.assertEqual(load_tasks(), ["[LOW] Buy milk", "[MEDIUM] Pay rent"])
+
+    def test_undo_survives_the_process_and_checks_the_tasks(self):
+        """Ensure the history is reread from disk and stale steps are refused."""
+        add_task("Buy milk", "LOW")
+        tasks._history = None  # As in a new process
+        write_tasks(["[LOW] Buy milk", "[HIGH] Other"])
+        self.assertEqual(tasks.undo(), "Change undone successfully!")
+        self.assertEqual(load_tasks(), ["[HIGH] Other"])
+        write_tasks(["[LOW] Buy milk"])  # Re-added behind the history's back
+        self.assertEqual(tasks.redo(), "Cannot redo: the tasks have changed since!")
+
+    def test_stale_step_is_dropped(self):
+        """Ensure a step that no longer applies does not block older ones."""
+        add_task("Buy milk", "LOW")
+        add_task("Pay rent", "LOW")
+        complete_task("Pay rent")
+        self.assertEqual(tasks.undo(), "Cannot undo: the tasks have changed since!")
+        tasks._history = None  # The drop is kept for a new process too
+        self.assertEqual(tasks.undo(), "Change undone successfully!")
+        self.assertEqual(load_tasks(), [])
+        self.assertEqual(tasks.undo(), "Nothing to undo!")
+
+    def test_complete_task_archives_it(self):
+        """Ensure completing moves a task to the archive and continues a series."""
+        add_task("Buy milk", "LOW")
+        add_task("Standup", "HIGH", "2025-04-27", "daily")
+        today = date(2025, 4, 27)
+        self.assertEqual(
+            complete_task("milk", today=today), "Task completed successfully!"
+        )
+        complete_task("Standup", today=today)
+        self.assertEqual(complete_task("Nothing"), "Task not found!")
+        self.assertEqual(
+            load_tasks(), ["[HIGH] Standup (Due: 2025-04-28) [Recurring: daily]"]
+        )
+        self.assertEqual(
+            [record.task for record in archived_tasks(reason="completed")],
+            ["[LOW] Buy milk", "[HIGH] Standup (Due: 2025-04-27) [Recurring: daily]"],
+        )
+
+    def test_archive_tasks_moves_superseded_occurrences(self):
+        """Ensure overdue occurrences with a later one are archived."""
+        write_tasks(
+            [
+                "[HIGH] Standup (Due: 2025-04-25) [Recurring: daily]",
+                "[HIGH] Standup (Due: 2025-04-26) [Recurring: daily]",
+                "[HIGH] Standup (Due: 2025-04-27) [Recurring: daily]",
+                "[LOW] Rent (Due: 2025-03-01) [Recurring: monthly]",
+                "[LOW] Old report (Due: 2025-01-01)",
+            ]
+        )
+        self.assertEqual(archive_tasks(date(2025, 4, 27)), 2)
+        self.assertEqual(
+            load_tasks(),
+            [
+                "[HIGH] Standup (Due: 2025-04-27) [Recurring: daily]",
+                "[LOW] Rent (Due: 2025-03-01) [Recurring: monthly]",
+                "[LOW] Old report (Due: 2025-01-01)",
+            ],
+        )
+        self.assertEqual(
+            [r.archived for r in archived_tasks("standup", since="2025-04")],
+            ["2025-04-27", "2025-04-27"],
+        )
+        self.assertEqual(archive_tasks(date(2025, 4, 27)), 0)
+
+    def test_store_is_extended_when_tasks_were_appended(self):
+        """Ensure appended tasks join the loaded store without a rebuild."""
+        add_task("Buy milk", "LOW")
+        store = tasks._store()
+        write_tasks(["[LOW] Buy milk", "[HIGH] Call mom"])
+        self.assertIs(tasks._store(), store)
+        self.assertEqual(store.to_list(), ["[LOW] Buy milk", "[HIGH] Call mom"])
+        write_tasks(["[HIGH] Call mom"])
+        self.assertIsNot(tasks._store(), store)
+        self.assertEqual(view_tasks(), ["[HIGH] Call mom"])
+
+    def test_failed_save_leaves_no_trace(self):
+        """Ensure a change that could not be saved is dropped from memory and undo."""
+        add_task("A", "LOW")
+        with patch("tasks.write_tasks", side_effect=OSError("No space left")):
+            self.assertRaises(OSError, add_task, "B", "LOW")
+        self.assertEqual(load_tasks(), ["[LOW] A"])
+        self.assertEqual(search_tasks("B"), [])
+        self.assertEqual(tasks.undo(), "Change undone successfully!")
+        self.assertEqual(load_tasks(), [])
+        self.assertEqual(add_task("B", "LOW"), "Task added successfully!")
+
+    def test_remove_task_by_substring(self):
+        """Ensure a name fragment removes the first matching task."""
+        add_task("Buy milk", "LOW")
+        add_task("Buy bread", "LOW")
+        self.assertEqual(remove_task("BUY"), "Task removed successfully!")
+        self.assertEqual(load_tasks(), ["[LOW] Buy bread"])
+        self.assertEqual(remove_task("Buy", "HIGH"), "Task not found!")
+
+    def test_search_tasks(self):
+        """Ensure search_tasks returns name matches in view order."""
+        add_task("Write report", "LOW")
+        add_task("Review report", "URGENT", "2025-05-01")
+        add_task("Buy milk", "LOW")
+        self.assertEqual(
+            search_tasks("Report"),
+            ["[URGENT] Review report (Due: 2025-05-01)", "[LOW] Write report"],
+        )
+        self.assertEqual(search_tasks("report", limit=1), search_tasks("report")[:1])
+        self.assertEqual(search_tasks("2025"), [])
+
+    @unittest.skipUnless(storage.fcntl, "advisory locks need fcntl")
+    def test_concurrent_processes_do_not_lose_updates(self):
+        """Ensure tasks added from several processes at once are all kept."""
+        context = multiprocessing.get_context("fork")
+        workers = [
+            context.Process(target=_add_tasks_in_process, args=(self.test_file, n))
+            for n in range(4)
+        ]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        self.assertEqual(len(load_tasks()), 4 * 25)
+
     def test_update_none_existent_task(self):
         """Ensure updating a non-existent task returns an error."""
         result = update_task("Fake task", "HIGH")
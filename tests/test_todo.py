@@ -1,6 +1,12 @@
+import os
+import subprocess
+import sys
+import tempfile
 import unittest
 from unittest.mock import patch
-from todo import main
+import sharded_storage
+import storage
+from todo import cli, main
 
 
 class TestTodoMain(unittest.TestCase):
@@ -134,5 +140,125 @@ class TestTodoMain(unittest.TestCase):
         )
 
 
+class TestTodoCli(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.file = os.path.join(self.dir.name, "task.txt")
+        self.original_file = storage.TASK_FILE
+
+    def tearDown(self):
+        storage.TASK_FILE = self.original_file  # Set by --file
+        self.dir.cleanup()
+
+    def run_cli(self, *argv):
+        with patch("builtins.print") as mock_print:
+            status = cli(["--file", self.file, *argv])
+        # Only what the command printed to stdout, not profiler or stderr output.
+        printed = [c for c in mock_print.call_args_list if "file" not in c.kwargs]
+        return status, [call.args[0] for call in printed]
+
+    @patch("tasks.process_recurring_tasks")
+    def test_subcommands(self, mock_process_recurring):
+        """add, update, remove and list run without prompting."""
+        self.assertEqual(
+            self.run_cli(
+                "add", "Finish project", "--priority", "HIGH", "--due", "2025-05-01"
+            ),
+            (0, ["✅ Task added successfully!"]),
+        )
+        self.run_cli("add", "Buy milk", "--priority", "low")
+        self.run_cli("update", "Buy milk", "--priority", "URGENT")
+        self.assertEqual(
+            self.run_cli("list"),
+            (0, ["[URGENT] Buy milk", "[HIGH] Finish project (Due: 2025-05-01)"]),
+        )
+        self.assertEqual(
+            self.run_cli("list", "--priority", "high"),
+            (0, ["[HIGH] Finish project (Due: 2025-05-01)"]),
+        )
+        self.assertEqual(
+            self.run_cli("remove", "Buy milk", "--priority", "urgent"),
+            (0, ["✅ Task removed successfully!"]),
+        )
+        self.assertEqual(
+            self.run_cli("list", "--limit", "1")[1],
+            ["[HIGH] Finish project (Due: 2025-05-01)"],
+        )
+
+    @patch("tasks.process_recurring_tasks")
+    def test_undo_and_redo(self, mock_process_recurring):
+        """undo and redo step through changes made by earlier commands."""
+        self.run_cli("add", "Buy milk", "--priority", "LOW")
+        self.run_cli("remove", "Buy milk")
+        self.assertEqual(self.run_cli("undo"), (0, ["✅ Change undone successfully!"]))
+        self.assertEqual(self.run_cli("list")[1], ["[LOW] Buy milk"])
+        self.assertEqual(self.run_cli("redo")[0], 0)
+        self.assertEqual(self.run_cli("list")[1], [])
+        with patch("sys.stderr"):
+            self.assertEqual(self.run_cli("redo")[0], 1)
+
+    def test_complete_and_list_the_archive(self):
+        """complete archives a task and archived lists it."""
+        self.run_cli("add", "Buy milk", "--priority", "LOW")
+        self.assertEqual(
+            self.run_cli("complete", "Buy milk", "--priority", "low"),
+            (0, ["✅ Task completed successfully!"]),
+        )
+        status, printed = self.run_cli("archived", "--reason", "completed")
+        self.assertEqual(status, 0)
+        self.assertTrue(printed[0].endswith(" completed  [LOW] Buy milk"))
+        self.assertEqual(
+            self.run_cli("archive"), (0, ["✅ 0 tasks archived successfully!"])
+        )
+
+    def test_failures_exit_non_zero(self):
+        """Rejected operations report on stderr and return status 1."""
+        with patch("sys.stderr"):
+            self.assertEqual(self.run_cli("remove", "Nothing")[0], 1)
+            self.assertEqual(self.run_cli("add", "Task", "--priority", "SOON")[0], 1)
+
+    @patch("sys.stderr")
+    def test_recur_over_many_files(self, mock_stderr):
+        """recur --files reports throughput and fails when no file matches."""
+        self.run_cli("add", "Buy milk")
+        status, printed = self.run_cli("recur", "--files", self.dir.name)
+        self.assertEqual(status, 0)
+        self.assertTrue(printed[0].startswith("✅ 1 files, 1 tasks, 0 generated"))
+        missing = os.path.join(self.dir.name, "none", "*.txt")
+        self.assertEqual(self.run_cli("recur", "--files", missing)[0], 1)
+
+    def test_shard_migrates_the_task_file(self):
+        """shard splits the text task file for the sharded backend."""
+        self.run_cli("add", "Buy milk", "--priority", "LOW")
+        status, printed = self.run_cli("shard", "--by", "hash", "--count", "2")
+        self.assertEqual(status, 0)
+        self.assertIn("1 tasks split into", printed[0])
+        self.assertEqual(sharded_storage.load(self.file), ["[LOW] Buy milk"])
+
+    @patch("sys.stderr")
+    def test_profile_defaults_to_list(self, mock_stderr):
+        """--profile alone profiles a listing and writes the report."""
+        report = os.path.join(self.dir.name, "profile.txt")
+        self.run_cli("add", "Buy milk")
+        status, printed = self.run_cli("--profile", "--profile-output", report)
+        self.assertEqual((status, printed), (0, ["[MEDIUM] Buy milk"]))
+        with open(report) as file:
+            text = file.read()
+        for section in ("  load", "  recurring", "  sort", "  render", "cProfile"):
+            self.assertIn(section, text)
+
+    def test_import_does_not_load_tasks(self):
+        """Importing the CLI leaves the task file untouched until a command runs."""
+        code = "import todo, tasks; print(tasks.tasks)"
+        output = subprocess.run(
+            [sys.executable, "-c", code],
+            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+        self.assertEqual(output.strip(), "None")
+
+
 if __name__ == "__main__":
     unittest.main()
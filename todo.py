@@ -1,5 +1,8 @@
-from tasks import add_task, remove_task, update_task, view_tasks
-from config import TASK_FILE
+import sys
+from tasks import add_task, remove_task, update_task, view_tasks, undo, redo
+from tasks import complete_task, archive_tasks, archived_tasks
+from config import TASK_FILE, SERVER_ADDRESS, METRICS_FILE
+from profiling import phase
 
 
 def main():
@@ -15,9 +18,10 @@ def main():
 
         if choice == "1":
             tasks = view_tasks()
-            print("\n📜 Task List:")
-            for task in tasks:
-                print(f" - {task}")
+            with phase("render"):
+                print("\n📜 Task List:")
+                for task in tasks:
+                    print(f" - {task}")
 
         elif choice == "2":
             name = input("Task name: ")
@@ -49,5 +53,266 @@ def main():
             print("⚠ Invalid choice! Please enter a number between 1-5.")
 
 
+def serve(address=None):
+    """Run the task server until interrupted."""
+    import asyncio
+    import server
+
+    print(f"🚀 Serving tasks on {address or SERVER_ADDRESS}")
+    try:
+        asyncio.run(server.serve(address))
+    except (KeyboardInterrupt, asyncio.CancelledError):
+        print("👋 Task server stopped.")
+
+
+def client(op, *pairs, address=None):
+    """
+    Send one key=value request to the task server and print the result.
+
+    Returns the exit status: 1 when the server reports a failure, like a
+    task that was not found, as for the other commands.
+    """
+    from server import Client
+
+    args = dict(pair.split("=", 1) for pair in pairs)
+    for key in ("limit", "offset"):
+        if key in args:
+            args[key] = int(args[key])
+    try:
+        with Client(address) as connection:
+            result = connection.request(op, **args)
+    except (OSError, RuntimeError) as exc:
+        sys.exit(f"⚠ {exc}")
+    if isinstance(result, list):
+        for line in result:
+            print(line)
+        return 0
+    if not str(result).endswith("successfully!"):
+        print(f"⚠ {result}", file=sys.stderr)
+        return 1
+    print(result)
+    return 0
+
+
+def recur(catch_up=False):
+    """Generate the next occurrences of recurring tasks that came due."""
+    from recurring import process_recurring_tasks
+
+    process_recurring_tasks(catch_up=catch_up or None)
+    return "Recurring tasks processed successfully!"
+
+
+def recur_batch(pattern, catch_up=False, workers=None, chunk_size=None):
+    """Run the recurring pass over many task files and print a throughput report."""
+    from batch import process_files, task_files
+
+    paths = task_files(pattern)
+    if not paths:
+        print(f"⚠ No task files match {pattern}", file=sys.stderr)
+        return 1
+    report = process_files(paths, None, catch_up or None, workers, chunk_size)
+    for result in report["errors"]:
+        print(f"⚠ {result['path']}: {result['error']}", file=sys.stderr)
+    print(
+        f"✅ {report['files']} files, {report['tasks']} tasks,"
+        f" {report['generated']} generated in {report['seconds']:.2f} s"
+        f" ({report['files_per_second']:.0f} files/s,"
+        f" {report['tasks_per_second']:.0f} tasks/s)"
+    )
+    return 1 if report["errors"] else 0
+
+
+def shard(scheme=None, count=None):
+    """Split the text task file into shards for the "sharded" backend."""
+    import storage
+    from sharded_storage import shard_dir, to_shards
+
+    moved = to_shards(storage.TASK_FILE, scheme=scheme, count=count)
+    print(f"✅ {moved} tasks split into {shard_dir(storage.TASK_FILE)}")
+    print('Set STORAGE_BACKEND = "sharded" in config.py to use them.')
+
+
+def _parser():
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        prog="todo.py",
+        description="Manage tasks. Run without arguments for the interactive menu.",
+    )
+    parser.add_argument("--file", help=f"task file to use (default: {TASK_FILE})")
+    parser.add_argument(
+        "--metrics",
+        metavar="FILE",
+        help="record call metrics and write them to FILE (.prom or .json)",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="profile the command (list by default) and write a report",
+    )
+    parser.add_argument(
+        "--profile-output",
+        metavar="FILE",
+        default="todo-profile.txt",
+        help="where --profile writes its report (default: %(default)s)",
+    )
+    commands = parser.add_subparsers(dest="command")
+
+    add = commands.add_parser("add", help="add a task")
+    add.add_argument("name")
+    add.add_argument("--priority", type=str.upper, default="MEDIUM")
+    add.add_argument("--due", help="due date, YYYY-MM-DD")
+    add.add_argument("--recurring", help="daily, weekly or monthly")
+
+    listing = commands.add_parser("list", help="list tasks in priority order")
+    listing.add_argument(
+        "--priority", type=str.upper, help="only list tasks of this priority"
+    )
+    listing.add_argument("--limit", type=int)
+    listing.add_argument("--offset", type=int, default=0)
+
+    remove = commands.add_parser("remove", help="remove a task")
+    remove.add_argument("name")
+    remove.add_argument("--priority", type=str.upper)
+
+    update = commands.add_parser("update", help="change a task's priority or due date")
+    update.add_argument("name")
+    update.add_argument("--priority", type=str.upper)
+    update.add_argument("--due", help="due date, YYYY-MM-DD")
+
+    complete = commands.add_parser("complete", help="archive a task as done")
+    complete.add_argument("name")
+    complete.add_argument("--priority", type=str.upper)
+
+    commands.add_parser(
+        "archive", help="archive overdue occurrences superseded by a later one"
+    )
+
+    archived = commands.add_parser("archived", help="list archived tasks")
+    archived.add_argument("--contains", help="only tasks containing this text")
+    archived.add_argument("--since", help="archived on or after YYYY-MM[-DD]")
+    archived.add_argument("--until", help="archived on or before YYYY-MM[-DD]")
+    archived.add_argument("--reason", choices=("completed", "superseded"))
+
+    commands.add_parser("undo", help="undo the latest add, remove or update")
+    commands.add_parser("redo", help="redo the latest undone change")
+
+    recurring = commands.add_parser("recur", help="generate due recurring tasks")
+    recurring.add_argument(
+        "--catch-up", action="store_true", help="generate every missed occurrence"
+    )
+    recurring.add_argument(
+        "--files",
+        metavar="PATTERN",
+        help="process every task file in a directory or matching a glob",
+    )
+    recurring.add_argument("--workers", type=int, help="processes (default: CPUs)")
+    recurring.add_argument("--chunk-size", type=int, help="files per work unit")
+
+    serving = commands.add_parser("serve", help="run the task server")
+    serving.add_argument("address", nargs="?")
+
+    sharding = commands.add_parser(
+        "shard", help="split the task file into shards for the sharded backend"
+    )
+    sharding.add_argument("--by", choices=("priority", "hash"))
+    sharding.add_argument("--count", type=int, help="shards of the hash layout")
+
+    request = commands.add_parser("client", help="send a request to the server")
+    request.add_argument(
+        "--address", help=f"server to connect to (default: {SERVER_ADDRESS})"
+    )
+    request.add_argument("op")
+    request.add_argument("pairs", nargs="*", metavar="key=value")
+    return parser
+
+
+def cli(argv):
+    """Run one subcommand non-interactively and return the exit status."""
+    parser = _parser()
+    args = parser.parse_args(argv)
+    if args.command is None:
+        if not args.profile:
+            parser.error("a command is required")
+        args = parser.parse_args([*argv, "list"])
+    if args.file:
+        import storage
+
+        storage.TASK_FILE = args.file
+    metrics_file = args.metrics or METRICS_FILE
+    if metrics_file:
+        import metrics
+
+        metrics.enable()
+    try:
+        if not args.profile:
+            return _run(args)
+        import profiling
+
+        status = profiling.profile(
+            lambda: _run(args), args.profile_output, " ".join(argv)
+        )
+        print(f"📄 Profile report written to {args.profile_output}", file=sys.stderr)
+        return status
+    finally:
+        if metrics_file:
+            metrics.export(metrics_file)
+
+
+def _run(args):
+    if args.command == "list":
+        found = view_tasks(args.limit, args.offset, args.priority)
+        with phase("render"):
+            for task in found:
+                print(task)
+        return 0
+    if args.command == "serve":
+        serve(args.address)
+        return 0
+    if args.command == "client":
+        return client(args.op, *args.pairs, address=args.address)
+    if args.command == "archived":
+        with phase("render"):
+            for record in archived_tasks(
+                args.contains, args.since, args.until, args.reason
+            ):
+                print(f"{record.archived} {record.reason:10} {record.task}")
+        return 0
+    if args.command == "recur" and args.files:
+        return recur_batch(args.files, args.catch_up, args.workers, args.chunk_size)
+    if args.command == "shard":
+        try:
+            shard(args.by, args.count)
+        except OSError as exc:
+            print(f"⚠ {exc}", file=sys.stderr)
+            return 1
+        return 0
+
+    if args.command == "add":
+        result = add_task(args.name, args.priority, args.due, args.recurring)
+    elif args.command == "remove":
+        result = remove_task(args.name, args.priority)
+    elif args.command == "update":
+        result = update_task(args.name, args.priority, args.due)
+    elif args.command == "complete":
+        result = complete_task(args.name, args.priority)
+    elif args.command == "archive":
+        result = f"{archive_tasks()} tasks archived successfully!"
+    elif args.command == "undo":
+        result = undo()
+    elif args.command == "redo":
+        result = redo()
+    else:
+        result = recur(args.catch_up)
+    if not result.endswith("successfully!"):
+        print(f"⚠ {result}", file=sys.stderr)
+        return 1
+    print(f"✅ {result}")
+    return 0
+
+
 if __name__ == "__main__":
+    # Usage: python todo.py [--file FILE] COMMAND ..., or no arguments for the menu
+    if len(sys.argv) > 1:
+        sys.exit(cli(sys.argv[1:]))
     main()